@@ -0,0 +1,49 @@
+"""
+Maintenance commands.
+
+    python -m app.cli rebuild-project-index
+"""
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+import structlog
+
+from app.config import settings
+from app.logging_config import configure_logging
+
+logger = structlog.get_logger(__name__)
+
+
+async def _rebuild_project_index() -> int:
+    from app.db import engine
+    from app.services.nextcloud import NextcloudService
+    from app.services.project_index import ProjectIndex
+
+    nextcloud = NextcloudService()
+    try:
+        count = await ProjectIndex(engine).rebuild(nextcloud, concurrency=settings.upload_concurrency)
+    finally:
+        await nextcloud.aclose()
+    print(f"Indexed {count} projects from {settings.nextcloud_base_path}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Datenschutzportal maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "rebuild-project-index",
+        help="Re-create the local project index from the metadata.json files in Nextcloud",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging(service_name=settings.service_name, env=settings.env, log_level=settings.log_level)
+    if args.command == "rebuild-project-index":
+        return asyncio.run(_rebuild_project_index())
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
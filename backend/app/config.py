@@ -10,6 +10,10 @@ import json
 from pathlib import Path
 
 
+# backend/ – anchor for relative paths in settings, independent of the working directory
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
 def _find_env_file() -> str | None:
     """
     Find a .env file by walking upwards from the current working directory.
@@ -64,16 +68,62 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: str = "INFO"
+    # Opt-in: write log lines from a background thread through a queue of this many
+    # records (0 = write synchronously). Lines are dropped, and counted, when it is full.
+    log_async_queue_size: int = 0
     env: str = "dev"
     service_name: str = "datenschutzportal-backend"
     # Used for HMAC hashing of PII (e.g. email_hash) in logs.
     # No default – must be set via environment variable (OWASP A02 / CWE-798).
     log_redaction_secret: str
 
+    # Prometheus metrics on /metrics. Off by default; only served when enabled AND
+    # metrics_token is set (scrapers send it as Bearer token). Values are per process,
+    # so python -m app.serve refuses to start with metrics and more than one worker.
+    metrics_enabled: bool = False
+    metrics_token: str = ""
+
+    # Local state (email outbox, indexes). Relative paths are resolved against backend/.
+    # Contains personal data (e.g. queued e-mails): keep it on a private volume.
+    data_dir: str = "data"
+    # SQLite database in data_dir for local indexes (content hashes, ...)
+    database_file: str = "portal.db"
+    # Seconds an indexed project is served as is by GET /api/upload/status; older entries are
+    # revalidated against Nextcloud (a 304 while metadata.json is unchanged)
+    project_index_ttl: float = 300.0
+
+    def data_path(self, name: str) -> Path:
+        """Absolute path of a file inside data_dir (the directory is created if needed)."""
+        directory = Path(self.data_dir)
+        if not directory.is_absolute():
+            directory = BACKEND_DIR / directory
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / name
+
+    # Rate limiting (moving window), shared by all workers. Empty: SQLite file
+    # data_dir/rate_limits.db (one host); or any limits storage URI, e.g.
+    # redis://redis:6379/0 (several hosts; needs the `redis` package).
+    rate_limit_storage_uri: str = ""
+    # Reverse proxies in front of the API that append to X-Forwarded-For (Traefik: 1).
+    # 0 = use the TCP peer address; never trust the header without a proxy.
+    trusted_proxy_count: int = 0
+
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_debug: bool = False
+    # Connect to Nextcloud and SMTP at startup, before the first request needs them
+    # (bounded by the timeout; failures are logged and not fatal).
+    startup_warm_up: bool = True
+    startup_warm_up_timeout: float = 10.0
+    # Production server (python -m app.serve). 0 workers = one per available CPU.
+    web_concurrency: int = 0
+    server_backlog: int = 2048
+    # Longer than the reverse proxy's idle timeout to its backends (Traefik: 90 s),
+    # so the proxy never reuses a connection the server is just closing.
+    server_keep_alive_seconds: int = 95
+    # On shutdown, in-flight requests (large uploads) get this long to finish.
+    server_graceful_timeout_seconds: int = 120
     cors_origins: List[str] = [
         "http://localhost:3000",
         "http://127.0.0.1:3000",
@@ -153,6 +203,30 @@ class Settings(BaseSettings):
     nextcloud_username: str
     nextcloud_password: str
     nextcloud_base_path: str = "/Datenschutzportal"
+    # WebDAV request timeout (seconds) and size of the shared HTTP connection pool
+    nextcloud_timeout: float = 30.0
+    nextcloud_max_connections: int = 20
+    # Process-local cache of remote folders known to exist (skips MKCOL/PROPFIND round trips)
+    nextcloud_folder_cache_size: int = 1024
+    nextcloud_folder_cache_ttl: float = 300.0
+    # Process-local cache of parsed metadata.json files with their ETag; entries are
+    # revalidated with If-None-Match on every read, so a hit costs one 304 response
+    nextcloud_metadata_cache_size: int = 256
+    nextcloud_metadata_cache_ttl: float = 600.0
+    # Background health probe: interval while healthy / while failing, and the maximum
+    # age (seconds) of a cached result before the upload path probes inline instead.
+    nextcloud_health_interval: float = 30.0
+    nextcloud_health_unhealthy_interval: float = 5.0
+    nextcloud_health_max_age: float = 90.0
+    # Chunked upload (Nextcloud chunking v2) for files larger than the threshold.
+    # Nextcloud requires chunks between 5 MB and 5 GB (only the last chunk may be smaller).
+    nextcloud_chunked_upload_enabled: bool = True
+    nextcloud_chunked_upload_threshold: int = 10485760  # 10 MiB
+    nextcloud_chunk_size: int = 10485760  # 10 MiB
+    nextcloud_chunk_concurrency: int = 3
+    # Retries per failed chunk (only that chunk is re-sent), with exponential backoff in seconds
+    nextcloud_chunk_retries: int = 3
+    nextcloud_chunk_retry_backoff: float = 0.5
     
     # SMTP
     smtp_host: str
@@ -162,20 +236,75 @@ class Settings(BaseSettings):
     smtp_from_email: str
     smtp_from_name: str = "Datenschutzportal"
     smtp_encryption: Literal["starttls", "ssl", "none"] = "starttls"
+    # Pooled, authenticated SMTP sessions: max open sessions, seconds of idleness after
+    # which a session is closed, and after which it is checked with NOOP before reuse
+    smtp_pool_size: int = 2
+    smtp_pool_idle_timeout: float = 60.0
+    smtp_pool_health_check_after: float = 15.0
     
+    # E-mail templates: auto_reload re-checks template files on every render (development only);
+    # the bytecode cache stores compiled templates in data_dir/jinja_cache
+    email_template_auto_reload: bool = False
+    email_template_bytecode_cache: bool = True
+
     # Notifications
     notification_emails: List[str]
+    # Outbox for confirmation/team e-mails: sent by a background worker with retry/backoff
+    # (seconds, doubled per attempt); pending jobs are persisted in data_dir.
+    email_outbox_file: str = "email_outbox.json"
+    email_outbox_max_attempts: int = 5
+    email_outbox_backoff: float = 30.0
+    email_outbox_max_backoff: float = 900.0
     
     # Security
     secret_key: str
     api_token: str
+    # Bearer token for admin endpoints (GET /api/projects). Unlike api_token it must never be
+    # shipped to browsers. Empty = admin endpoints are disabled (404).
+    admin_token: str = ""
     # algorithm is only used for signing upload session tokens; HS256 is the only accepted value.
     algorithm: Literal["HS256"] = "HS256"
     # Lifetime in seconds for short-lived upload session tokens issued by /api/upload-token
     upload_token_ttl_seconds: int = 300  # 5 minutes
+    # Session-based uploads (/api/upload/sessions): lifetime of a session and of its scoped
+    # token, and the data_dir subdirectory holding session state (shared by all workers).
+    # A session holds at most upload_session_max_files files and max_request_size bytes in total,
+    # the same budget as one multipart POST /api/upload.
+    upload_session_ttl_seconds: int = 3600  # 1 hour
+    upload_sessions_dir: str = "upload_sessions"
+    upload_session_max_files: int = 100
     
     # File Upload
     max_file_size: int = 52428800  # 50 MB
+    # Upper bound for a whole request body (all files of a multipart upload plus form fields).
+    # Bodies are counted while they stream in, so oversized requests are rejected early.
+    max_request_size: int = 262144000  # 250 MB
+    # Uploaded files stay in memory up to this size and are then spooled to a temporary file
+    # in upload_spool_dir (e.g. a tmpfs mount; empty: the system temp dir)
+    upload_spool_max_size: int = 1048576  # 1 MiB
+    upload_spool_dir: str = ""
+    # Bytes read from an UploadFile per step when streaming it to Nextcloud (bounds memory per upload)
+    upload_stream_chunk_size: int = 1048576  # 1 MiB
+    # Maximum number of files of one submission uploaded to Nextcloud in parallel
+    upload_concurrency: int = 4
+    # Content-addressed deduplication: files whose SHA-256 is already stored in Nextcloud are
+    # copied server-side (WebDAV COPY) instead of uploaded again. Index lives in database_file.
+    upload_dedup_enabled: bool = True
+    # Content validation (magic bytes, archive inspection) runs in a pool of worker threads.
+    # Beyond validation_max_pending queued files, or when one file takes longer than
+    # validation_timeout seconds, uploads are answered with 503 and Retry-After.
+    validation_workers: int = 2
+    validation_max_pending: int = 16
+    validation_timeout: float = 30.0
+    validation_retry_after: int = 5
+    # Validation results remembered per content SHA-256 (0 disables the cache)
+    validation_cache_size: int = 1024
+    # ZIP uploads: members are checked against allowed_file_types and their magic bytes
+    # without extracting; limits on entries, declared uncompressed size and per-member
+    # compression ratio (zip bombs). Encrypted archives are rejected.
+    zip_max_entries: int = 1000
+    zip_max_uncompressed_size: int = 1073741824  # 1 GiB
+    zip_max_compression_ratio: float = 100.0
     allowed_file_types: List[str] = [
         ".pdf",
         ".doc",
@@ -0,0 +1,124 @@
+"""
+Local SQLite database (in data_dir) for indexes that spare us WebDAV round trips.
+Nextcloud stays the source of truth; losing this file only costs performance.
+
+SQLAlchemy Core with the synchronous sqlite driver; callers run queries via
+asyncio.to_thread. WAL mode lets several API workers read while one writes.
+"""
+from pathlib import Path
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    event,
+    inspect,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+
+metadata = MetaData()
+
+# SHA-256 of stored file contents → one remote path holding those bytes (deduplication)
+content_blobs = Table(
+    "content_blobs",
+    metadata,
+    Column("sha256", String(64), primary_key=True),
+    Column("path", String, nullable=False),
+    Column("size", BigInteger, nullable=False),
+    Column("stored_at", Float, nullable=False),
+)
+
+# One row per submission, written on finalize; serves /api/upload/status and /api/projects.
+# `metadata_json` is the metadata.json stored next to the files in Nextcloud.
+projects = Table(
+    "projects",
+    metadata,
+    Column("project_id", String, primary_key=True),
+    Column("project_title", String, nullable=False),
+    Column("project_type", String, nullable=False, index=True),
+    Column("institution", String, nullable=False, index=True),
+    Column("language", String, nullable=False),
+    Column("is_prospective_study", Boolean, nullable=False),
+    Column("uploaded_at", String, nullable=False, index=True),  # ISO 8601, sorts chronologically
+    Column("files_count", Integer, nullable=False),
+    Column("metadata_json", Text, nullable=False),
+    Column("indexed_at", Float),  # time.time() of the last write or revalidation; NULL: unknown
+)
+
+# Counters that survive restarts and are shared by all workers
+counters = Table(
+    "counters",
+    metadata,
+    Column("name", String, primary_key=True),
+    Column("value", BigInteger, nullable=False, default=0),
+)
+
+
+def create_db_engine(
+    path: Path,
+    schema: MetaData = metadata,
+    immediate_transactions: bool = False,
+    busy_timeout: float = 30.0,
+) -> Engine:
+    """
+    Engine for the SQLite file at `path`; creates the missing tables of `schema`.
+    With `immediate_transactions`, every transaction takes SQLite's write lock at
+    BEGIN, so read-then-write sequences are atomic across processes. `busy_timeout`
+    (seconds) bounds how long a statement waits for another process's lock.
+    """
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": busy_timeout},
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+        if immediate_transactions:
+            # Let SQLAlchemy's "begin" event issue BEGIN instead of the sqlite3 module
+            dbapi_connection.isolation_level = None
+
+    if immediate_transactions:
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(conn):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    schema.create_all(engine)
+    _add_missing_columns(engine, schema)
+    return engine
+
+
+def _add_missing_columns(engine: Engine, schema: MetaData) -> None:
+    """Add nullable columns introduced after a database file was created (no migrations otherwise)."""
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        statements = [
+            f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(dialect=engine.dialect)}'
+            for table in schema.sorted_tables
+            for column in table.columns
+            if column.nullable and column.name not in {c["name"] for c in inspector.get_columns(table.name)}
+        ]
+    for statement in statements:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(statement)
+        except OperationalError as e:
+            # Another worker starting at the same time added it first
+            if "duplicate column name" not in str(e.orig):
+                raise
+
+
+engine = create_db_engine(settings.data_path(settings.database_file))
@@ -1,8 +1,42 @@
 """
 Shared slowapi Limiter instance.
 Kept in its own module to avoid circular imports between main.py and routes.
+
+Counters live in shared storage (see settings.rate_limit_storage_uri), so a limit
+holds for the whole deployment rather than per worker process.
 """
 from slowapi import Limiter
-from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+from app.config import settings
+from app.utils import rate_limit_storage  # noqa: F401 – registers the sqlite:// storage scheme
+
+
+def client_address(request: Request) -> str:
+    """
+    Client IP as seen by the outermost trusted proxy: the entry that the last of
+    `trusted_proxy_count` proxies appended to X-Forwarded-For. Entries further left
+    are client-controlled and ignored.
+    """
+    hops = settings.trusted_proxy_count
+    forwarded = request.headers.get("x-forwarded-for")
+    if hops > 0 and forwarded:
+        addresses = [address.strip() for address in forwarded.split(",") if address.strip()]
+        if addresses:
+            return addresses[-min(hops, len(addresses))]
+    return request.client.host if request.client else "127.0.0.1"
+
+
+def _storage_uri() -> str:
+    if settings.rate_limit_storage_uri:
+        return settings.rate_limit_storage_uri
+    return f"sqlite:///{settings.data_path('rate_limits.db')}"
+
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=client_address,
+    storage_uri=_storage_uri(),
+    strategy="moving-window",
+    # Keep serving with per-process counters while a remote storage (Redis) is down
+    in_memory_fallback_enabled=True,
+)
@@ -1,6 +1,10 @@
+import atexit
+import functools
 import hmac
 import logging
+import queue
 from hashlib import sha256
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Iterable, MutableMapping, Optional
 
 import orjson
@@ -20,11 +24,34 @@ _DEFAULT_REDACT_KEYS = {
 }
 
 
+class _RedactionHasher:
+    """
+    HMAC-SHA256 with the key schedule computed once (copies of a keyed state) and
+    a bounded LRU cache of recent digests: the same paths and e-mail addresses
+    are hashed several times per upload. The cache holds at most `maxsize`
+    values that the process is handling anyway.
+    """
+
+    def __init__(self, secret: str, maxsize: int = 1024):
+        self._keyed = hmac.new(secret.encode("utf-8"), digestmod=sha256)
+        self.hexdigest = functools.lru_cache(maxsize=maxsize)(self._hexdigest)
+
+    def _hexdigest(self, value: str) -> str:
+        mac = self._keyed.copy()
+        mac.update(value.encode("utf-8"))
+        return mac.hexdigest()
+
+
+@functools.lru_cache(maxsize=4)
+def _redaction_hasher(secret: str) -> _RedactionHasher:
+    return _RedactionHasher(secret)
+
+
 def hmac_sha256_hex(value: str, secret: str) -> str:
     """
     Deterministic, non-reversible hash for limited PII logging.
     """
-    return hmac.new(secret.encode("utf-8"), value.encode("utf-8"), sha256).hexdigest()
+    return _redaction_hasher(secret).hexdigest(value)
 
 
 def _redact_processor(
@@ -39,6 +66,51 @@ def _redact_processor(
     return event_dict
 
 
+class _BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller: records arriving while the queue is
+    full are dropped and counted instead of waiting for the writer thread.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# Writer thread of the async logging mode (None in the default synchronous mode)
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_BoundedQueueHandler] = None
+
+
+def stop_logging() -> None:
+    """
+    Flush and stop the background writer of the async logging mode (no-op otherwise).
+    Later records are written synchronously by the same stream handler.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    if _queue_handler in root.handlers:
+        for handler in _listener.handlers:
+            handler.setFormatter(_queue_handler.formatter)
+            root.addHandler(handler)
+        root.removeHandler(_queue_handler)
+    _listener = None
+
+
+def dropped_log_records() -> int:
+    """Records discarded by the async logging mode because its queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
 def _orjson_dumps(value: Any, **_: Any) -> str:
     return orjson.dumps(value).decode("utf-8")
 
@@ -49,10 +121,15 @@ def configure_logging(
     env: str,
     log_level: str = "INFO",
     redact_keys: Optional[Iterable[str]] = None,
+    async_queue_size: int = 0,
 ) -> None:
     """
     Configure stdlib logging + structlog to emit JSON lines to stdout.
     Ensures uvicorn.* loggers use the same handler/formatter.
+
+    With async_queue_size > 0, records are rendered by the caller but written by a
+    background thread through a bounded queue of that size, so a slow stdout never
+    blocks the event loop; records beyond the queue size are dropped and counted.
     """
     level = getattr(logging, str(log_level).upper(), logging.INFO)
     redact_keys_set = set(redact_keys or _DEFAULT_REDACT_KEYS)
@@ -77,8 +154,21 @@ def configure_logging(
         foreign_pre_chain=pre_chain,
     )
 
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
+    global _listener, _queue_handler
+    stop_logging()
+    stream_handler = logging.StreamHandler()
+    if async_queue_size > 0:
+        # Rendering (incl. contextvars) stays in the calling thread; the writer only does I/O
+        _queue_handler = _BoundedQueueHandler(async_queue_size)
+        _queue_handler.setFormatter(formatter)
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        _listener = QueueListener(_queue_handler.queue, stream_handler)
+        _listener.start()
+        handler: logging.Handler = _queue_handler
+    else:
+        _queue_handler = None
+        stream_handler.setFormatter(formatter)
+        handler = stream_handler
 
     root = logging.getLogger()
     root.handlers.clear()
@@ -113,3 +203,6 @@ def configure_logging(
     # Bind global context fields.
     structlog.contextvars.bind_contextvars(service=service_name, env=env)
 
+
+
+atexit.register(stop_logging)
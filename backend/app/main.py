@@ -1,37 +1,104 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from app.limiter import limiter
 from app.config import settings
-from app.routes import upload, projects, health, token as token_route
-from app.logging_config import configure_logging
+from app import db
+from app.routes import upload, upload_session, projects, health, metrics, token as token_route
+from app.services.container import Services
+from app.logging_config import configure_logging, stop_logging
 from app.middleware.request_context import RequestContextMiddleware
 from app.middleware.security_headers import SecurityHeadersMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
 import structlog
 
 logger = structlog.get_logger(__name__)
 
-app = FastAPI(
-    title="Datenschutzportal API",
-    description="API für Datenschutz-Dokument Upload",
-    version="1.0.0"
-)
 
-# Rate limiter – keyed by client IP (OWASP A04 – Insecure Design)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+async def _warm_up(services: Services) -> None:
+    """
+    Open the connections the first upload needs: DNS, TCP and TLS to Nextcloud (the
+    health probe leaves the connection in the pool and fills the readiness cache)
+    and an authenticated SMTP session. Failures are logged, never fatal.
+    """
+    async def run(name: str, coro) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(coro, settings.startup_warm_up_timeout)
+            logger.info("warm_up_completed", target=name, duration_ms=int((time.perf_counter() - start) * 1000))
+        except Exception:
+            logger.warning("warm_up_failed", target=name, exc_info=True)
+
+    await asyncio.gather(
+        run("nextcloud", services.nextcloud_health.probe()),
+        run("smtp", services.email_service.warm_up()),
+    )
+
 
-@app.on_event("startup")
-async def _startup() -> None:
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Builds, starts and stops the services of this worker process (app.state.services,
+    unless already set there, e.g. by a test): connections are warmed up before the
+    first request, background tasks started, and everything is closed on shutdown in
+    reverse order.
+    """
     # Uvicorn configures logging after importing the app. We (re-)apply our structlog
     # configuration on startup to ensure uvicorn.* and app logs are JSON.
     configure_logging(
         service_name=settings.service_name,
         env=settings.env,
         log_level="DEBUG" if settings.api_debug else settings.log_level,
+        async_queue_size=settings.log_async_queue_size,
     )
-    logger.info("api_start")
+    async with AsyncExitStack() as stack:
+        stack.callback(stop_logging)
+        stack.callback(db.engine.dispose)
+        services = getattr(app.state, "services", None)
+        if services is None:
+            services = app.state.services = Services.from_settings(settings, db.engine)
+            stack.callback(delattr, app.state, "services")
+        stack.callback(services.validation_pipeline.shutdown)
+        stack.push_async_callback(services.nextcloud.aclose)
+        stack.push_async_callback(services.email_service.aclose)
+        if settings.startup_warm_up:
+            await _warm_up(services)
+        services.email_outbox.start()
+        stack.push_async_callback(services.email_outbox.stop)
+        services.nextcloud_health.start()
+        stack.push_async_callback(services.nextcloud_health.stop)
+        await services.session_store.purge_expired()
+        if settings.metrics_enabled and not settings.metrics_token:
+            logger.warning("metrics_disabled_without_token")
+        logger.info("api_start")
+        yield
+        logger.info("api_stop")
+
+
+app = FastAPI(
+    title="Datenschutzportal API",
+    description="API für Datenschutz-Dokument Upload",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Rate limiter – keyed by client IP (OWASP A04 – Insecure Design)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+# Request body limits, enforced while the body streams in (OWASP A04 – resource exhaustion).
+# Added first so 413 responses still get security headers and the request id.
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.max_request_size,
+    max_file_size=settings.max_file_size,
+)
 
 # Security headers (OWASP A05 – Security Misconfiguration)
 app.add_middleware(SecurityHeadersMiddleware)
@@ -44,15 +111,19 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=False,  # No cookies/credentials used; keeps CORS safe
-    allow_methods=["GET", "POST"],
+    allow_methods=["GET", "POST", "PUT"],  # PUT: per-file session uploads
     allow_headers=["Authorization", "Content-Type", "X-Request-ID"],
 )
 
 # Routes
 app.include_router(token_route.router, prefix="/api", tags=["auth"])
 app.include_router(upload.router, prefix="/api", tags=["upload"])
+app.include_router(upload_session.router, prefix="/api", tags=["upload"])
 app.include_router(projects.router, prefix="/api", tags=["projects"])
 app.include_router(health.router, prefix="/api", tags=["health"])
+# Top level, where Prometheus expects it; not part of the public API. Answers 404
+# unless METRICS_ENABLED and METRICS_TOKEN are both set (see verify_metrics_access).
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
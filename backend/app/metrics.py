@@ -0,0 +1,272 @@
+"""
+In-process metrics in the Prometheus text exposition format (served on /metrics).
+
+Deliberately tiny instead of pulling in prometheus_client: counters, gauges and
+histograms with fixed label names, updated with plain dict/list operations on
+the event loop. Values are per process and all workers share one socket, so a
+scrape cannot choose its worker: app.serve only allows metrics with one worker.
+"""
+import functools
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Seconds; covers fast cache hits up to multi-minute chunked uploads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+# Escaping of label values required by the exposition format
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value.translate(_LABEL_ESCAPES)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        REGISTRY.register(self)
+
+    def labels(self, *values: str):
+        """Child for one label combination; keep a reference on hot paths."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Value holder for one label combination."""
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Sample lines of all children in the exposition format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        self.value += 1
+        try:
+            yield
+        finally:
+            self.value -= 1
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterator[str]:
+        for key, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * len(upper_bounds)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Non-cumulative counts per bucket; made cumulative when rendering
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.upper_bounds = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterator[str]:
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render_value(name: str, metric_type: str, documentation: str, value: float) -> str:
+    """One unlabeled sample for values read at scrape time (e.g. from the database)."""
+    return f"# HELP {name} {documentation}\n# TYPE {name} {metric_type}\n{name} {_format_value(value)}\n"
+
+
+def observe_async(histogram: Histogram, in_flight: Gauge, operation: str) -> Callable[[F], F]:
+    """Decorator: time an async function into `histogram` and count it in `in_flight`."""
+    timer = histogram.labels(operation)
+    gauge = in_flight.labels(operation)
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with gauge.track_inprogress(), timer.time():
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+# --- Metrics of this application -------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "datenschutzportal_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+UPLOAD_STAGE_SECONDS = Histogram(
+    "datenschutzportal_upload_stage_duration_seconds",
+    "Time spent in each stage of an upload request",
+    ("stage",),
+)
+UPLOADS_IN_FLIGHT = Gauge(
+    "datenschutzportal_uploads_in_flight",
+    "Upload requests currently being processed",
+)
+UPLOAD_RECEIVED_BYTES = Counter(
+    "datenschutzportal_upload_received_bytes_total",
+    "Bytes of uploaded files accepted from clients",
+)
+NEXTCLOUD_SECONDS = Histogram(
+    "datenschutzportal_nextcloud_operation_duration_seconds",
+    "Latency of NextcloudService operations",
+    ("operation",),
+)
+NEXTCLOUD_IN_FLIGHT = Gauge(
+    "datenschutzportal_nextcloud_operations_in_flight",
+    "NextcloudService operations currently running",
+    ("operation",),
+)
+NEXTCLOUD_UPLOADED_BYTES = Counter(
+    "datenschutzportal_nextcloud_uploaded_bytes_total",
+    "Bytes of file content sent to Nextcloud",
+)
+NEXTCLOUD_METADATA_CACHE = Counter(
+    "datenschutzportal_nextcloud_metadata_cache_total",
+    "metadata.json reads answered from cache (304) or downloaded",
+    ("result",),
+)
+EMAIL_SECONDS = Histogram(
+    "datenschutzportal_email_operation_duration_seconds",
+    "Latency of EmailService operations (template rendering plus SMTP)",
+    ("operation",),
+)
+EMAIL_IN_FLIGHT = Gauge(
+    "datenschutzportal_email_operations_in_flight",
+    "EmailService operations currently running",
+    ("operation",),
+)
+VALIDATION_CACHE = Counter(
+    "datenschutzportal_validation_cache_total",
+    "File content validations answered from the digest cache (hit), joined to a run in progress (joined) or run (miss)",
+    ("result",),
+)
+VALIDATION_QUEUE_DEPTH = Gauge(
+    "datenschutzportal_validation_queue_depth",
+    "Files waiting for or running in the validation pool",
+)
+VALIDATION_REJECTED = Counter(
+    "datenschutzportal_validation_rejected_total",
+    "Uploads turned away by validation, by reason",
+    ("reason",),
+)
@@ -0,0 +1,197 @@
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import structlog
+from fastapi import HTTPException
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.validation import MAGIC_HEADER_SIZE
+
+logger = structlog.get_logger(__name__)
+
+_STATE_KEY = "uploaded_parts"
+
+
+@dataclass
+class UploadedPart:
+    """What the middleware saw of one multipart file part while it streamed in."""
+
+    field_name: str
+    filename: str
+    size: int = 0
+    header: bytes = b""
+    sha256: str = ""
+
+
+def uploaded_parts(request: Request, field_name: str) -> Optional[List[UploadedPart]]:
+    """File parts of `field_name` in request order, or None if the body was not inspected."""
+    parts = request.scope.get("state", {}).get(_STATE_KEY)
+    if parts is None:
+        return None
+    return [part for part in parts if part.field_name == field_name]
+
+
+class _MultipartInspector:
+    """
+    Follows the multipart stream alongside Starlette's parser: raises as soon as
+    one part (i.e. one file) grows beyond `max_part_size`, and records size,
+    leading bytes and SHA-256 of every file part, so the upload route needs no
+    further pass over the data to validate and checksum it.
+    """
+
+    def __init__(self, boundary: bytes, max_part_size: int):
+        self.max_part_size = max_part_size
+        self.parts: List[UploadedPart] = []
+        self._part_size = 0
+        self._current: Optional[UploadedPart] = None
+        self._hasher = None
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._parser = MultipartParser(
+            boundary,
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def feed(self, data: bytes) -> None:
+        self._parser.write(data)
+
+    def _on_part_begin(self) -> None:
+        self._part_size = 0
+        self._current = None
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"filename" in options:
+            self._current = UploadedPart(
+                field_name=options.get(b"name", b"").decode("utf-8", "replace"),
+                filename=options[b"filename"].decode("utf-8", "replace"),
+            )
+            self._hasher = hashlib.sha256()
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._part_size += end - start
+        if self._part_size > self.max_part_size:
+            raise _too_large(f"File exceeds maximum size of {self.max_part_size // (1024 * 1024)} MB")
+        if self._current is not None:
+            view = memoryview(data)[start:end]
+            self._hasher.update(view)
+            missing = MAGIC_HEADER_SIZE - len(self._current.header)
+            if missing > 0:
+                self._current.header += bytes(view[:missing])
+
+    def _on_part_end(self) -> None:
+        if self._current is not None:
+            self._current.size = self._part_size
+            self._current.sha256 = self._hasher.hexdigest()
+            self.parts.append(self._current)
+            self._current = None
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects oversized request bodies with 413 while they stream in, instead of
+    after Starlette has parsed and spooled the whole multipart body:
+
+    - a declared Content-Length above `max_body_size` is refused before reading;
+    - otherwise the body is counted as the application receives it, and a
+      multipart part (file) above `max_file_size` aborts parsing right away.
+
+    File parts are hashed on the way (see uploaded_parts()).
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, max_file_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.max_file_size = max_file_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            logger.warning(
+                "request_body_rejected",
+                path=scope["path"],
+                content_length=int(content_length),
+                max_size=self.max_body_size,
+            )
+            response = JSONResponse(
+                {"detail": f"Request body exceeds maximum size of {self.max_body_size // (1024 * 1024)} MB"},
+                status_code=413,
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        inspector = self._multipart_inspector(headers.get("content-type", ""))
+        if inspector is not None:
+            # Exposed to the route via uploaded_parts(request)
+            scope.setdefault("state", {})[_STATE_KEY] = inspector.parts
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received, inspector
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                if received > self.max_body_size:
+                    logger.warning("request_body_rejected", path=scope["path"], received=received, max_size=self.max_body_size)
+                    raise _too_large(
+                        f"Request body exceeds maximum size of {self.max_body_size // (1024 * 1024)} MB"
+                    )
+                if inspector is not None:
+                    try:
+                        inspector.feed(body)
+                    except HTTPException:
+                        logger.warning("request_file_rejected", path=scope["path"], received=received, max_size=self.max_file_size)
+                        raise
+                    except MultipartParseError:
+                        # Malformed bodies are Starlette's to reject; stop following this one
+                        scope["state"].pop(_STATE_KEY, None)
+                        inspector = None
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _multipart_inspector(self, content_type: str) -> Optional[_MultipartInspector]:
+        mime, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if mime != b"multipart/form-data" or not boundary:
+            return None
+        return _MultipartInspector(boundary, self.max_file_size)
@@ -1,46 +1,77 @@
 import time
 import uuid
-from typing import Callable
 
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import HTTP_REQUEST_SECONDS
 
 logger = structlog.get_logger(__name__)
 
 
-def _get_or_create_request_id(request: Request) -> str:
-    incoming = request.headers.get("x-request-id")
+def _get_or_create_request_id(scope: Scope) -> str:
+    incoming = Headers(scope=scope).get("x-request-id")
     return incoming.strip() if incoming else str(uuid.uuid4())
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = _get_or_create_request_id(request)
+def _route_template(scope: Scope) -> str:
+    """
+    Path with matched path parameters put back as placeholders (/api/upload/status/{project_id}).
+    Keeps the metrics series count bounded; independent of how routers store their prefix.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    values = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(
+        f"{{{values[segment]}}}" if segment in values else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+class RequestContextMiddleware:
+    """
+    Binds the request id to structlog's contextvars, returns it as X-Request-ID
+    and logs/measures every request. Plain ASGI middleware, so streamed bodies
+    pass through without the task and queue wrapping of BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _get_or_create_request_id(scope)
+        header = (b"x-request-id", request_id.encode("latin-1", "replace"))
         structlog.contextvars.bind_contextvars(request_id=request_id)
 
         start = time.perf_counter()
+        # Read by routes that time their own stages (request.state.started_at)
+        scope.setdefault("state", {})["started_at"] = start
         status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [(name, value) for name, value in message.get("headers", ()) if name.lower() != b"x-request-id"]
+                headers.append(header)
+                message["headers"] = headers
+            await send(message)
+
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
-            duration_ms = int((time.perf_counter() - start) * 1000)
-            # Ensure response always has the ID (if response exists).
-            try:
-                if "response" in locals():
-                    response.headers["X-Request-ID"] = request_id
-            except Exception:
-                pass
-
+            duration = time.perf_counter() - start
+            HTTP_REQUEST_SECONDS.labels(scope["method"], _route_template(scope), status_code).observe(duration)
             logger.info(
                 "request_completed",
-                method=request.method,
-                path=request.url.path,
+                method=scope["method"],
+                path=scope["path"],
                 status_code=status_code,
-                duration_ms=duration_ms,
+                duration_ms=int(duration * 1000),
             )
             structlog.contextvars.unbind_contextvars("request_id")
-
@@ -1,35 +1,51 @@
-from typing import Callable
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Static header set, encoded once; appended to every response start message.
+_SECURITY_HEADERS = [
+    # Prevent MIME type sniffing (CWE-16)
+    (b"x-content-type-options", b"nosniff"),
+    # Prevent clickjacking (CWE-693)
+    (b"x-frame-options", b"DENY"),
+    # Enable XSS protection in older browsers (defence-in-depth)
+    (b"x-xss-protection", b"1; mode=block"),
+    # Restrict referrer information leakage
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    # Disable caching for API responses containing sensitive data
+    (b"cache-control", b"no-store"),
+    (b"pragma", b"no-cache"),
+    # Content-Security-Policy for the API (no HTML served directly)
+    (b"content-security-policy", b"default-src 'none'; frame-ancestors 'none'"),
+]
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in _SECURITY_HEADERS)
+
+
+class SecurityHeadersMiddleware:
     """
     Adds HTTP security headers to every response.
     Addresses OWASP A05:2021 – Security Misconfiguration.
-    """
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-
-        # Prevent MIME type sniffing (CWE-16)
-        response.headers["X-Content-Type-Options"] = "nosniff"
 
-        # Prevent clickjacking (CWE-693)
-        response.headers["X-Frame-Options"] = "DENY"
-
-        # Enable XSS protection in older browsers (defence-in-depth)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Restrict referrer information leakage
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Disable caching for API responses containing sensitive data
-        response.headers["Cache-Control"] = "no-store"
-        response.headers["Pragma"] = "no-cache"
-
-        # Content-Security-Policy for the API (no HTML served directly)
-        response.headers["Content-Security-Policy"] = "default-src 'none'; frame-ancestors 'none'"
+    Plain ASGI middleware: headers are added to the response start message, the
+    body is passed through untouched (no buffering of streamed responses).
+    """
 
-        return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Our values replace any the route may have set
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", ())
+                    if name.lower() not in _SECURITY_HEADER_NAMES
+                ]
+                headers.extend(_SECURITY_HEADERS)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
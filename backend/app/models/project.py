@@ -1,5 +1,18 @@
 from pydantic import BaseModel
+from typing import List
 
-class Project(BaseModel):
-    # Placeholder for project model
-    pass
+class ProjectSummary(BaseModel):
+    project_id: str
+    project_title: str
+    project_type: str
+    institution: str
+    language: str
+    is_prospective_study: bool
+    uploaded_at: str
+    files_count: int
+
+class ProjectList(BaseModel):
+    total: int
+    limit: int
+    offset: int
+    items: List[ProjectSummary]
@@ -41,3 +41,33 @@ class UploadResponse(BaseModel):
     timestamp: datetime
     files_uploaded: int
     message: str
+
+class UploadSessionCreate(BaseModel):
+    email: str
+    uploader_name: Optional[str] = None
+    project_title: str
+    institution: str
+    is_prospective_study: bool = False
+    project_details: Optional[str] = None
+    project_type: str = "new"
+    language: str = "de"
+
+class UploadSessionResponse(BaseModel):
+    session_id: str
+    project_id: str
+    # JWT scoped to this session; required for the file and finalize calls
+    upload_token: str
+    expires_at: datetime
+
+class UploadedFileInfo(BaseModel):
+    filename: str
+    category: str
+    path: str
+    size: int
+    sha256: str
+
+class UploadSessionStatus(BaseModel):
+    session_id: str
+    project_id: str
+    expires_at: datetime
+    files: List[UploadedFileInfo]
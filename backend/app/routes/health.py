@@ -1,7 +1,36 @@
-from fastapi import APIRouter
+import structlog
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from app.services.container import Services, get_services
+
+logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
+    """
+    Liveness: the API process is up. Does not depend on Nextcloud, so a Nextcloud
+    outage does not get the container restarted.
+    """
     return {"status": "ok"}
+
+@router.get("/health/ready")
+async def readiness_check(services: Services = Depends(get_services)):
+    """
+    Readiness: reports the cached result of the background Nextcloud probe.
+    Returns 503 while Nextcloud is unreachable or has not been probed yet; the
+    reason is logged, not returned (it may contain hosts or error details).
+    """
+    status = services.nextcloud_health.status
+    ready = bool(status.ok)
+    if not ready:
+        logger.warning("readiness_check_failed", reason=status.message)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ok" if ready else "unavailable",
+            "nextcloud": status.as_dict(),
+        },
+    )
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+import structlog
+
+from app.logging_config import dropped_log_records
+from app.metrics import REGISTRY, render_value
+from app.services.container import Services, get_services
+from app.utils.auth import verify_metrics_access
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter()
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_access)])
+async def metrics(services: Services = Depends(get_services)):
+    """
+    Metrics of this worker process plus deduplication counters shared by all workers
+    (read from the local database at scrape time).
+    """
+    body = [REGISTRY.render()]
+    try:
+        stats = await services.content_index.stats()
+        body.append(render_value(
+            "datenschutzportal_dedup_hits_total", "counter",
+            "Files copied server-side instead of uploaded (all workers)", stats["dedup_hits"],
+        ))
+        body.append(render_value(
+            "datenschutzportal_dedup_misses_total", "counter",
+            "Files uploaded because no identical content was stored (all workers)", stats["dedup_misses"],
+        ))
+        body.append(render_value(
+            "datenschutzportal_dedup_saved_bytes_total", "counter",
+            "Bytes not uploaded thanks to deduplication (all workers)", stats["dedup_bytes_saved"],
+        ))
+    except Exception:
+        logger.warning("content_index_unavailable", exc_info=True)
+    body.append(render_value(
+        "datenschutzportal_nextcloud_metadata_cache_entries", "gauge",
+        "metadata.json files currently cached with their ETag",
+        services.nextcloud.metadata_cache_stats()["size"],
+    ))
+    body.append(render_value(
+        "datenschutzportal_log_records_dropped_total", "counter",
+        "Log records discarded because the async logging queue was full",
+        dropped_log_records(),
+    ))
+    return PlainTextResponse("".join(body), media_type=CONTENT_TYPE)
@@ -1,7 +1,38 @@
-from fastapi import APIRouter
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.models.project import ProjectList
+from app.services.container import Services, get_services
+from app.services.project_index import ProjectQuery
+from app.utils.auth import verify_admin_token
 
 router = APIRouter()
 
-@router.get("/")
-async def list_projects():
-    return []
+@router.get("/projects", response_model=ProjectList, dependencies=[Depends(verify_admin_token)])
+async def list_projects(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    project_type: Optional[Literal["new", "existing"]] = None,
+    institution: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=200, description="Substring of project title or id"),
+    uploaded_after: Optional[date] = None,
+    uploaded_before: Optional[date] = None,
+    services: Services = Depends(get_services),
+):
+    """
+    Submitted projects, newest first, served from the local project index.
+    Admin only: the listing exposes every project id (see verify_admin_token).
+    """
+    query = ProjectQuery(
+        limit=limit,
+        offset=offset,
+        project_type=project_type,
+        institution=institution,
+        search=q,
+        uploaded_after=uploaded_after.isoformat() if uploaded_after else None,
+        uploaded_before=uploaded_before.isoformat() if uploaded_before else None,
+    )
+    page = await services.project_index.query(query)
+    return ProjectList(total=page["total"], limit=limit, offset=offset, items=page["items"])
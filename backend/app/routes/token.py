@@ -18,46 +18,16 @@ The static API token never needs to be used for upload directly; it is only
 used once to obtain the upload token.  Rate limiting on this endpoint prevents
 token-farming.
 """
-from datetime import datetime, timezone, timedelta
 from fastapi import APIRouter, Depends, Request
-import jwt
 
 from app.config import settings
 from app.limiter import limiter
 from app.utils.auth import verify_token
+from app.utils.tokens import create_upload_token
 
 router = APIRouter()
 
 
-def create_upload_token() -> str:
-    """Issue a short-lived JWT granting permission to perform one upload batch."""
-    now = datetime.now(timezone.utc)
-    payload = {
-        "iss": "datenschutzportal",
-        "aud": "upload",
-        "iat": now,
-        "exp": now + timedelta(seconds=settings.upload_token_ttl_seconds),
-    }
-    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
-
-
-def verify_upload_token(token: str) -> bool:
-    """
-    Validate an upload session token.
-    Returns True if valid, False otherwise.
-    """
-    try:
-        jwt.decode(
-            token,
-            settings.secret_key,
-            algorithms=[settings.algorithm],
-            audience="upload",
-        )
-        return True
-    except jwt.PyJWTError:
-        return False
-
-
 @router.get(
     "/upload-token",
     summary="Issue a short-lived upload token",
@@ -1,61 +1,28 @@
 from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException, Depends
 from pydantic import EmailStr, TypeAdapter
 from typing import List, Optional
-from app.services.nextcloud import NextcloudService
-from app.services.email_service import EmailService
+from app.services.container import Services, get_services
+from app.services.validation import MAGIC_HEADER_SIZE, FileCandidate, FileRejected, ValidationBusy
 from app.models.upload import UploadResponse
 from app.config import settings
 from app.utils.auth import verify_token
+from app.utils.upload_request import UploadRoute
 from app.limiter import limiter
+from app.middleware.body_limit import uploaded_parts
+from app.metrics import UPLOAD_RECEIVED_BYTES, UPLOAD_STAGE_SECONDS, UPLOADS_IN_FLIGHT
 from datetime import datetime
-import filetype
+import asyncio
+import hashlib
 import os
 import json
 import re
+import time
 import structlog
 
 from app.logging_config import hmac_sha256_hex
 
 _email_adapter = TypeAdapter(EmailStr)
 
-# Mapping of allowed file extensions to permitted MIME types (magic-bytes check).
-# Prevents extension spoofing (CWE-434 / OWASP A01).
-_ALLOWED_MIME_BY_EXT: dict[str, set[str]] = {
-    ".pdf":  {"application/pdf"},
-    ".doc":  {"application/msword"},
-    ".docx": {"application/vnd.openxmlformats-officedocument.wordprocessingml.document"},
-    ".odt":  {"application/vnd.oasis.opendocument.text"},
-    ".ods":  {"application/vnd.oasis.opendocument.spreadsheet"},
-    ".odp":  {"application/vnd.oasis.opendocument.presentation"},
-    ".odf":  {"application/vnd.oasis.opendocument.formula"},
-    ".zip":  {"application/zip"},
-    ".png":  {"image/png"},
-    ".jpg":  {"image/jpeg"},
-    ".jpeg": {"image/jpeg"},
-    ".xlsx": {"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
-    ".csv":  {"text/plain", "text/csv", "application/csv"},
-}
-
-
-def _check_magic_bytes(data: bytes, extension: str) -> bool:
-    """
-    Verify that the file's magic bytes match the declared extension.
-    Returns True if valid, False if the content type does not match.
-    CSV files have no unique magic bytes and are allowed through as-is.
-    """
-    allowed_mimes = _ALLOWED_MIME_BY_EXT.get(extension)
-    if allowed_mimes is None:
-        return False
-    # CSV: no magic bytes – trust the extension (size/content limits still apply)
-    if extension == ".csv":
-        return True
-    kind = filetype.guess(data)
-    if kind is None:
-        # filetype couldn't detect – only allow CSV (handled above) and plain text
-        return False
-    return kind.mime in allowed_mimes
-
-
 def _sanitize_filename(filename: str) -> str:
     """
     Sanitize an uploaded filename to prevent path traversal (CWE-22 / OWASP A01).
@@ -75,9 +42,367 @@ def _sanitize_filename(filename: str) -> str:
 
 logger = structlog.get_logger(__name__)
 
-router = APIRouter()
-nextcloud = NextcloudService()
-email_service = EmailService()
+# Multipart uploads spool files per upload_spool_max_size / upload_spool_dir
+router = APIRouter(route_class=UploadRoute)
+
+
+async def _store_file(services: Services, file: UploadFile, file_path: str, sha256: Optional[str]) -> bool:
+    """
+    Put `file` at `file_path`. If identical content (same SHA-256 and size) is already
+    stored in Nextcloud, it is copied server-side instead of uploaded again.
+    """
+    content_index = services.content_index
+    dedup = settings.upload_dedup_enabled and sha256 is not None and file.size is not None
+    if dedup:
+        try:
+            known = await content_index.lookup(sha256)
+            if known is not None and known[0] != file_path and known[1] == file.size:
+                source_path = known[0]
+                if await services.nextcloud.copy_file(source_path, file_path, file.size, sha256):
+                    await content_index.count_hit(file.size)
+                    logger.info("file_deduplicated", bytes_saved=file.size)
+                    return True
+                # Source was deleted or modified since it was indexed
+                await content_index.forget(sha256, source_path)
+            await content_index.count_miss()
+        except Exception:
+            # The index is an optimization only; never fail an upload because of it
+            logger.warning("content_index_unavailable", exc_info=True)
+
+    if not await services.nextcloud.upload_file(file, file_path, sha256=sha256):
+        return False
+    if dedup:
+        try:
+            await content_index.record(sha256, file_path, file.size)
+        except Exception:
+            logger.warning("content_index_unavailable", exc_info=True)
+    return True
+
+
+async def _upload_files(
+    services: Services,
+    files: List[UploadFile],
+    project_path: str,
+    project_id: str,
+    categories_map: dict,
+    digests: Optional[List[str]] = None,
+) -> List[dict]:
+    """
+    Upload all files of a submission concurrently, at most settings.upload_concurrency at a time.
+    `digests` are the SHA-256 hex digests of `files`, sent as OC-Checksum and recorded in the result.
+    The result keeps the order of `files`. The first failure cancels the remaining uploads
+    and is re-raised (fail fast).
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.upload_concurrency))
+    # Set on the first failure so uploads still waiting for the semaphore never start
+    failed = asyncio.Event()
+
+    async def upload_one(idx: int, file: UploadFile, sha256: Optional[str]) -> Optional[dict]:
+        # Sanitize the filename to prevent path traversal on the remote storage (OWASP A01 / CWE-22)
+        safe_name = _sanitize_filename(file.filename or "upload")
+        category = categories_map.get(file.filename, categories_map.get(safe_name, "sonstiges"))
+        # Upload directly to project folder, no category subfolders
+        file_path = f"{project_path}/{safe_name}"
+        async with semaphore:
+            if failed.is_set():
+                # Skipped: another upload failed, and gather re-raises that failure
+                return None
+            logger.debug("file_uploading", project_id=project_id, index=idx, total=len(files), category=category)
+            if not await _store_file(services, file, file_path, sha256):
+                failed.set()
+                logger.error("file_upload_failed", project_id=project_id, category=category)
+                raise HTTPException(status_code=500, detail=f"Failed to upload file: {safe_name}")
+        file_info = {
+            "filename": safe_name,
+            "category": category,
+            "path": file_path,
+            "size": file.size,
+        }
+        if sha256:
+            file_info["sha256"] = sha256
+        return file_info
+
+    if digests is None:
+        digests = [None] * len(files)
+    tasks = [
+        asyncio.create_task(upload_one(idx, file, sha256))
+        for idx, (file, sha256) in enumerate(zip(files, digests), 1)
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return [info for info in results if info is not None]
+
+
+def _validate_submission(email: str, project_type: str, language: str) -> str:
+    """Validate the submitter fields shared by all upload routes; returns the normalized e-mail."""
+    # Validate email format (OWASP A03 – Injection / input validation)
+    try:
+        email = _email_adapter.validate_python(email)
+    except Exception:
+        raise HTTPException(status_code=422, detail="Invalid email address")
+
+    # Restrict project_type to known values to prevent unexpected behaviour
+    if project_type not in ("new", "existing"):
+        raise HTTPException(status_code=422, detail="Invalid project_type")
+
+    # Restrict language to known values
+    if language not in ("de", "en"):
+        raise HTTPException(status_code=422, detail="Invalid language")
+    return email
+
+
+def _build_project_id(project_title: str, project_type: str) -> str:
+    # Sanitize project title for folder name
+    # Replace non-alphanumeric characters (except spaces, dashes, underscores) with underscore
+    safe_title = re.sub(r'[^a-zA-Z0-9 \-_]', '_', project_title)
+    # Replace spaces with underscores
+    safe_title = safe_title.replace(' ', '_')
+    # Remove multiple underscores
+    safe_title = re.sub(r'_+', '_', safe_title)
+    # Trim underscores
+    safe_title = safe_title.strip('_')
+
+    date_str = datetime.now().strftime('%Y-%m-%d')
+
+    if project_type == 'existing':
+        folder_name = f"RE_{safe_title}_{date_str}"
+    else:
+        folder_name = f"{safe_title}_{date_str}"
+
+    # Use folder_name as project_id for consistency with storage
+    return folder_name
+
+
+def _check_file_limits(file: UploadFile) -> str:
+    """Check size and extension of one uploaded file (raises HTTPException); returns the extension."""
+    if file.size is not None and file.size > settings.max_file_size:
+        logger.warning("file_too_large", file_size=file.size, max_size=settings.max_file_size)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File {file.filename} exceeds maximum size of {settings.max_file_size // (1024 * 1024)} MB"
+        )
+
+    # Sanitize filename before extension check to prevent path traversal (OWASP A01 / CWE-22)
+    safe_name = _sanitize_filename(file.filename or "upload")
+    file_ext = os.path.splitext(safe_name)[1].lower()
+    if file_ext not in settings.allowed_file_types:
+        logger.warning("file_extension_disallowed", file_extension=file_ext)
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type {file_ext} not allowed"
+        )
+    return file_ext
+
+
+async def _validate_content(
+    services: Services,
+    file: UploadFile,
+    file_ext: str,
+    header: Optional[bytes] = None,
+    sha256: Optional[str] = None,
+) -> None:
+    """
+    Run the validation pipeline (magic bytes, archive inspection, ...) on one file.
+    `header` are the file's leading bytes if already known; `sha256` enables the result cache.
+    """
+    if header is None:
+        header = await file.read(MAGIC_HEADER_SIZE)
+        await file.seek(0)
+    candidate = FileCandidate(extension=file_ext, size=file.size, header=header, file=file.file)
+    try:
+        await services.validation_pipeline.validate(candidate, sha256)
+    except FileRejected as e:
+        logger.warning("file_content_rejected", file_extension=file_ext, reason=e.reason)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ValidationBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="File validation is busy, please retry shortly",
+            headers={"Retry-After": str(settings.validation_retry_after)},
+        )
+
+
+async def _validate_contents(
+    services: Services,
+    files: List[UploadFile],
+    extensions: List[str],
+    headers: Optional[List[bytes]],
+    digests: List[Optional[str]],
+) -> None:
+    """
+    Validate the files of one submission concurrently, but with at most as many of them
+    in the pipeline as it has workers: validation_max_pending bounds files across
+    requests, so a large submission must not fill the queue on its own (and get 503).
+    """
+    pipeline = services.validation_pipeline
+    slots = asyncio.Semaphore(max(1, min(pipeline.max_workers, pipeline.max_pending)))
+
+    async def validate_one(idx: int) -> None:
+        async with slots:
+            await _validate_content(services, files[idx], extensions[idx], headers[idx] if headers else None, digests[idx])
+
+    await asyncio.gather(*(validate_one(idx) for idx in range(len(files))))
+
+
+async def _validate_file(
+    services: Services, file: UploadFile, header: Optional[bytes] = None, sha256: Optional[str] = None
+) -> None:
+    """
+    Check size, extension and content of one uploaded file (raises HTTPException).
+    `header` are the file's leading bytes if already known; otherwise they are read from `file`.
+    """
+    file_ext = _check_file_limits(file)
+    await _validate_content(services, file, file_ext, header, sha256)
+
+
+async def _file_sha256(file: UploadFile) -> str:
+    """SHA-256 (hex) of a spooled UploadFile, computed in a worker thread."""
+
+    def digest() -> str:
+        file.file.seek(0)
+        hasher = hashlib.sha256()
+        for block in iter(lambda: file.file.read(settings.upload_stream_chunk_size), b""):
+            hasher.update(block)
+        file.file.seek(0)
+        return hasher.hexdigest()
+
+    return await asyncio.to_thread(digest)
+
+
+async def _create_project_folder(services: Services, project_id: str) -> str:
+    """Create the Nextcloud folder of a submission and return its path."""
+    project_path = f"{settings.nextcloud_base_path}/{project_id}"
+    logger.info("nextcloud_project_folder_creating", project_id=project_id)
+
+    # Fail fast if the (cached) health probe says Nextcloud is unreachable
+    connection_ok, connection_msg = await services.nextcloud_health.ensure_available()
+    if not connection_ok:
+        logger.error("nextcloud_connection_failed", project_id=project_id)
+        raise HTTPException(
+            status_code=503,
+            detail=f"Nextcloud connection failed. Please check Nextcloud configuration and credentials. Error: {connection_msg}"
+        )
+
+    if not await services.nextcloud.create_folder(project_path):
+        logger.error("nextcloud_project_folder_create_failed", project_id=project_id)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create project folder in Nextcloud at path: {project_path}. Please check Nextcloud permissions and ensure the base path exists."
+        )
+    return project_path
+
+
+async def _finalize_submission(
+    services: Services,
+    project_id: str,
+    project_path: str,
+    submission: dict,
+    uploaded_files: List[dict],
+) -> None:
+    """
+    Write metadata.json and README.md into the project folder and queue the e-mails.
+    `submission` holds the form fields (email, uploader_name, project_title, ...).
+    """
+    email = submission["email"]
+    uploader_name = submission.get("uploader_name")
+    project_title = submission["project_title"]
+    project_details = submission.get("project_details")
+    institution = submission["institution"]
+    project_type = submission["project_type"]
+    language = submission["language"]
+
+    # Create metadata file
+    logger.debug("metadata_creating", project_id=project_id)
+    metadata = {
+        "project_id": project_id,
+        "email": email,
+        "uploader_name": uploader_name,
+        "project_title": project_title,
+        "project_details": project_details,
+        "institution": institution,
+        "is_prospective_study": submission["is_prospective_study"],
+        "upload_timestamp": datetime.now().isoformat(),
+        "files": uploaded_files,
+        "project_type": project_type,
+        "language": language
+    }
+
+    metadata_path = f"{project_path}/metadata.json"
+    with UPLOAD_STAGE_SECONDS.labels("metadata").time():
+        if not await services.nextcloud.upload_metadata(metadata, metadata_path):
+            logger.error("metadata_upload_failed", project_id=project_id)
+            raise HTTPException(status_code=500, detail="Failed to upload metadata")
+
+    # Local index for /api/upload/status and /api/projects; Nextcloud remains the source of truth
+    try:
+        with UPLOAD_STAGE_SECONDS.labels("project_index").time():
+            await services.project_index.upsert(metadata)
+    except Exception:
+        logger.warning("project_index_update_failed", project_id=project_id, exc_info=True)
+
+    # Create README.md
+    logger.debug("readme_creating", project_id=project_id)
+    readme_content = f"""# {project_title}
+
+**Projekt-ID:** {project_id}
+**Datum:** {datetime.now().strftime('%d.%m.%Y %H:%M')}
+**Typ:** {'Nachreichung' if project_type == 'existing' else 'Neueinreichung'}
+
+## Kontaktinformationen
+- **Name:** {uploader_name if uploader_name else 'Nicht angegeben'}
+- **E-Mail:** {email}
+- **Institution:** {institution}
+
+## Projektdetails
+{project_details if project_details else 'Keine weiteren Details angegeben.'}
+
+## Hochgeladene Dateien
+"""
+
+    for file_info in uploaded_files:
+        readme_content += f"- **{file_info['category']}:** {file_info['filename']}\n"
+
+    readme_path = f"{project_path}/README.md"
+    with UPLOAD_STAGE_SECONDS.labels("readme").time():
+        if not await services.nextcloud.upload_content(readme_content, readme_path):
+            logger.error("readme_upload_failed", project_id=project_id)
+            raise HTTPException(status_code=500, detail="Failed to upload README.md")
+
+    # Queue confirmation email to user and notification to team; the outbox worker
+    # sends them in the background so SMTP latency does not delay the response.
+    try:
+        with UPLOAD_STAGE_SECONDS.labels("queue_emails").time():
+            await services.email_outbox.enqueue(
+                "confirmation",
+                to_email=email,
+                project_id=project_id,
+                project_title=project_title,
+                uploader_name=uploader_name,
+                files=uploaded_files,
+                project_type=project_type,
+                language=language
+            )
+            await services.email_outbox.enqueue(
+                "team_notification",
+                project_id=project_id,
+                project_title=project_title,
+                uploader_email=email,
+                file_names=[f["filename"] for f in uploaded_files],
+            )
+        logger.info(
+            "emails_queued",
+            project_id=project_id,
+            email_hash=hmac_sha256_hex(email, settings.log_redaction_secret),
+        )
+    except Exception:
+        logger.error("emails_queue_failed", project_id=project_id, exc_info=True)
+        # Don't fail the upload if email fails
+
 
 @router.post("/upload", response_model=UploadResponse, dependencies=[Depends(verify_token)])
 @limiter.limit("10/hour")  # Rate limit: max 10 uploads per IP per hour (OWASP A04)
@@ -92,24 +417,19 @@ async def upload_documents(
     files: List[UploadFile] = File(...),
     file_categories: str = Form(None),
     project_type: str = Form("new"),
-    language: str = Form("de")
+    language: str = Form("de"),
+    services: Services = Depends(get_services),
 ):
     """
     Upload data protection documents to Nextcloud
     """
-    # Validate email format (OWASP A03 – Injection / input validation)
-    try:
-        email = _email_adapter.validate_python(email)
-    except Exception:
-        raise HTTPException(status_code=422, detail="Invalid email address")
+    # Receiving and parsing the multipart body happens before this function runs
+    started_at = getattr(request.state, "started_at", None)
+    if started_at is not None:
+        UPLOAD_STAGE_SECONDS.labels("receive").observe(time.perf_counter() - started_at)
+    UPLOAD_RECEIVED_BYTES.inc(sum(file.size or 0 for file in files))
 
-    # Restrict project_type to known values to prevent unexpected behaviour
-    if project_type not in ("new", "existing"):
-        raise HTTPException(status_code=422, detail="Invalid project_type")
-
-    # Restrict language to known values
-    if language not in ("de", "en"):
-        raise HTTPException(status_code=422, detail="Invalid language")
+    email = _validate_submission(email, project_type, language)
 
     email_hash = hmac_sha256_hex(email, settings.log_redaction_secret)
     logger.info(
@@ -121,26 +441,9 @@ async def upload_documents(
             language=language,
     )
     
+    UPLOADS_IN_FLIGHT.inc()
     try:
-        # Sanitize project title for folder name
-        # Replace non-alphanumeric characters (except spaces, dashes, underscores) with underscore
-        safe_title = re.sub(r'[^a-zA-Z0-9 \-_]', '_', project_title)
-        # Replace spaces with underscores
-        safe_title = safe_title.replace(' ', '_')
-        # Remove multiple underscores
-        safe_title = re.sub(r'_+', '_', safe_title)
-        # Trim underscores
-        safe_title = safe_title.strip('_')
-        
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        
-        if project_type == 'existing':
-            folder_name = f"RE_{safe_title}_{date_str}"
-        else:
-            folder_name = f"{safe_title}_{date_str}"
-            
-        # Use folder_name as project_id for consistency with storage
-        project_id = folder_name
+        project_id = _build_project_id(project_title, project_type)
         logger.debug("project_id_generated", project_id=project_id)
         
         # Parse categories if provided
@@ -153,159 +456,45 @@ async def upload_documents(
                 logger.warning("file_categories_parse_failed", exc_info=True)
                 pass
         
-        # Validate files
+        # Validate files. Leading bytes and SHA-256 were captured by BodySizeLimitMiddleware
+        # while the body streamed in; without them, fall back to a pass over the spooled files.
         logger.debug("files_validating", files_count=len(files))
-        for file in files:
-            if file.size > settings.max_file_size:
-                logger.warning("file_too_large", file_size=file.size, max_size=settings.max_file_size)
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"File {file.filename} exceeds maximum size of 50 MB"
-                )
-
-            # Sanitize filename before extension check to prevent path traversal (OWASP A01 / CWE-22)
-            safe_name = _sanitize_filename(file.filename or "upload")
-            file_ext = os.path.splitext(safe_name)[1].lower()
-            if file_ext not in settings.allowed_file_types:
-                logger.warning("file_extension_disallowed", file_extension=file_ext)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File type {file_ext} not allowed"
-                )
-
-            # Magic-bytes check: verify actual file content matches the declared extension (CWE-434)
-            header = await file.read(261)  # 261 bytes is sufficient for filetype detection
-            await file.seek(0)
-            if not _check_magic_bytes(header, file_ext):
-                logger.warning("file_magic_bytes_mismatch", file_extension=file_ext)
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File content does not match declared type {file_ext}"
-                )
+        with UPLOAD_STAGE_SECONDS.labels("validate").time():
+            parts = uploaded_parts(request, "files")
+            if parts is None or [p.filename for p in parts] != [f.filename for f in files]:
+                parts = None
+            # Cheap checks for every file first, so no content is inspected for a doomed request
+            extensions = [_check_file_limits(file) for file in files]
+            if parts:
+                digests = [p.sha256 for p in parts]
+            else:
+                digests = list(await asyncio.gather(*(_file_sha256(file) for file in files)))
+            await _validate_contents(services, files, extensions, [p.header for p in parts] if parts else None, digests)
 
         logger.info("files_validation_passed")
         
         # Create project folder structure
-        project_path = f"{settings.nextcloud_base_path}/{project_id}"
-        logger.info("nextcloud_project_folder_creating", project_id=project_id)
-        
-        # Test connection before attempting folder creation
-        connection_ok, connection_msg = nextcloud.test_connection()
-        if not connection_ok:
-            logger.error("nextcloud_connection_failed", project_id=project_id)
-            raise HTTPException(
-                status_code=503,
-                detail=f"Nextcloud connection failed. Please check Nextcloud configuration and credentials. Error: {connection_msg}"
-            )
-        
-        if not nextcloud.create_folder(project_path):
-            logger.error("nextcloud_project_folder_create_failed", project_id=project_id)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to create project folder in Nextcloud at path: {project_path}. Please check Nextcloud permissions and ensure the base path exists."
-            )
+        with UPLOAD_STAGE_SECONDS.labels("create_folder").time():
+            project_path = await _create_project_folder(services, project_id)
         
         # Upload files directly to project folder (no subfolders)
-        uploaded_files = []
         logger.info("files_upload_started", project_id=project_id, files_count=len(files))
-        for idx, file in enumerate(files, 1):
-            # Sanitize the filename to prevent path traversal on the remote storage (OWASP A01 / CWE-22)
-            safe_name = _sanitize_filename(file.filename or "upload")
-            category = categories_map.get(file.filename, categories_map.get(safe_name, "sonstiges"))
-            logger.debug("file_uploading", project_id=project_id, index=idx, total=len(files), category=category)
-
-            # Upload directly to project folder, no category subfolders
-            file_path = f"{project_path}/{safe_name}"
-            if not await nextcloud.upload_file(file, file_path):
-                logger.error("file_upload_failed", project_id=project_id, category=category)
-                raise HTTPException(status_code=500, detail=f"Failed to upload file: {safe_name}")
-            
-            uploaded_files.append({
-                "filename": safe_name,
-                "category": category,
-                "path": file_path
-            })
+        with UPLOAD_STAGE_SECONDS.labels("store_files").time():
+            uploaded_files = await _upload_files(services, files, project_path, project_id, categories_map, digests)
         
         logger.info("files_upload_completed", project_id=project_id, uploaded_count=len(uploaded_files))
         
-        # Create metadata file
-        logger.debug("metadata_creating", project_id=project_id)
-        metadata = {
-            "project_id": project_id,
+        submission = {
             "email": email,
             "uploader_name": uploader_name,
             "project_title": project_title,
             "project_details": project_details,
             "institution": institution,
             "is_prospective_study": is_prospective_study,
-            "upload_timestamp": datetime.now().isoformat(),
-            "files": uploaded_files,
             "project_type": project_type,
-            "language": language
+            "language": language,
         }
-        
-        metadata_path = f"{project_path}/metadata.json"
-        if not await nextcloud.upload_metadata(metadata, metadata_path):
-            logger.error("metadata_upload_failed", project_id=project_id)
-            raise HTTPException(status_code=500, detail="Failed to upload metadata")
-
-        # Create README.md
-        logger.debug("readme_creating", project_id=project_id)
-        readme_content = f"""# {project_title}
-
-**Projekt-ID:** {project_id}
-**Datum:** {datetime.now().strftime('%d.%m.%Y %H:%M')}
-**Typ:** {'Nachreichung' if project_type == 'existing' else 'Neueinreichung'}
-
-## Kontaktinformationen
-- **Name:** {uploader_name if uploader_name else 'Nicht angegeben'}
-- **E-Mail:** {email}
-- **Institution:** {institution}
-
-## Projektdetails
-{project_details if project_details else 'Keine weiteren Details angegeben.'}
-
-## Hochgeladene Dateien
-"""
-        
-        for file_info in uploaded_files:
-            readme_content += f"- **{file_info['category']}:** {file_info['filename']}\n"
-
-        readme_path = f"{project_path}/README.md"
-        if not await nextcloud.upload_content(readme_content, readme_path):
-            logger.error("readme_upload_failed", project_id=project_id)
-            raise HTTPException(status_code=500, detail="Failed to upload README.md")
-        
-        # Send confirmation email to user
-        logger.info("confirmation_email_sending", project_id=project_id, email_hash=email_hash)
-        try:
-            await email_service.send_confirmation_email(
-                to_email=email,
-                project_id=project_id,
-                project_title=project_title,
-                uploader_name=uploader_name,
-                files=uploaded_files,
-                project_type=project_type,
-                language=language
-            )
-            logger.info("confirmation_email_sent", project_id=project_id, email_hash=email_hash)
-        except Exception as e:
-            logger.error("confirmation_email_send_failed", project_id=project_id, exc_info=True)
-            # Don't fail the upload if email fails
-        
-        # Send notification to team
-        logger.info("team_notification_sending", project_id=project_id)
-        try:
-            await email_service.send_team_notification(
-                project_id=project_id,
-                project_title=project_title,
-                uploader_email=email,
-                file_names=[f["filename"] for f in uploaded_files],
-            )
-            logger.info("team_notification_sent", project_id=project_id)
-        except Exception as e:
-            logger.error("team_notification_send_failed", project_id=project_id, exc_info=True)
-            # Don't fail the upload if email fails
+        await _finalize_submission(services, project_id, project_path, submission, uploaded_files)
         
         logger.info("upload_completed", project_id=project_id, files_uploaded=len(files))
         return UploadResponse(
@@ -322,14 +511,34 @@ async def upload_documents(
     except Exception as e:
         logger.error("upload_unexpected_error", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    finally:
+        UPLOADS_IN_FLIGHT.dec()
 
 @router.get("/upload/status/{project_id}", dependencies=[Depends(verify_token)])
-async def get_upload_status(project_id: str):
+async def get_upload_status(project_id: str, services: Services = Depends(get_services)):
     """
     Get upload status for a project
     """
+    project_index = services.project_index
+    entry = await project_index.get_entry(project_id)
+    if entry is not None and entry[1] <= settings.project_index_ttl:
+        return entry[0]
+    # Not indexed (e.g. uploaded before the index existed) or stale: ask Nextcloud and
+    # remember it; unchanged metadata costs a 304 thanks to the ETag cache
     try:
-        metadata = await nextcloud.get_metadata(project_id)
-        return metadata
+        metadata = await services.nextcloud.get_metadata(project_id)
+    except FileNotFoundError:
+        if entry is not None:
+            await project_index.delete(project_id)
+        raise HTTPException(status_code=404, detail="Project not found")
     except Exception:
+        if entry is not None:
+            # Nextcloud unreachable: the indexed copy is better than nothing
+            logger.warning("project_index_revalidation_failed", project_id=project_id)
+            return entry[0]
         raise HTTPException(status_code=404, detail="Project not found")
+    try:
+        await project_index.upsert({"project_id": project_id, **metadata})
+    except Exception:
+        logger.warning("project_index_update_failed", project_id=project_id, exc_info=True)
+    return metadata
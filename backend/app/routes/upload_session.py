@@ -0,0 +1,254 @@
+"""
+Session-based uploads: an alternative to the single multipart POST /api/upload.
+
+Flow:
+  1. POST /api/upload/sessions (static API token or upload JWT) with the form
+     fields as JSON → creates the project folder and returns a session id plus
+     a JWT scoped to that session.
+  2. PUT /api/upload/sessions/{session_id}/files/{filename}?category=... with
+     the raw file as body, once per file (files can be retried individually;
+     the client tracks progress per request).
+  3. POST /api/upload/sessions/{session_id}/finalize → writes metadata.json and
+     README.md and queues the e-mails, like the end of POST /api/upload.
+
+A session gets the budget of one POST /api/upload: at most
+upload_session_max_files files and max_request_size bytes in total.
+"""
+import hashlib
+import tempfile
+from datetime import datetime, timezone
+from typing import Tuple
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile
+
+from app.config import settings
+from app.limiter import limiter
+from app.logging_config import hmac_sha256_hex
+from app.models.upload import (
+    UploadResponse,
+    UploadSessionCreate,
+    UploadSessionResponse,
+    UploadSessionStatus,
+)
+from app.routes import upload
+from app.utils.tokens import create_session_token
+from app.services.validation import MAGIC_HEADER_SIZE
+from app.services.container import Services, get_services
+from app.services.upload_sessions import SessionFinalizing, SessionLimitExceeded, UploadSession
+from app.utils.auth import verify_session_access, verify_token
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter()
+# Ten submissions per IP and hour, like POST /api/upload, each with up to max_files files
+_SESSION_FILES_RATE_LIMIT = f"{10 * settings.upload_session_max_files}/hour"
+
+
+async def _get_session(services: Services, session_id: str) -> UploadSession:
+    session = await services.session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    return session
+
+
+def _check_session_limits(services: Services, session: UploadSession, filename: str, size: int = 0) -> None:
+    try:
+        services.session_store.check_limits(session, filename, size)
+    except SessionLimitExceeded as e:
+        logger.warning("upload_session_limit_exceeded", session_id=session.id, file_size=size)
+        raise HTTPException(status_code=413, detail=e.detail)
+
+
+async def _receive_file(
+    services: Services, request: Request, session: UploadSession, filename: str
+) -> Tuple[UploadFile, str, bytes]:
+    """
+    Spool the raw request body into an UploadFile (in memory up to
+    upload_spool_max_size, then a temporary file in upload_spool_dir),
+    enforcing max_file_size and the session limits while reading. Returns the
+    file with its SHA-256 (hex) and leading bytes, both taken in the same pass.
+    """
+    content_length = request.headers.get("content-length")
+    declared_size = int(content_length) if content_length is not None and content_length.isdigit() else 0
+    if declared_size > settings.max_file_size:
+        logger.warning("file_too_large", file_size=declared_size, max_size=settings.max_file_size)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File {filename} exceeds maximum size of {settings.max_file_size // (1024 * 1024)} MB"
+        )
+    _check_session_limits(services, session, filename, declared_size)
+    remaining_size = services.session_store.remaining_size(session, filename)
+
+    file = UploadFile(
+        tempfile.SpooledTemporaryFile(
+            max_size=settings.upload_spool_max_size,
+            dir=settings.upload_spool_dir or None,
+        ),
+        size=0,
+        filename=filename,
+    )
+    hasher = hashlib.sha256()
+    header = b""
+    try:
+        async for chunk in request.stream():
+            await file.write(chunk)
+            hasher.update(chunk)
+            if len(header) < MAGIC_HEADER_SIZE:
+                header += chunk[:MAGIC_HEADER_SIZE - len(header)]
+            if file.size > settings.max_file_size:
+                logger.warning("file_too_large", file_size=file.size, max_size=settings.max_file_size)
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File {filename} exceeds maximum size of {settings.max_file_size // (1024 * 1024)} MB"
+                )
+            if file.size > remaining_size:
+                _check_session_limits(services, session, filename, file.size)
+        await file.seek(0)
+    except BaseException:
+        await file.close()
+        raise
+    return file, hasher.hexdigest(), header
+
+
+@router.post(
+    "/upload/sessions",
+    response_model=UploadSessionResponse,
+    status_code=201,
+    dependencies=[Depends(verify_token)],
+)
+@limiter.limit("10/hour")  # Same budget as POST /api/upload: one session per submission
+async def create_upload_session(
+    request: Request,
+    body: UploadSessionCreate,
+    services: Services = Depends(get_services),
+):
+    """
+    Start a session-based upload: validates the form fields and creates the project folder.
+    """
+    submission = body.model_dump()
+    submission["email"] = upload._validate_submission(body.email, body.project_type, body.language)
+
+    project_id = upload._build_project_id(body.project_title, body.project_type)
+    project_path = await upload._create_project_folder(services, project_id)
+    session = await services.session_store.create(project_id, project_path, submission)
+
+    logger.info(
+        "upload_session_started",
+        session_id=session.id,
+        project_id=project_id,
+        email_hash=hmac_sha256_hex(submission["email"], settings.log_redaction_secret),
+        project_type=body.project_type,
+        language=body.language,
+    )
+    return UploadSessionResponse(
+        session_id=session.id,
+        project_id=project_id,
+        upload_token=create_session_token(session.id),
+        expires_at=datetime.fromtimestamp(session.expires_at, timezone.utc),
+    )
+
+
+@router.get("/upload/sessions/{session_id}", response_model=UploadSessionStatus)
+async def get_upload_session(
+    session_id: str = Depends(verify_session_access),
+    services: Services = Depends(get_services),
+):
+    """
+    Files received so far, e.g. to resume an interrupted upload.
+    """
+    session = await _get_session(services, session_id)
+    return UploadSessionStatus(
+        session_id=session.id,
+        project_id=session.project_id,
+        expires_at=datetime.fromtimestamp(session.expires_at, timezone.utc),
+        files=session.files,
+    )
+
+
+@router.put("/upload/sessions/{session_id}/files/{filename}")
+@limiter.limit(_SESSION_FILES_RATE_LIMIT)
+async def upload_session_file(
+    request: Request,
+    filename: str,
+    category: str = "sonstiges",
+    session_id: str = Depends(verify_session_access),
+    services: Services = Depends(get_services),
+):
+    """
+    Upload one file of the session as raw request body. Uploading the same
+    filename again replaces the file.
+    """
+    session = await _get_session(services, session_id)
+
+    # Sanitize the filename to prevent path traversal on the remote storage (OWASP A01 / CWE-22)
+    safe_name = upload._sanitize_filename(filename)
+    file, sha256, header = await _receive_file(services, request, session, safe_name)
+    try:
+        await upload._validate_file(services, file, header, sha256)
+        file_path = f"{session.project_path}/{safe_name}"
+        logger.debug("file_uploading", project_id=session.project_id, session_id=session_id, category=category)
+        if not await upload._store_file(services, file, file_path, sha256):
+            logger.error("file_upload_failed", project_id=session.project_id, category=category)
+            raise HTTPException(status_code=500, detail=f"Failed to upload file: {safe_name}")
+        file_info = {
+            "filename": safe_name,
+            "category": category,
+            "path": file_path,
+            "size": file.size,
+            "sha256": sha256,
+        }
+    finally:
+        await file.close()
+
+    try:
+        updated = await services.session_store.add_file(session_id, file_info)
+    except SessionLimitExceeded as e:
+        # Concurrent uploads used up the budget meanwhile; the stored file is not part of the submission
+        logger.warning("upload_session_limit_exceeded", session_id=session_id, file_size=file_info["size"])
+        raise HTTPException(status_code=413, detail=e.detail)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+    logger.info("upload_session_file_stored", session_id=session_id, project_id=session.project_id, file_size=file_info["size"])
+    return file_info
+
+
+@router.post("/upload/sessions/{session_id}/finalize", response_model=UploadResponse)
+@limiter.limit("10/hour")  # Same budget as POST /api/upload: one finalize per submission
+async def finalize_upload_session(
+    request: Request,
+    session_id: str = Depends(verify_session_access),
+    services: Services = Depends(get_services),
+):
+    """
+    Complete the submission: write metadata.json/README.md and queue the e-mails.
+    The session is claimed first, so concurrent or repeated calls get 409/404
+    instead of submitting twice.
+    """
+    session_store = services.session_store
+    try:
+        session = await session_store.claim(session_id)
+    except SessionFinalizing:
+        raise HTTPException(status_code=409, detail="Upload session is already being finalized")
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found or expired")
+
+    uploaded_files = session.files
+    try:
+        if not uploaded_files:
+            raise HTTPException(status_code=422, detail="No files uploaded in this session")
+        await upload._finalize_submission(services, session.project_id, session.project_path, session.submission, uploaded_files)
+    except BaseException:
+        # Hand the session back so the client can add files or retry
+        await session_store.release(session_id)
+        raise
+    await session_store.delete(session_id)
+
+    logger.info("upload_completed", project_id=session.project_id, files_uploaded=len(uploaded_files))
+    return UploadResponse(
+        success=True,
+        project_id=session.project_id,
+        timestamp=datetime.now(),
+        files_uploaded=len(uploaded_files),
+        message="Documents uploaded successfully"
+    )
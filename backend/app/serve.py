@@ -0,0 +1,81 @@
+"""
+Production server: several uvicorn worker processes behind one listening socket.
+
+    python -m app.serve
+
+Workers are spawned as fresh interpreters that import app.main themselves, so
+every worker builds its own services (HTTP/SMTP pools, background tasks) –
+nothing is created in this supervisor process and nothing is shared across a
+fork. Settings: WEB_CONCURRENCY, SERVER_BACKLOG, SERVER_KEEP_ALIVE_SECONDS,
+SERVER_GRACEFUL_TIMEOUT_SECONDS (see app/config.py). Development keeps using
+`uvicorn app.main:app --reload`.
+
+Metrics are kept per process and a scrape reaches whichever worker accepts the
+connection, so METRICS_ENABLED requires a single worker (WEB_CONCURRENCY=1).
+"""
+import importlib.util
+import os
+from pathlib import Path
+from typing import Optional
+
+import uvicorn
+
+from app.config import settings
+
+APP = "app.main:app"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: affinity mask, capped by a cgroup v2 CPU quota (containers)."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def worker_count(configured: Optional[int] = None) -> int:
+    """WEB_CONCURRENCY if set, else one worker per available CPU."""
+    configured = settings.web_concurrency if configured is None else configured
+    return configured if configured > 0 else available_cpus()
+
+
+def check_metrics_workers(workers: int) -> None:
+    """Refuse to start with metrics on several workers: scrapes would mix unrelated counters."""
+    if settings.metrics_enabled and workers > 1:
+        raise SystemExit(
+            f"METRICS_ENABLED needs WEB_CONCURRENCY=1 (got {workers} workers): metrics are "
+            "per process and each scrape would reach a different worker."
+        )
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> None:
+    workers = worker_count()
+    check_metrics_workers(workers)
+    uvicorn.run(
+        APP,
+        host=settings.api_host,
+        port=settings.api_port,
+        workers=workers,
+        # uvloop/httptools come with uvicorn[standard]; fall back to the pure-Python stack
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keep_alive_seconds,
+        # On SIGTERM stop accepting, then let running uploads finish for up to this long
+        timeout_graceful_shutdown=settings.server_graceful_timeout_seconds,
+        # Client addresses for rate limiting come from X-Forwarded-For (app/limiter.py)
+        proxy_headers=False,
+        server_header=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+The services of one API worker process (Nextcloud, e-mail, validation, indexes,
+upload sessions), built from Settings.
+
+The app lifespan builds them and keeps them on app.state.services; routes get
+them through the `get_services` dependency, so tests replace them with
+app.dependency_overrides instead of patching module attributes.
+"""
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy.engine import Engine
+
+from app.config import Settings
+from app.services.content_index import ContentIndex
+from app.services.email_outbox import EmailOutbox, worker_outbox_path
+from app.services.email_service import EmailService
+from app.services.health_monitor import NextcloudHealthMonitor
+from app.services.nextcloud import NextcloudService
+from app.services.project_index import ProjectIndex
+from app.services.upload_sessions import UploadSessionStore
+from app.services.validation import DEFAULT_VALIDATORS, ValidationPipeline, Validator
+from app.services.zip_inspection import ZipInspector
+
+
+@dataclass
+class Services:
+    nextcloud: NextcloudService
+    nextcloud_health: NextcloudHealthMonitor
+    email_service: EmailService
+    email_outbox: EmailOutbox
+    content_index: ContentIndex
+    project_index: ProjectIndex
+    validation_pipeline: ValidationPipeline
+    session_store: UploadSessionStore
+
+    @classmethod
+    def from_settings(cls, settings: Settings, engine: Engine) -> "Services":
+        """Build the services; nothing is connected or started yet (see app.main.lifespan)."""
+        nextcloud = NextcloudService()
+        email_service = EmailService()
+        return cls(
+            nextcloud=nextcloud,
+            nextcloud_health=NextcloudHealthMonitor(
+                nextcloud,
+                interval=settings.nextcloud_health_interval,
+                unhealthy_interval=settings.nextcloud_health_unhealthy_interval,
+                max_age=settings.nextcloud_health_max_age,
+            ),
+            email_service=email_service,
+            email_outbox=EmailOutbox(
+                email_service,
+                path=worker_outbox_path(settings.data_path(settings.email_outbox_file)),
+                adopt_from=settings.data_path(settings.email_outbox_file),
+                max_attempts=settings.email_outbox_max_attempts,
+                backoff=settings.email_outbox_backoff,
+                max_backoff=settings.email_outbox_max_backoff,
+            ),
+            content_index=ContentIndex(engine),
+            project_index=ProjectIndex(engine),
+            validation_pipeline=_validation_pipeline(settings),
+            session_store=UploadSessionStore(
+                settings.data_path(settings.upload_sessions_dir),
+                ttl=settings.upload_session_ttl_seconds,
+                max_files=settings.upload_session_max_files,
+                max_total_size=settings.max_request_size,
+            ),
+        )
+
+
+def _validation_pipeline(settings: Settings) -> ValidationPipeline:
+    zip_archive = Validator(
+        "zip_archive",
+        ZipInspector(
+            settings.allowed_file_types,
+            max_entries=settings.zip_max_entries,
+            max_total_size=settings.zip_max_uncompressed_size,
+            max_ratio=settings.zip_max_compression_ratio,
+        ),
+        frozenset({".zip"}),
+    )
+    return ValidationPipeline(
+        validators=DEFAULT_VALIDATORS + (zip_archive,),
+        max_workers=settings.validation_workers,
+        max_pending=settings.validation_max_pending,
+        timeout=settings.validation_timeout,
+        cache_size=settings.validation_cache_size,
+    )
+
+
+def get_services(request: Request) -> Services:
+    """Dependency: the services of this worker, built by the app lifespan."""
+    return request.app.state.services
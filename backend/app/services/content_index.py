@@ -0,0 +1,83 @@
+"""
+Content-addressed index of files already stored in Nextcloud.
+
+Resubmissions often contain the exact documents of an earlier submission; when
+the SHA-256 of an upload is known here, the file is copied server-side (WebDAV
+COPY) instead of being transferred again.
+"""
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+import structlog
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+
+from app.db import content_blobs, counters
+
+logger = structlog.get_logger(__name__)
+
+_COUNTERS = ("dedup_hits", "dedup_misses", "dedup_bytes_saved")
+
+
+class ContentIndex:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    async def lookup(self, sha256: str) -> Optional[Tuple[str, int]]:
+        """Return (remote path, size) of stored content with this digest, if any."""
+        return await asyncio.to_thread(self._lookup, sha256)
+
+    async def record(self, sha256: str, path: str, size: int) -> None:
+        """Remember that `path` holds content with this digest (latest upload wins)."""
+        await asyncio.to_thread(self._record, sha256, path, size)
+
+    async def forget(self, sha256: str, path: str) -> None:
+        """Drop a stale entry, e.g. when the remote file is gone or was modified."""
+        await asyncio.to_thread(self._forget, sha256, path)
+
+    async def count_hit(self, size: int) -> None:
+        await asyncio.to_thread(self._increment, {"dedup_hits": 1, "dedup_bytes_saved": size})
+
+    async def count_miss(self) -> None:
+        await asyncio.to_thread(self._increment, {"dedup_misses": 1})
+
+    async def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and bytes not transferred thanks to deduplication (all workers)."""
+        return await asyncio.to_thread(self._stats)
+
+    def _lookup(self, sha256: str) -> Optional[Tuple[str, int]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(content_blobs.c.path, content_blobs.c.size).where(content_blobs.c.sha256 == sha256)
+            ).first()
+        return (row.path, row.size) if row else None
+
+    def _record(self, sha256: str, path: str, size: int) -> None:
+        values = {"sha256": sha256, "path": path, "size": size, "stored_at": time.time()}
+        stmt = insert(content_blobs).values(**values)
+        stmt = stmt.on_conflict_do_update(index_elements=["sha256"], set_=values)
+        with self.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def _forget(self, sha256: str, path: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(content_blobs).where(content_blobs.c.sha256 == sha256, content_blobs.c.path == path)
+            )
+
+    def _increment(self, amounts: Dict[str, int]) -> None:
+        with self.engine.begin() as conn:
+            for name, amount in amounts.items():
+                stmt = insert(counters).values(name=name, value=amount)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["name"], set_={"value": counters.c.value + amount}
+                )
+                conn.execute(stmt)
+
+    def _stats(self) -> Dict[str, int]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(counters.c.name, counters.c.value).where(counters.c.name.in_(_COUNTERS)))
+            values = {row.name: row.value for row in rows}
+        return {name: values.get(name, 0) for name in _COUNTERS}
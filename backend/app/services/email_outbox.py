@@ -0,0 +1,233 @@
+"""
+Durable in-process e-mail outbox.
+
+Upload handlers enqueue e-mails and return as soon as storage is done; a
+background worker sends them with retry/backoff. Pending jobs are mirrored to
+a local JSON file so they survive a restart.
+
+With several worker processes every process keeps its own file (see
+worker_outbox_path()); on start, a worker adopts the files of processes that
+are gone, so no job is lost or sent twice.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from app.services.email_service import EmailService
+
+logger = structlog.get_logger(__name__)
+
+
+def worker_outbox_path(base: Path) -> Path:
+    """Outbox file of this process next to `base`, e.g. email_outbox.1234.json."""
+    return base.with_name(f"{base.stem}.{os.getpid()}{base.suffix}")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+@dataclass
+class OutboxJob:
+    kind: str
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class EmailOutbox:
+    def __init__(
+        self,
+        email_service: EmailService,
+        path: Optional[Path],
+        max_attempts: int = 5,
+        backoff: float = 30.0,
+        max_backoff: float = 900.0,
+        adopt_from: Optional[Path] = None,
+    ):
+        self.email_service = email_service
+        self.path = path
+        # Base path whose per-process files (and the file itself) are adopted from dead processes
+        self.adopt_from = adopt_from
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._senders = {
+            "confirmation": email_service.send_confirmation_email,
+            "team_notification": email_service.send_team_notification,
+        }
+        self._jobs: Dict[str, OutboxJob] = {}
+        self._queue: "asyncio.Queue[OutboxJob]" = asyncio.Queue()
+        self._persist_lock = asyncio.Lock()
+        self._retry_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    async def enqueue(self, kind: str, **payload: Any) -> str:
+        """Queue an e-mail; `payload` are the keyword arguments of the EmailService method."""
+        if kind not in self._senders:
+            raise ValueError(f"Unknown outbox job kind: {kind}")
+        job = OutboxJob(kind=kind, payload=payload)
+        self._jobs[job.id] = job
+        await self._persist()
+        self._queue.put_nowait(job)
+        logger.debug("email_outbox_job_enqueued", job_id=job.id, kind=kind, pending=self.pending)
+        return job.id
+
+    def start(self) -> None:
+        """Reload persisted jobs (own and orphaned) and start the worker task."""
+        if self._task is not None and not self._task.done():
+            return
+        adopted = self._adopt_orphans()
+        for job in self._load() + adopted:
+            if job.id not in self._jobs:
+                self._jobs[job.id] = job
+                self._queue.put_nowait(job)
+        if adopted:
+            # Persist right away: the adopted files are gone
+            try:
+                self._write([asdict(job) for job in self._jobs.values()])
+            except OSError:
+                logger.error("email_outbox_persist_failed", exc_info=True)
+            logger.info("email_outbox_jobs_adopted", adopted=len(adopted))
+        self._task = asyncio.create_task(self._run(), name="email-outbox-worker")
+        logger.info("email_outbox_started", pending=self.pending)
+
+    async def stop(self) -> None:
+        for handle in self._retry_handles.values():
+            handle.cancel()
+        self._retry_handles.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._persist()
+
+    async def _run(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception:
+                logger.error("email_outbox_worker_error", job_id=job.id, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: OutboxJob) -> None:
+        job.attempts += 1
+        start = time.perf_counter()
+        try:
+            sent = await self._senders[job.kind](**job.payload)
+        except Exception:
+            logger.error("email_outbox_send_raised", job_id=job.id, kind=job.kind, exc_info=True)
+            sent = False
+        duration_ms = int((time.perf_counter() - start) * 1000)
+
+        if sent:
+            self._jobs.pop(job.id, None)
+            await self._persist()
+            logger.info(
+                "email_outbox_job_sent",
+                job_id=job.id,
+                kind=job.kind,
+                attempts=job.attempts,
+                duration_ms=duration_ms,
+                queue_latency_ms=int((time.time() - job.enqueued_at) * 1000),
+            )
+            return
+
+        if job.attempts >= self.max_attempts:
+            self._jobs.pop(job.id, None)
+            await self._persist()
+            logger.error("email_outbox_job_dropped", job_id=job.id, kind=job.kind, attempts=job.attempts)
+            return
+
+        delay = min(self.max_backoff, self.backoff * 2 ** (job.attempts - 1))
+        await self._persist()
+        logger.warning(
+            "email_outbox_job_retry_scheduled",
+            job_id=job.id,
+            kind=job.kind,
+            attempts=job.attempts,
+            retry_in_s=delay,
+            duration_ms=duration_ms,
+        )
+        self._retry_handles[job.id] = asyncio.get_running_loop().call_later(
+            delay, self._requeue, job
+        )
+
+    def _requeue(self, job: OutboxJob) -> None:
+        self._retry_handles.pop(job.id, None)
+        self._queue.put_nowait(job)
+
+    async def _persist(self) -> None:
+        if self.path is None:
+            return
+        async with self._persist_lock:
+            snapshot = [asdict(job) for job in self._jobs.values()]
+            try:
+                await asyncio.to_thread(self._write, snapshot)
+            except OSError:
+                logger.error("email_outbox_persist_failed", exc_info=True)
+
+    def _write(self, snapshot: list) -> None:
+        # Write-then-rename so a crash never leaves a truncated file behind.
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    def _load(self, path: Optional[Path] = None) -> list:
+        path = path or self.path
+        if path is None or not path.exists():
+            return []
+        try:
+            with open(path, encoding="utf-8") as f:
+                return [OutboxJob(**item) for item in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            logger.error("email_outbox_load_failed", exc_info=True)
+            return []
+
+    def _adopt_orphans(self) -> List[OutboxJob]:
+        """Take over outbox files of processes that no longer run (and the single-process file)."""
+        if self.path is None or self.adopt_from is None:
+            return []
+        base = self.adopt_from
+        jobs: List[OutboxJob] = []
+        for candidate in [base, *sorted(base.parent.glob(f"{base.stem}.*{base.suffix}"))]:
+            if candidate == self.path:
+                continue
+            if candidate != base:
+                pid = candidate.name[len(base.stem) + 1:-len(base.suffix)]
+                if not pid.isdigit() or _pid_alive(int(pid)):
+                    continue
+            # Rename first: of several starting workers, exactly one gets each file
+            claimed = self.path.with_suffix(self.path.suffix + ".adopt")
+            try:
+                os.rename(candidate, claimed)
+            except FileNotFoundError:
+                continue
+            jobs.extend(self._load(claimed))
+            claimed.unlink(missing_ok=True)
+        return jobs
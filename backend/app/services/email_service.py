@@ -1,11 +1,17 @@
 import aiosmtplib
+import asyncio
 import html as html_lib
 import ssl
+import time
+from contextlib import asynccontextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 from app.config import settings
-from typing import List, Dict, Any, Literal, Sequence
+from app.logging_config import hmac_sha256_hex
+from app.metrics import EMAIL_IN_FLIGHT, EMAIL_SECONDS, observe_async
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Dict, Any, Literal, Sequence, Tuple, Union
 from datetime import datetime
 import structlog
 from urllib.parse import quote, urlsplit
@@ -14,57 +20,208 @@ logger = structlog.get_logger(__name__)
 
 ProjectType = Literal["new", "existing"]
 
+# Anchored to the package so the service works regardless of the working directory
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# Templates rendered by EmailService (and the layouts they extend)
+EMAIL_TEMPLATES = (
+    "base.html",
+    "base_en.html",
+    "email_confirmation_de.html",
+    "email_confirmation_en.html",
+    "email_confirmation_resubmission_de.html",
+    "email_confirmation_resubmission_en.html",
+    "missing_documents.html",
+    "user_info.html",
+)
+
+
+def _create_template_env() -> Environment:
+    """
+    Jinja2 environment for e-mail templates. Without auto_reload, cached templates are
+    served without stat'ing the source file; the bytecode cache in data_dir lets new
+    processes (restarts, additional workers) skip compiling the templates again.
+    """
+    bytecode_cache = None
+    if settings.email_template_bytecode_cache:
+        cache_dir = settings.data_path("jinja_cache")
+        cache_dir.mkdir(exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(['html', 'xml']),
+        auto_reload=settings.email_template_auto_reload,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+def _new_smtp_client() -> aiosmtplib.SMTP:
+    """Create an (unconnected) SMTP client configured from settings."""
+    smtp_kwargs: Dict[str, Any] = {
+        "hostname": settings.smtp_host,
+        "port": settings.smtp_port,
+        "username": settings.smtp_username,
+        "password": settings.smtp_password,
+    }
+
+    if settings.smtp_encryption == "starttls":
+        # STARTTLS: Upgrade unencrypted connection to TLS (typically port 587)
+        smtp_kwargs["start_tls"] = True
+        smtp_kwargs["use_tls"] = False
+    elif settings.smtp_encryption == "ssl":
+        # SSL: Direct SSL/TLS connection (typically port 465)
+        smtp_kwargs["use_tls"] = True
+        smtp_kwargs["tls_context"] = ssl.create_default_context()
+    else:  # none
+        smtp_kwargs["use_tls"] = False
+        smtp_kwargs["start_tls"] = False
+
+    return aiosmtplib.SMTP(**smtp_kwargs)
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP sessions open for reuse, so consecutive messages don't each
+    pay TCP connect + TLS handshake + AUTH.
+
+    Sessions idle for longer than `idle_timeout` are closed instead of reused; sessions
+    idle for longer than `health_check_after` are verified with NOOP before reuse.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], aiosmtplib.SMTP] = _new_smtp_client,
+        max_size: int = 2,
+        idle_timeout: float = 60.0,
+        health_check_after: float = 15.0,
+    ):
+        self._factory = factory
+        self._idle_timeout = idle_timeout
+        self._health_check_after = health_check_after
+        self._semaphore = asyncio.Semaphore(max(1, max_size))
+        # (session, last used monotonic timestamp); most recently used last
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        async with self._semaphore:
+            smtp = await self._acquire()
+            try:
+                yield smtp
+            except BaseException:
+                # The session state is unknown after a failure: never reuse it.
+                await self._discard(smtp)
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def warm_up(self) -> None:
+        """Open one authenticated session ahead of the first e-mail (startup)."""
+        async with self.connection():
+            pass
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp, quit=True)
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            smtp, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if not smtp.is_connected or idle_for > self._idle_timeout:
+                await self._discard(smtp, quit=smtp.is_connected)
+                continue
+            if idle_for > self._health_check_after:
+                try:
+                    await smtp.noop()
+                except aiosmtplib.SMTPException:
+                    await self._discard(smtp)
+                    continue
+            return smtp
+
+        smtp = self._factory()
+        await smtp.connect()
+        logger.debug("smtp_connection_opened")
+        return smtp
+
+    @staticmethod
+    async def _discard(smtp: aiosmtplib.SMTP, quit: bool = False) -> None:
+        try:
+            if quit:
+                await smtp.quit()
+            else:
+                smtp.close()
+        except Exception:
+            smtp.close()
+
+
 class EmailService:
     def __init__(self):
-        # Ensure templates directory exists or handle missing templates gracefully
-        try:
-            self.template_env = Environment(
-                loader=FileSystemLoader('app/templates'),
-                autoescape=select_autoescape(['html', 'xml'])
-            )
-        except Exception as e:
-            logger.error(f"Failed to initialize Jinja2 environment: {e}")
-            self.template_env = None
+        self.smtp_pool = SMTPConnectionPool(
+            max_size=settings.smtp_pool_size,
+            idle_timeout=settings.smtp_pool_idle_timeout,
+            health_check_after=settings.smtp_pool_health_check_after,
+        )
+        self.template_env = _create_template_env()
+        # Compile every template once at startup; a missing or broken template fails
+        # here instead of when the first e-mail is sent.
+        self._templates: Dict[str, Template] = {
+            name: self.template_env.get_template(name) for name in EMAIL_TEMPLATES
+        }
     
+    async def warm_up(self) -> None:
+        """Connect and authenticate to the SMTP server now, so the first e-mail reuses the session."""
+        await self.smtp_pool.warm_up()
+
+    async def aclose(self) -> None:
+        await self.smtp_pool.close()
+
+    @observe_async(EMAIL_SECONDS, EMAIL_IN_FLIGHT, "send_email")
     async def send_email(
         self,
-        to_email: str,
+        to_email: Union[str, Sequence[str]],
         subject: str,
         html_content: str
     ) -> bool:
         """
-        Send an email via SMTP
+        Send an email via SMTP over a pooled session.
+        A list of addresses is delivered as one message with one RCPT TO per address;
+        they are not disclosed to each other (To: is the sender, the list goes to Bcc:,
+        which is not transmitted). Recipients refused by the server are logged.
         """
         try:
+            recipients = [to_email] if isinstance(to_email, str) else list(to_email)
             message = MIMEMultipart('alternative')
             message['From'] = f"{settings.smtp_from_name} <{settings.smtp_from_email}>"
-            message['To'] = to_email
+            if len(recipients) == 1:
+                message['To'] = recipients[0]
+            else:
+                message['To'] = settings.smtp_from_email
+                message['Bcc'] = ", ".join(recipients)
             message['Subject'] = subject
             
             html_part = MIMEText(html_content, 'html')
             message.attach(html_part)
             
-            # Configure encryption based on settings
-            smtp_kwargs = {
-                "hostname": settings.smtp_host,
-                "port": settings.smtp_port,
-                "username": settings.smtp_username,
-                "password": settings.smtp_password,
-            }
-            
-            if settings.smtp_encryption == "starttls":
-                # STARTTLS: Upgrade unencrypted connection to TLS (typically port 587)
-                smtp_kwargs["start_tls"] = True
-                smtp_kwargs["use_tls"] = False
-            elif settings.smtp_encryption == "ssl":
-                # SSL: Direct SSL/TLS connection (typically port 465)
-                smtp_kwargs["use_tls"] = True
-                smtp_kwargs["ssl_context"] = ssl.create_default_context()
-            else:  # none
-                smtp_kwargs["use_tls"] = False
-                smtp_kwargs["start_tls"] = False
-            
-            await aiosmtplib.send(message, **smtp_kwargs)
+            try:
+                async with self.smtp_pool.connection() as smtp:
+                    refused, _ = await smtp.send_message(message, recipients=recipients)
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                # A pooled session may have been dropped by the server; retry once on a fresh one.
+                logger.info("smtp_connection_stale_retrying")
+                async with self.smtp_pool.connection() as smtp:
+                    refused, _ = await smtp.send_message(message, recipients=recipients)
+
+            # All recipients refused raises SMTPRecipientsRefused; this is the partial case.
+            # Not retried, as the accepted recipients would get the message twice.
+            if refused:
+                logger.warning(
+                    "email_recipients_refused",
+                    refused_count=len(refused),
+                    recipient_count=len(recipients),
+                    recipient_hashes=[hmac_sha256_hex(r, settings.log_redaction_secret) for r in refused],
+                    codes=sorted({response.code for response in refused.values()}),
+                )
             
             return True
         except Exception as e:
@@ -72,6 +229,7 @@ class EmailService:
             # raise
             return False
 
+    @observe_async(EMAIL_SECONDS, EMAIL_IN_FLIGHT, "send_template_email")
     async def send_template_email(
         self,
         to_email: str,
@@ -82,18 +240,15 @@ class EmailService:
         """
         Send an email using a Jinja2 template
         """
-        if not self.template_env:
-            logger.error("email_template_env_not_initialized")
-            return False
-            
         try:
-            template = self.template_env.get_template(template_name)
+            template = self._templates.get(template_name) or self.template_env.get_template(template_name)
             html_content = template.render(**context)
             return await self.send_email(to_email, subject, html_content)
         except Exception as e:
             logger.error("email_template_render_failed", template_name=template_name, exc_info=True)
             return False
     
+    @observe_async(EMAIL_SECONDS, EMAIL_IN_FLIGHT, "send_confirmation_email")
     async def send_confirmation_email(
         self,
         to_email: str,
@@ -145,6 +300,7 @@ class EmailService:
             context
         )
     
+    @observe_async(EMAIL_SECONDS, EMAIL_IN_FLIGHT, "send_missing_documents_email")
     async def send_missing_documents_email(
         self,
         to_email: str,
@@ -173,6 +329,7 @@ class EmailService:
             context
         )
 
+    @observe_async(EMAIL_SECONDS, EMAIL_IN_FLIGHT, "send_user_info_email")
     async def send_user_info_email(
         self,
         to_email: str,
@@ -194,6 +351,7 @@ class EmailService:
             context
         )
     
+    @observe_async(EMAIL_SECONDS, EMAIL_IN_FLIGHT, "send_team_notification")
     async def send_team_notification(
         self,
         project_id: str,
@@ -230,11 +388,11 @@ class EmailService:
         </html>
         """
         
-        # Send to all team members
-        for email in settings.notification_emails:
-            await self.send_email(email, subject, html_content)
-        
-        return True
+        if not settings.notification_emails:
+            return True
+
+        # One message to all team members (one RCPT TO each) over a single session
+        return await self.send_email(settings.notification_emails, subject, html_content)
 
     @staticmethod
     def _build_nextcloud_web_ui_folder_url(folder_path: str) -> str:
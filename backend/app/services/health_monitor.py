@@ -0,0 +1,116 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+from app.services.nextcloud import NextcloudService
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class HealthStatus:
+    ok: Optional[bool] = None  # None: not probed yet
+    message: str = "not checked yet"
+    checked_at: Optional[datetime] = None
+    latency_ms: Optional[int] = None
+    _checked_monotonic: Optional[float] = None
+
+    def age_seconds(self) -> Optional[float]:
+        if self._checked_monotonic is None:
+            return None
+        return time.monotonic() - self._checked_monotonic
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Public view of the status; `message` may contain connection details and is left out."""
+        age = self.age_seconds()
+        return {
+            "ok": self.ok,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "latency_ms": self.latency_ms,
+        }
+
+
+class NextcloudHealthMonitor:
+    """
+    Probes Nextcloud in the background and caches the result, so request handlers
+    don't pay a WebDAV round trip just to find out whether Nextcloud is reachable.
+    """
+
+    def __init__(
+        self,
+        service: NextcloudService,
+        interval: float,
+        unhealthy_interval: float,
+        max_age: float,
+    ):
+        self.service = service
+        self.interval = interval
+        self.unhealthy_interval = unhealthy_interval
+        self.max_age = max_age
+        self.status = HealthStatus()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self) -> HealthStatus:
+        async with self._lock:
+            return await self._probe()
+
+    async def _probe(self) -> HealthStatus:
+        start = time.perf_counter()
+        ok, message = await self.service.test_connection()
+        self.status = HealthStatus(
+            ok=ok,
+            message=message,
+            checked_at=datetime.now(timezone.utc),
+            latency_ms=int((time.perf_counter() - start) * 1000),
+            _checked_monotonic=time.monotonic(),
+        )
+        return self.status
+
+    def is_fresh(self) -> bool:
+        age = self.status.age_seconds()
+        return age is not None and age <= self.max_age
+
+    async def ensure_available(self) -> Tuple[bool, str]:
+        """
+        Answer from the cached probe result; probe inline only if it is missing or stale
+        (e.g. when the background task is not running).
+        """
+        if not self.is_fresh():
+            async with self._lock:
+                # Requests that waited for a concurrent probe use its result
+                if not self.is_fresh():
+                    await self._probe()
+        status = self.status
+        return bool(status.ok), status.message
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="nextcloud-health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        if self.status.ok and self.is_fresh():
+            # Just probed (startup warm-up): no need to probe again right away
+            await asyncio.sleep(self.interval)
+        while True:
+            try:
+                status = await self.probe()
+            except Exception:
+                logger.error("nextcloud_health_probe_crashed", exc_info=True)
+                status = self.status
+            # Re-check a failing Nextcloud more often so uploads resume quickly after recovery
+            await asyncio.sleep(self.interval if status.ok else self.unhealthy_interval)
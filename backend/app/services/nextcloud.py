@@ -1,32 +1,124 @@
-from webdav3.client import Client
 from app.config import settings
+from app.services.webdav import AsyncWebDAVClient, WebDAVError
+import asyncio
+import copy
 import json
-from typing import Dict, Any, Tuple
+import uuid
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple, TypeVar
+from urllib.parse import quote, urlsplit
 from fastapi import UploadFile
-import tempfile
-import os
+import httpx
 import structlog
 from app.logging_config import hmac_sha256_hex
+from app.metrics import (
+    NEXTCLOUD_IN_FLIGHT,
+    NEXTCLOUD_METADATA_CACHE,
+    NEXTCLOUD_SECONDS,
+    NEXTCLOUD_UPLOADED_BYTES,
+    observe_async,
+)
+from app.utils.cache import TTLCache
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
+# Status codes worth retrying for a single chunk (locked / throttled / server-side errors)
+_RETRYABLE_STATUS = {423, 429, 500, 502, 503, 504}
+
+
+def _chunked_upload_urls(base_url: str, username: str) -> Tuple[str, str]:
+    """
+    Derive the chunked-upload (v2) endpoints from NEXTCLOUD_URL.
+    Returns (uploads_url, files_url), e.g.
+    https://host/remote.php/dav/uploads/<user> and https://host/remote.php/dav/files/<user>.
+    Works for both .../remote.php/dav/files/<user> and the legacy .../remote.php/webdav URLs.
+    """
+    parts = urlsplit(base_url.rstrip("/"))
+    prefix, sep, rest = parts.path.partition("/remote.php/")
+    user = quote(username, safe="")
+    if sep and rest.startswith("dav/files/"):
+        user = rest[len("dav/files/"):].split("/", 1)[0]
+    dav_root = f"{parts.scheme}://{parts.netloc}{prefix}/remote.php/dav"
+    return f"{dav_root}/uploads/{user}", f"{dav_root}/files/{user}"
+
+
+async def _iter_upload_file(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    Yield an UploadFile in fixed-size chunks so it can be streamed as a request body.
+    Only one chunk per upload is held in memory at a time.
+    """
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _iter_file_range(
+    file: UploadFile,
+    offset: int,
+    length: int,
+    lock: asyncio.Lock,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Yield `length` bytes of an UploadFile starting at `offset`.
+    Several ranges of the same file are streamed concurrently, so seek+read is done under `lock`.
+    """
+    position = offset
+    end = offset + length
+    while position < end:
+        async with lock:
+            await file.seek(position)
+            chunk = await file.read(min(chunk_size, end - position))
+        if not chunk:
+            break
+        position += len(chunk)
+        yield chunk
+
+
 class NextcloudService:
-    def __init__(self):
-        self.client = Client({
-            'webdav_hostname': settings.nextcloud_url,
-            'webdav_login': settings.nextcloud_username,
-            'webdav_password': settings.nextcloud_password,
-            'webdav_timeout': 30
-        })
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.client = AsyncWebDAVClient(
+            settings.nextcloud_url,
+            settings.nextcloud_username,
+            settings.nextcloud_password,
+            timeout=settings.nextcloud_timeout,
+            max_connections=settings.nextcloud_max_connections,
+            transport=transport,
+        )
+        self._uploads_url, self._files_url = _chunked_upload_urls(
+            settings.nextcloud_url, settings.nextcloud_username
+        )
+        # Remote folders known to exist; invalidated when the server answers 404/409.
+        self._known_folders: TTLCache[str, bool] = TTLCache(
+            maxsize=settings.nextcloud_folder_cache_size,
+            ttl=settings.nextcloud_folder_cache_ttl,
+        )
+        # metadata.json path -> (ETag, parsed metadata); see get_metadata()
+        self._metadata_cache: TTLCache[str, Tuple[str, Dict[Any, Any]]] = TTLCache(
+            maxsize=settings.nextcloud_metadata_cache_size,
+            ttl=settings.nextcloud_metadata_cache_ttl,
+        )
+        self.metadata_cache_hits = 0
+        self.metadata_cache_misses = 0
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
     
-    def test_connection(self) -> Tuple[bool, str]:
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "test_connection")
+    async def test_connection(self) -> Tuple[bool, str]:
         """
         Test the connection to Nextcloud and verify credentials.
         Returns (success: bool, message: str)
         """
         try:
-            # Try to list the root directory to verify connection
-            self.client.list('/')
+            # A Depth: 0 PROPFIND on the root verifies connection and credentials
+            if not await self.client.check('/'):
+                # Reachable, but the configured WebDAV root does not exist (wrong URL/user)
+                logger.error("nextcloud_connection_test_failed", reason="root_not_found")
+                return False, "Failed to connect to Nextcloud: WebDAV root not found"
             logger.info("nextcloud_connection_test_successful")
             return True, "Connection successful"
         except Exception as e:
@@ -34,225 +126,369 @@ class NextcloudService:
             logger.error("nextcloud_connection_test_failed", exc_info=True)
             return False, error_msg
     
-    def create_folder(self, path: str) -> bool:
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "create_folder")
+    async def create_folder(self, path: str) -> bool:
         """
         Create a folder in Nextcloud, including all parent directories if needed.
+        Folders known to exist (process-local TTL/LRU cache) cost no request at all;
+        otherwise MKCOL is tried first and parents are only created on 409 Conflict.
         """
         try:
-            # Normalize path: remove leading/trailing slashes and split
-            normalized_path = path.strip('/')
+            # Normalize path: remove leading/trailing slashes
+            normalized_path = '/'.join(part for part in path.split('/') if part)
             if not normalized_path:
                 logger.error("nextcloud_create_folder_empty_path")
                 return False
-            
-            path_parts = normalized_path.split('/')
-            
-            # Create each directory in the path hierarchy
-            current_path = ""
-            for part in path_parts:
-                if not part:
-                    continue
-                    
-                if current_path:
-                    current_path = f"{current_path}/{part}"
-                else:
-                    current_path = part
-                
-                # Ensure path starts with / for WebDAV
-                full_path = f"/{current_path}"
-                
-                try:
-                    if not self.client.check(full_path):
-                        logger.debug(
-                            "nextcloud_folder_creating",
-                            folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
-                        )
-                        self.client.mkdir(full_path)
-                        logger.debug(
-                            "nextcloud_folder_created",
-                            folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
-                        )
-                    else:
-                        logger.debug(
-                            "nextcloud_folder_exists",
-                            folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
-                        )
-                except Exception as e:
-                    logger.error(
-                        "nextcloud_folder_create_failed",
-                        folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
-                        exc_info=True,
-                    )
-                    raise
-            
+
+            # Ensure path starts with / for WebDAV
+            await self._ensure_folder(f"/{normalized_path}")
             logger.info("nextcloud_folder_structure_ensured")
             return True
         except Exception as e:
             logger.error("nextcloud_create_folder_failed", exc_info=True)
-            return False 
-    
-    async def upload_file(self, file: UploadFile, remote_path: str) -> bool:
+            return False
+
+    async def _ensure_folder(self, full_path: str) -> None:
+        if self._known_folders.get(full_path):
+            logger.debug(
+                "nextcloud_folder_exists_cached",
+                folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
+            )
+            return
+
+        status = await self.client.mkcol(full_path)
+        if status == 409:
+            # Parent is missing: create it first, then retry this level. The cache may
+            # still list the parent (deleted on the server), so forget the whole chain.
+            parent = full_path.rsplit('/', 1)[0]
+            if not parent:
+                raise WebDAVError("MKCOL", full_path, status)
+            self._forget_folder_chain(parent)
+            await self._ensure_folder(parent)
+            status = await self.client.mkcol(full_path)
+
+        if status == 201:
+            logger.debug(
+                "nextcloud_folder_created",
+                folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
+            )
+        elif status == 405:
+            # 405 Method Not Allowed: the collection already exists
+            logger.debug(
+                "nextcloud_folder_exists",
+                folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
+            )
+        else:
+            logger.error(
+                "nextcloud_folder_create_failed",
+                folder_path_hash=hmac_sha256_hex(full_path, settings.log_redaction_secret)[:16],
+                status_code=status,
+            )
+            raise WebDAVError("MKCOL", full_path, status)
+
+        # The folder exists now, and so do all of its ancestors.
+        current = full_path
+        while current:
+            self._known_folders.set(current, True)
+            current = current.rsplit('/', 1)[0]
+
+    def _forget_folder_chain(self, folder: str) -> None:
+        """Drop `folder` and all of its ancestors from the folder cache."""
+        current = folder
+        while current:
+            self._known_folders.pop(current)
+            current = current.rsplit('/', 1)[0]
+
+    def _forget_parent_folder(self, remote_path: str, error: Exception) -> None:
+        """Drop the cached parent folder chain when the server says it is gone (404/409)."""
+        if isinstance(error, WebDAVError) and error.status_code in (404, 409):
+            self._forget_folder_chain('/' + remote_path.strip('/').rsplit('/', 1)[0])
+
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "upload_file")
+    async def upload_file(self, file: UploadFile, remote_path: str, sha256: Optional[str] = None) -> bool:
         """
-        Upload a file to Nextcloud
+        Upload a file to Nextcloud.
+        The file is streamed from the (spooled) UploadFile straight into the PUT body,
+        so memory use per upload is bounded by settings.upload_stream_chunk_size.
+        A known SHA-256 (hex) is sent as OC-Checksum and stored with the file by Nextcloud.
         """
-        tmp_path = None
+        checksum_headers = {"OC-Checksum": f"SHA256:{sha256}"} if sha256 else {}
         try:
             logger.debug(
                 "nextcloud_upload_started",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 file_size=file.size,
             )
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                content = await file.read()
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-            
-            # Upload to Nextcloud
-            self.client.upload_sync(remote_path=remote_path, local_path=tmp_path)
+            if self._use_chunked_upload(file):
+                await self._upload_file_chunked(file, remote_path, checksum_headers)
+            else:
+                # With a known size we send Content-Length; otherwise httpx falls back to
+                # Transfer-Encoding: chunked.
+                headers = dict(checksum_headers)
+                if file.size is not None:
+                    headers["Content-Length"] = str(file.size)
+                await self.client.put(
+                    remote_path,
+                    _iter_upload_file(file, settings.upload_stream_chunk_size),
+                    headers=headers,
+                )
+            NEXTCLOUD_UPLOADED_BYTES.inc(file.size or 0)
             logger.info(
                 "nextcloud_upload_completed",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 file_size=file.size,
             )
-            
-            # Clean up
-            if tmp_path and os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            
             return True
         except Exception as e:
+            self._forget_parent_folder(remote_path, e)
             logger.error(
                 "nextcloud_upload_failed",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 exc_info=True,
             )
-            # Clean up on error
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
             return False
     
+    def _use_chunked_upload(self, file: UploadFile) -> bool:
+        return (
+            settings.nextcloud_chunked_upload_enabled
+            and file.size is not None
+            and file.size > settings.nextcloud_chunked_upload_threshold
+        )
+
+    async def _upload_file_chunked(
+        self,
+        file: UploadFile,
+        remote_path: str,
+        checksum_headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Upload a large file with Nextcloud's chunked upload protocol (v2):
+        MKCOL a transfer collection below /uploads/<user>, PUT the numbered chunks
+        (up to nextcloud_chunk_concurrency in parallel, each retried on its own),
+        then MOVE the virtual `.file` onto the destination to assemble it.
+        The checksum of the whole file is sent with the MOVE.
+        On failure the transfer collection is deleted.
+        """
+        size = file.size or 0
+        chunk_size = settings.nextcloud_chunk_size
+        transfer_url = f"{self._uploads_url}/datenschutzportal-{uuid.uuid4().hex}"
+        headers = {
+            "Destination": f"{self._files_url}{quote(remote_path, safe='/')}",
+            "OC-Total-Length": str(size),
+        }
+        await self.client.request_url("MKCOL", transfer_url, expected=(201,), headers=headers)
+
+        read_lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(max(1, settings.nextcloud_chunk_concurrency))
+
+        async def put_chunk(number: int, offset: int) -> None:
+            length = min(chunk_size, size - offset)
+            async with semaphore:
+                await self._retry_chunk(
+                    lambda: self.client.request_url(
+                        "PUT",
+                        f"{transfer_url}/{number:05d}",
+                        expected=(201, 204),
+                        headers={**headers, "Content-Length": str(length)},
+                        content=_iter_file_range(
+                            file, offset, length, read_lock, settings.upload_stream_chunk_size
+                        ),
+                    ),
+                    chunk=number,
+                )
+
+        tasks = [
+            asyncio.create_task(put_chunk(number, offset))
+            for number, offset in enumerate(range(0, size, chunk_size), 1)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+            await self.client.request_url(
+                "MOVE",
+                f"{transfer_url}/.file",
+                expected=(201, 204),
+                headers={**headers, **(checksum_headers or {})},
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self.client.request_url("DELETE", transfer_url, expected=(204, 404))
+            except Exception:
+                logger.warning("nextcloud_chunked_upload_cleanup_failed", exc_info=True)
+            raise
+        logger.debug("nextcloud_chunked_upload_assembled", chunks=len(tasks), file_size=size)
+
+    async def _retry_chunk(self, send: Callable[[], Awaitable[T]], chunk: int) -> T:
+        """
+        Run `send`, retrying transport errors and retryable HTTP statuses with exponential backoff.
+        Only the failed chunk is re-sent; `send` must build a fresh request body on every call.
+        """
+        for attempt in range(1, max(1, settings.nextcloud_chunk_retries + 1)):
+            try:
+                return await send()
+            except (httpx.TransportError, WebDAVError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.status_code in _RETRYABLE_STATUS
+                if not retryable:
+                    raise
+                logger.warning("nextcloud_chunk_retrying", chunk=chunk, attempt=attempt, error=str(e))
+                await asyncio.sleep(settings.nextcloud_chunk_retry_backoff * 2 ** (attempt - 1))
+        # Last attempt: errors propagate
+        return await send()
+
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "copy_file")
+    async def copy_file(self, source_path: str, remote_path: str, expected_size: int, sha256: str) -> bool:
+        """
+        Copy an already stored file server-side (WebDAV COPY) instead of uploading it again.
+        Returns False, without copying, if the source is gone, its size differs from
+        `expected_size` or its stored checksum (oc:checksums) is not SHA256:`sha256`.
+        Nextcloud drops the checksum when a file is modified in place, so a same-size
+        edit is detected too.
+        """
+        try:
+            resources = await self.client.propfind(source_path, depth=0)
+            source = resources[0] if resources else None
+            if (
+                source is None
+                or source.is_collection
+                or source.content_length != expected_size
+                or not source.has_checksum("SHA256", sha256)
+            ):
+                logger.info(
+                    "nextcloud_copy_source_changed",
+                    source_path_hash=hmac_sha256_hex(source_path, settings.log_redaction_secret)[:16],
+                )
+                return False
+            await self.client.copy(source_path, remote_path)
+            logger.info(
+                "nextcloud_copy_completed",
+                remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
+                file_size=expected_size,
+            )
+            return True
+        except Exception as e:
+            self._forget_parent_folder(remote_path, e)
+            logger.warning(
+                "nextcloud_copy_failed",
+                remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
+                exc_info=True,
+            )
+            return False
+
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "upload_metadata")
     async def upload_metadata(self, metadata: Dict[Any, Any], remote_path: str) -> bool:
         """
         Upload metadata JSON to Nextcloud
         """
-        tmp_path = None
+        self._metadata_cache.pop(remote_path)
         try:
             logger.debug(
                 "nextcloud_metadata_upload_started",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
             )
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as tmp_file:
-                json.dump(metadata, tmp_file, indent=2)
-                tmp_path = tmp_file.name
-            
-            self.client.upload_sync(remote_path=remote_path, local_path=tmp_path)
+            await self.client.put(
+                remote_path,
+                json.dumps(metadata, indent=2).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
             logger.info(
                 "nextcloud_metadata_upload_completed",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
             )
-            
-            if tmp_path and os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            
             return True
         except Exception as e:
+            self._forget_parent_folder(remote_path, e)
             logger.error(
                 "nextcloud_metadata_upload_failed",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 exc_info=True,
             )
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
             return False
 
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "upload_content")
     async def upload_content(self, content: str, remote_path: str) -> bool:
         """
         Upload text content to Nextcloud
         """
-        tmp_path = None
         try:
             logger.debug(
                 "nextcloud_content_upload_started",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 chars=len(content),
             )
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp_file:
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-            
-            self.client.upload_sync(remote_path=remote_path, local_path=tmp_path)
+            await self.client.put(remote_path, content.encode("utf-8"))
             logger.info(
                 "nextcloud_content_upload_completed",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 chars=len(content),
             )
-            
-            if tmp_path and os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-            
             return True
         except Exception as e:
+            self._forget_parent_folder(remote_path, e)
             logger.error(
                 "nextcloud_content_upload_failed",
                 remote_path_hash=hmac_sha256_hex(remote_path, settings.log_redaction_secret)[:16],
                 exc_info=True,
             )
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
             return False
     
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "get_metadata")
     async def get_metadata(self, project_id: str) -> Dict[Any, Any]:
         """
-        Retrieve project metadata from Nextcloud
+        Retrieve project metadata from Nextcloud.
+        Parsed metadata is cached with its ETag and revalidated with a conditional GET
+        (If-None-Match), so unchanged metadata costs a 304 without a body.
         """
-        tmp_path = None
         try:
             logger.debug("nextcloud_metadata_retrieving", project_id=project_id)
             path = f"{settings.nextcloud_base_path}/{project_id}/metadata.json"
-            if self.client.check(path):
-                with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-                    tmp_path = tmp_file.name
-                
-                self.client.download_sync(remote_path=path, local_path=tmp_path)
-                
-                with open(tmp_path, 'r') as f:
-                    metadata = json.load(f)
-                
-                if tmp_path and os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-                
-                logger.info("nextcloud_metadata_retrieved", project_id=project_id)
-                return metadata
-            
-            logger.warning("nextcloud_project_not_found", project_id=project_id)
-            raise FileNotFoundError(f"Project {project_id} not found")
+            cached = self._metadata_cache.get(path)
+            headers = {"If-None-Match": cached[0]} if cached else None
+            response = await self.client.request("GET", path, expected=(200, 304, 404), headers=headers)
+
+            if response.status_code == 304 and cached:
+                self.metadata_cache_hits += 1
+                NEXTCLOUD_METADATA_CACHE.labels("hit").inc()
+                self._metadata_cache.set(path, cached)  # refresh TTL
+                logger.debug("nextcloud_metadata_not_modified", project_id=project_id)
+                return copy.deepcopy(cached[1])
+
+            if response.status_code == 404:
+                self._metadata_cache.pop(path)
+                logger.warning("nextcloud_project_not_found", project_id=project_id)
+                raise FileNotFoundError(f"Project {project_id} not found")
+
+            self.metadata_cache_misses += 1
+            NEXTCLOUD_METADATA_CACHE.labels("miss").inc()
+            metadata = json.loads(response.content)
+            etag = response.headers.get("ETag")
+            if etag:
+                self._metadata_cache.set(path, (etag, copy.deepcopy(metadata)))
+            logger.info("nextcloud_metadata_retrieved", project_id=project_id)
+            return metadata
         except FileNotFoundError:
             raise
         except Exception as e:
             logger.error("nextcloud_metadata_retrieve_failed", project_id=project_id, exc_info=True)
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.unlink(tmp_path)
-                except OSError:
-                    pass
             raise
     
-    def list_files(self, path: str) -> list:
+    def metadata_cache_stats(self) -> Dict[str, Any]:
+        lookups = self.metadata_cache_hits + self.metadata_cache_misses
+        return {
+            "size": len(self._metadata_cache),
+            "hits": self.metadata_cache_hits,
+            "misses": self.metadata_cache_misses,
+            "hit_rate": round(self.metadata_cache_hits / lookups, 3) if lookups else None,
+        }
+
+    @observe_async(NEXTCLOUD_SECONDS, NEXTCLOUD_IN_FLIGHT, "list_files")
+    async def list_files(self, path: str) -> list:
         """
         List files in a Nextcloud directory
         """
         try:
-            files = self.client.list(path)
+            files = await self.client.list(path)
             logger.debug(
                 "nextcloud_list_files_completed",
                 files_count=len(files),
@@ -0,0 +1,159 @@
+"""
+Local index of submitted projects (their metadata.json), so status lookups and
+the project listing don't need WebDAV round trips.
+
+Written when an upload is finalized; `rebuild()` re-creates it from Nextcloud
+(one Depth: 1 PROPFIND on nextcloud_base_path, then the metadata.json files).
+Status lookups revalidate entries older than project_index_ttl.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.db import projects
+from app.services.nextcloud import NextcloudService
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class ProjectQuery:
+    limit: int = 20
+    offset: int = 0
+    project_type: Optional[str] = None
+    institution: Optional[str] = None
+    # Case-insensitive substring of project title or id
+    search: Optional[str] = None
+    # ISO date or timestamp; uploaded_after is inclusive, uploaded_before exclusive
+    uploaded_after: Optional[str] = None
+    uploaded_before: Optional[str] = None
+
+
+def _row_values(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "project_id": metadata["project_id"],
+        "project_title": metadata.get("project_title") or "",
+        "project_type": metadata.get("project_type") or "new",
+        "institution": metadata.get("institution") or "",
+        "language": metadata.get("language") or "de",
+        "is_prospective_study": bool(metadata.get("is_prospective_study", False)),
+        "uploaded_at": metadata.get("upload_timestamp") or "",
+        "files_count": len(metadata.get("files") or []),
+        "metadata_json": json.dumps(metadata),
+        "indexed_at": time.time(),
+    }
+
+
+class ProjectIndex:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    async def upsert(self, metadata: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._upsert_many, [_row_values(metadata)])
+
+    async def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """The project's metadata.json content, or None if it is not indexed."""
+        entry = await self.get_entry(project_id)
+        return entry[0] if entry is not None else None
+
+    async def get_entry(self, project_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """The project's metadata.json content and its age in seconds, or None if it is not indexed."""
+        return await asyncio.to_thread(self._get, project_id)
+
+    async def delete(self, project_id: str) -> None:
+        await asyncio.to_thread(self._delete, project_id)
+
+    async def query(self, query: ProjectQuery) -> Dict[str, Any]:
+        """One page of projects (newest first) plus the total number of matches."""
+        return await asyncio.to_thread(self._query, query)
+
+    async def rebuild(self, nextcloud: NextcloudService, concurrency: int = 8) -> int:
+        """Replace the index with the metadata.json of every project folder in nextcloud_base_path."""
+        base_path = settings.nextcloud_base_path
+        resources = await nextcloud.client.propfind(base_path, depth=1)
+        own_path = "/" + base_path.strip("/")
+        folders = [r.name for r in resources if r.is_collection and r.path.rstrip("/") != own_path]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def load(folder: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    metadata = await nextcloud.get_metadata(folder)
+                except FileNotFoundError:
+                    return None
+            metadata.setdefault("project_id", folder)
+            return metadata
+
+        loaded = await asyncio.gather(*(load(folder) for folder in folders))
+        rows = [_row_values(metadata) for metadata in loaded if metadata is not None]
+        await asyncio.to_thread(self._replace_all, rows)
+        logger.info("project_index_rebuilt", folders=len(folders), projects=len(rows))
+        return len(rows)
+
+    def _upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        with self.engine.begin() as conn:
+            for values in rows:
+                stmt = insert(projects).values(**values)
+                conn.execute(stmt.on_conflict_do_update(index_elements=["project_id"], set_=values))
+
+    def _replace_all(self, rows: List[Dict[str, Any]]) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(projects))
+            if rows:
+                conn.execute(insert(projects), rows)
+
+    def _get(self, project_id: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(projects.c.metadata_json, projects.c.indexed_at).where(projects.c.project_id == project_id)
+            ).first()
+        if row is None:
+            return None
+        # Rows from before indexed_at existed count as stale
+        age = time.time() - row.indexed_at if row.indexed_at is not None else float("inf")
+        return json.loads(row.metadata_json), age
+
+    def _delete(self, project_id: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(projects).where(projects.c.project_id == project_id))
+
+    def _query(self, query: ProjectQuery) -> Dict[str, Any]:
+        conditions = []
+        if query.project_type:
+            conditions.append(projects.c.project_type == query.project_type)
+        if query.institution:
+            conditions.append(projects.c.institution == query.institution)
+        if query.search:
+            needle = query.search.lower()
+            conditions.append(
+                or_(
+                    func.lower(projects.c.project_title).contains(needle, autoescape=True),
+                    func.lower(projects.c.project_id).contains(needle, autoescape=True),
+                )
+            )
+        if query.uploaded_after:
+            conditions.append(projects.c.uploaded_at >= query.uploaded_after)
+        if query.uploaded_before:
+            conditions.append(projects.c.uploaded_at < query.uploaded_before)
+
+        columns = [c for c in projects.c if c.name not in ("metadata_json", "indexed_at")]
+        with self.engine.connect() as conn:
+            total = conn.execute(select(func.count()).select_from(projects).where(*conditions)).scalar()
+            rows = conn.execute(
+                select(*columns)
+                .where(*conditions)
+                .order_by(projects.c.uploaded_at.desc(), projects.c.project_id)
+                .limit(query.limit)
+                .offset(query.offset)
+            ).mappings().all()
+        return {"total": total, "items": [dict(row) for row in rows]}
@@ -0,0 +1,243 @@
+"""
+State of session-based uploads (/api/upload/sessions).
+
+A session is created once per submission (it owns the project folder), receives
+its files one request at a time and is finalized with metadata.json/README.md.
+Each session is one JSON file in data_dir, so every API worker sees the same
+state; updates are serialized with an exclusive file lock. Finalizing claims
+the session by renaming its file, so only one request can finalize it.
+"""
+import asyncio
+import fcntl
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_SESSION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_CLAIMED_SUFFIX = ".finalizing"
+
+
+class SessionLimitExceeded(Exception):
+    """A file would take the session beyond its file count or total size."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class SessionFinalizing(Exception):
+    """The session is already being finalized by another request."""
+
+
+@dataclass
+class UploadSession:
+    id: str
+    project_id: str
+    project_path: str
+    # Form fields of the submission (email, project_title, ...), needed again on finalize
+    submission: Dict[str, Any]
+    expires_at: float
+    files: List[Dict[str, Any]] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+
+    def is_expired(self) -> bool:
+        return self.expires_at <= time.time()
+
+    def other_files(self, filename: str) -> List[Dict[str, Any]]:
+        """Files of the session except `filename` (which an upload of that name replaces)."""
+        return [f for f in self.files if f["filename"] != filename]
+
+
+class UploadSessionStore:
+    def __init__(
+        self,
+        directory: Path,
+        ttl: float,
+        max_files: int = 100,
+        max_total_size: int = 262144000,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_files = max_files
+        self.max_total_size = max_total_size
+
+    def remaining_size(self, session: UploadSession, filename: str) -> int:
+        """Bytes a file named `filename` may still have within the session's total size."""
+        return self.max_total_size - sum(f["size"] for f in session.other_files(filename))
+
+    def check_limits(self, session: UploadSession, filename: str, size: int = 0) -> None:
+        """Raise SessionLimitExceeded if storing `filename` with `size` bytes exceeds the session limits."""
+        if len(session.other_files(filename)) >= self.max_files:
+            raise SessionLimitExceeded(f"Upload session is limited to {self.max_files} files")
+        if size > self.remaining_size(session, filename):
+            raise SessionLimitExceeded(
+                f"Upload session exceeds maximum total size of {self.max_total_size // (1024 * 1024)} MB"
+            )
+
+    async def create(self, project_id: str, project_path: str, submission: Dict[str, Any]) -> UploadSession:
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            project_id=project_id,
+            project_path=project_path,
+            submission=submission,
+            expires_at=time.time() + self.ttl,
+        )
+        await asyncio.to_thread(self._write_new, session)
+        logger.info("upload_session_created", session_id=session.id, project_id=project_id)
+        return session
+
+    async def get(self, session_id: str) -> Optional[UploadSession]:
+        """Return the session, or None if it does not exist or has expired."""
+        session = await asyncio.to_thread(self._read, session_id)
+        if session is None or session.is_expired():
+            return None
+        return session
+
+    async def add_file(self, session_id: str, file_info: Dict[str, Any]) -> Optional[UploadSession]:
+        """
+        Record an uploaded file; a file with the same name replaces the earlier entry.
+        Raises SessionLimitExceeded (and records nothing) if the file does not fit
+        the session limits, e.g. because concurrent uploads used up the budget.
+        """
+
+        def update(session: UploadSession) -> None:
+            self.check_limits(session, file_info["filename"], file_info["size"])
+            session.files = session.other_files(file_info["filename"])
+            session.files.append(file_info)
+
+        return await asyncio.to_thread(self._update, session_id, update)
+
+    async def claim(self, session_id: str) -> Optional[UploadSession]:
+        """
+        Take the session for finalizing: afterwards it accepts no more files and
+        further claims fail. Returns None if it does not exist or has expired;
+        raises SessionFinalizing if another request holds the claim.
+        """
+        return await asyncio.to_thread(self._claim, session_id)
+
+    async def release(self, session_id: str) -> None:
+        """Return a claimed session (finalizing failed), so it can be finalized again."""
+        path = self._path(session_id)
+        if path is not None:
+            await asyncio.to_thread(os.rename, self._claimed_path(path), path)
+
+    async def delete(self, session_id: str) -> None:
+        path = self._path(session_id)
+        if path is not None:
+            await asyncio.to_thread(self._unlink, path)
+            await asyncio.to_thread(self._unlink, self._claimed_path(path))
+
+    async def purge_expired(self) -> int:
+        """Delete expired session files. Their (partial) project folders stay in Nextcloud."""
+        return await asyncio.to_thread(self._purge_expired)
+
+    def _path(self, session_id: str) -> Optional[Path]:
+        # Session ids come from the URL: only accept our own format (no path traversal)
+        if not _SESSION_ID_RE.match(session_id):
+            return None
+        return self.directory / f"{session_id}.json"
+
+    @staticmethod
+    def _claimed_path(path: Path) -> Path:
+        return path.with_suffix(_CLAIMED_SUFFIX)
+
+    def _write_new(self, session: UploadSession) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._path(session.id), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(asdict(session), f)
+
+    def _read(self, session_id: str) -> Optional[UploadSession]:
+        path = self._path(session_id)
+        if path is None:
+            return None
+        return self._load(path, fcntl.LOCK_SH)
+
+    @staticmethod
+    def _load(path: Path, lock: int) -> Optional[UploadSession]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                fcntl.flock(f, lock)
+                return UploadSession(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            logger.error("upload_session_load_failed", session_id=path.stem, exc_info=True)
+            return None
+
+    def _claim(self, session_id: str) -> Optional[UploadSession]:
+        path = self._path(session_id)
+        if path is None:
+            return None
+        claimed = self._claimed_path(path)
+        try:
+            # rename() is atomic: of concurrent claims exactly one succeeds
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            if claimed.exists():
+                raise SessionFinalizing(session_id) from None
+            return None
+        # The exclusive lock waits for an add_file that opened the file before the rename
+        session = self._load(claimed, fcntl.LOCK_EX)
+        if session is None or session.is_expired():
+            self._unlink(claimed)
+            return None
+        return session
+
+    def _update(self, session_id: str, update: Callable[[UploadSession], None]) -> Optional[UploadSession]:
+        path = self._path(session_id)
+        if path is None:
+            return None
+        try:
+            with open(path, "r+", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # Claimed for finalizing after we opened it: the file was renamed away
+                if not self._is_current(f, path):
+                    return None
+                session = UploadSession(**json.load(f))
+                if session.is_expired():
+                    return None
+                update(session)
+                f.seek(0)
+                f.truncate()
+                json.dump(asdict(session), f)
+                return session
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _is_current(f, path: Path) -> bool:
+        try:
+            return os.path.samestat(os.fstat(f.fileno()), os.stat(path))
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _purge_expired(self) -> int:
+        if not self.directory.exists():
+            return 0
+        purged = 0
+        # Claimed sessions left behind by a crash during finalize expire like the others
+        for path in [*self.directory.glob("*.json"), *self.directory.glob(f"*{_CLAIMED_SUFFIX}")]:
+            session = self._load(path, fcntl.LOCK_SH)
+            if session is None or session.is_expired():
+                self._unlink(path)
+                purged += 1
+        if purged:
+            logger.info("upload_sessions_purged", count=purged)
+        return purged
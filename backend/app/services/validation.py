@@ -1,3 +1,212 @@
-# Placeholder for validation logic
-def validate_email(email: str) -> bool:
-    return True
+"""
+Content validation of uploaded files.
+
+Validators are plain functions that inspect one file and raise FileRejected.
+They run in a bounded thread pool, so expensive content checks never block the
+event loop; a per-file timeout and a limit on queued files keep a burst of large
+uploads from piling up (ValidationBusy -> 503). Results are cached by content
+digest, so resubmitted documents are not inspected again.
+
+Threads rather than processes: validators read the spooled upload files in
+place, and the heavy parts (zlib, hashing) release the GIL.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, FrozenSet, Optional, Sequence, Tuple
+
+import filetype
+import structlog
+
+from app.metrics import VALIDATION_CACHE, VALIDATION_QUEUE_DEPTH, VALIDATION_REJECTED
+from app.utils.cache import TTLCache
+
+logger = structlog.get_logger(__name__)
+
+# Leading bytes kept per uploaded file; enough for filetype's magic-byte detection
+MAGIC_HEADER_SIZE = 261
+
+# Mapping of allowed file extensions to permitted MIME types (magic-bytes check).
+# Prevents extension spoofing (CWE-434 / OWASP A01).
+ALLOWED_MIME_BY_EXT: dict[str, set[str]] = {
+    ".pdf":  {"application/pdf"},
+    ".doc":  {"application/msword"},
+    ".docx": {"application/vnd.openxmlformats-officedocument.wordprocessingml.document"},
+    ".odt":  {"application/vnd.oasis.opendocument.text"},
+    ".ods":  {"application/vnd.oasis.opendocument.spreadsheet"},
+    ".odp":  {"application/vnd.oasis.opendocument.presentation"},
+    ".odf":  {"application/vnd.oasis.opendocument.formula"},
+    ".zip":  {"application/zip"},
+    ".png":  {"image/png"},
+    ".jpg":  {"image/jpeg"},
+    ".jpeg": {"image/jpeg"},
+    ".xlsx": {"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"},
+    ".csv":  {"text/plain", "text/csv", "application/csv"},
+}
+
+
+class FileRejected(Exception):
+    """The file's content is not acceptable; `detail` is shown to the client."""
+
+    def __init__(self, detail: str, status_code: int = 400, reason: str = "content_rejected"):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+        self.reason = reason  # for logs/metrics, no PII
+
+    def copy(self) -> "FileRejected":
+        """Fresh instance for re-raising a cached result (keeps tracebacks from piling up)."""
+        return FileRejected(self.detail, self.status_code, self.reason)
+
+
+class ValidationBusy(Exception):
+    """Validation capacity exhausted or a validator timed out; the client should retry later."""
+
+
+@dataclass
+class FileCandidate:
+    """What validators see of one uploaded file."""
+
+    extension: str  # lower-case, with dot
+    size: Optional[int]
+    header: bytes  # the first MAGIC_HEADER_SIZE bytes
+    file: BinaryIO  # spooled content; validators that read it must not assume a position
+
+
+@dataclass(frozen=True)
+class Validator:
+    name: str
+    check: Callable[[FileCandidate], None]
+    # None: applies to every file type
+    extensions: Optional[FrozenSet[str]] = None
+
+    def applies_to(self, extension: str) -> bool:
+        return self.extensions is None or extension in self.extensions
+
+
+def check_magic_bytes(candidate: FileCandidate) -> None:
+    """
+    Verify that the file's magic bytes match the declared extension.
+    CSV files have no unique magic bytes and are allowed through as-is.
+    """
+    allowed_mimes = ALLOWED_MIME_BY_EXT.get(candidate.extension)
+    # CSV: no magic bytes – trust the extension (size/content limits still apply)
+    if allowed_mimes is not None and candidate.extension == ".csv":
+        return
+    kind = filetype.guess(candidate.header) if allowed_mimes is not None else None
+    if kind is None or kind.mime not in allowed_mimes:
+        raise FileRejected(
+            f"File content does not match declared type {candidate.extension}",
+            reason="magic_bytes_mismatch",
+        )
+
+
+DEFAULT_VALIDATORS: Tuple[Validator, ...] = (Validator("magic_bytes", check_magic_bytes),)
+
+
+class ValidationPipeline:
+    def __init__(
+        self,
+        validators: Sequence[Validator] = DEFAULT_VALIDATORS,
+        max_workers: int = 2,
+        max_pending: int = 16,
+        timeout: float = 30.0,
+        cache_size: int = 1024,
+        cache_ttl: float = 3600.0,
+    ):
+        self.validators = tuple(validators)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        # Created on first use so the pipeline can be shut down and reused (app lifespan, tests)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        # (digest, extension) -> None (accepted) or the FileRejected raised for it
+        self._results: TTLCache[Tuple[str, str], Optional[FileRejected]] = TTLCache(
+            maxsize=cache_size, ttl=cache_ttl
+        )
+        # (digest, extension) -> run in progress, joined by concurrent identical uploads
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future"] = {}
+
+    async def validate(self, candidate: FileCandidate, digest: Optional[str] = None) -> None:
+        """
+        Run every applicable validator on `candidate`; raises FileRejected or ValidationBusy.
+        `digest` (content SHA-256) enables the result cache; identical content that is
+        already being validated is not validated again, the caller waits for that run.
+        """
+        key = (digest, candidate.extension) if digest else None
+        if key is not None and key in self._results:
+            VALIDATION_CACHE.labels("hit").inc()
+            self._raise_rejection(self._results.get(key))
+            return
+
+        future = self._inflight.get(key) if key is not None else None
+        if future is not None:
+            VALIDATION_CACHE.labels("joined").inc()
+        else:
+            VALIDATION_CACHE.labels("miss").inc()
+            future = self._submit(candidate, key)
+        try:
+            rejection = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("validation_timed_out", file_extension=candidate.extension, timeout_s=self.timeout)
+            VALIDATION_REJECTED.labels("timeout").inc()
+            raise ValidationBusy("validation timed out") from None
+        self._raise_rejection(rejection)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self, candidate: FileCandidate, key: Optional[Tuple[str, str]]) -> "asyncio.Future":
+        if self._pending >= self.max_pending:
+            logger.warning("validation_saturated", pending=self._pending, max_pending=self.max_pending)
+            VALIDATION_REJECTED.labels("saturated").inc()
+            raise ValidationBusy("validation queue is full")
+        self._pending += 1
+        VALIDATION_QUEUE_DEPTH.inc()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="upload-validation")
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._run, candidate)
+        if key is not None:
+            self._inflight[key] = future
+        # A timed-out validator keeps its thread until it returns; count it until then
+        future.add_done_callback(lambda done: self._settle(key, done))
+        return future
+
+    def _settle(self, key: Optional[Tuple[str, str]], future: "asyncio.Future") -> None:
+        self._pending -= 1
+        VALIDATION_QUEUE_DEPTH.dec()
+        if key is not None:
+            self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+        # Retrieve the outcome so a validator that failed after its caller timed out
+        # (e.g. on the upload file Starlette closed meanwhile) is not reported as unhandled
+        if future.exception() is not None:
+            logger.debug("validation_failed_in_background", exc_info=future.exception())
+        elif key is not None:
+            # Cached here rather than by the caller, so runs that outlived a timeout count too
+            self._results.set(key, future.result())
+
+    @staticmethod
+    def _raise_rejection(rejection: Optional[FileRejected]) -> None:
+        if rejection is not None:
+            VALIDATION_REJECTED.labels(rejection.reason).inc()
+            raise rejection.copy()
+
+    def _run(self, candidate: FileCandidate) -> Optional[FileRejected]:
+        try:
+            for validator in self.validators:
+                if validator.applies_to(candidate.extension):
+                    validator.check(candidate)
+            return None
+        except FileRejected as rejection:
+            return rejection.with_traceback(None)
+        finally:
+            try:
+                candidate.file.seek(0)
+            except (ValueError, OSError):
+                # Closed by the request after a timeout; nobody reads it anymore
+                pass
@@ -0,0 +1,222 @@
+"""
+Minimal asyncio WebDAV client for Nextcloud.
+
+Replaces the synchronous webdavclient3 client: every call is a coroutine on a
+shared, pooled httpx.AsyncClient, so slow WebDAV round trips no longer block
+the event loop (and with it /api/health and every other request).
+"""
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Dict, Iterable, List, Mapping, Optional, Union
+from urllib.parse import quote, unquote, urlsplit
+import xml.etree.ElementTree as ET
+
+import httpx
+
+_DAV_NS = "{DAV:}"
+_OC_NS = "{http://owncloud.org/ns}"
+
+_PROPFIND_BODY = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<d:propfind xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns"><d:prop>'
+    b"<d:resourcetype/><d:getetag/><d:getcontentlength/><d:getlastmodified/><oc:checksums/>"
+    b"</d:prop></d:propfind>"
+)
+
+RequestContent = Union[bytes, str, Iterable[bytes], AsyncIterable[bytes]]
+
+
+class WebDAVError(Exception):
+    """Raised when the WebDAV server answers with an unexpected status code."""
+
+    def __init__(self, method: str, path: str, status_code: int):
+        super().__init__(f"WebDAV {method} failed with HTTP {status_code}")
+        self.method = method
+        self.path = path
+        self.status_code = status_code
+
+
+@dataclass
+class DAVResource:
+    """One <d:response> entry of a PROPFIND multistatus answer."""
+
+    path: str
+    is_collection: bool
+    etag: Optional[str] = None
+    content_length: Optional[int] = None
+    last_modified: Optional[str] = None
+    # Nextcloud's oc:checksums, e.g. ("SHA256:ab12...",); stored from OC-Checksum on upload
+    # and dropped by Nextcloud when the file is modified in place.
+    checksums: tuple = ()
+
+    @property
+    def name(self) -> str:
+        return self.path.rstrip("/").rsplit("/", 1)[-1]
+
+    def has_checksum(self, algorithm: str, digest: str) -> bool:
+        expected = f"{algorithm}:{digest}".lower()
+        return any(checksum.lower() == expected for checksum in self.checksums)
+
+
+class AsyncWebDAVClient:
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        *,
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        # Path prefix of the DAV root (e.g. /remote.php/dav/files/<user>), used to
+        # turn absolute hrefs in PROPFIND answers back into client-relative paths.
+        self._base_path = unquote(urlsplit(self.base_url).path).rstrip("/")
+        self._client = httpx.AsyncClient(
+            auth=(username, password),
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    def url(self, path: str) -> str:
+        normalized = path if path.startswith("/") else f"/{path}"
+        return f"{self.base_url}{quote(normalized, safe='/')}"
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        expected: Iterable[int],
+        headers: Optional[Mapping[str, str]] = None,
+        content: Optional[RequestContent] = None,
+    ) -> httpx.Response:
+        return await self.request_url(
+            method, self.url(path), expected=expected, headers=headers, content=content
+        )
+
+    async def request_url(
+        self,
+        method: str,
+        url: str,
+        *,
+        expected: Iterable[int],
+        headers: Optional[Mapping[str, str]] = None,
+        content: Optional[RequestContent] = None,
+    ) -> httpx.Response:
+        """Like request(), but for an absolute URL (e.g. Nextcloud's uploads endpoint)."""
+        response = await self._client.request(method, url, headers=headers, content=content)
+        if response.status_code not in expected:
+            raise WebDAVError(method, urlsplit(url).path, response.status_code)
+        return response
+
+    async def check(self, path: str) -> bool:
+        """Return True if the resource exists (PROPFIND with Depth: 0)."""
+        response = await self.request(
+            "PROPFIND",
+            path,
+            expected=(207, 404),
+            headers={"Depth": "0", "Content-Type": "application/xml"},
+            content=_PROPFIND_BODY,
+        )
+        return response.status_code == 207
+
+    async def mkdir(self, path: str) -> None:
+        await self.request("MKCOL", path, expected=(201,))
+
+    async def mkcol(self, path: str) -> int:
+        """
+        MKCOL without a preceding existence check. Returns the status code:
+        201 created, 405 already exists, 409 parent collection missing.
+        """
+        response = await self.request("MKCOL", path, expected=(201, 405, 409))
+        return response.status_code
+
+    async def put(
+        self,
+        path: str,
+        content: RequestContent,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        await self.request("PUT", path, expected=(200, 201, 204), headers=headers, content=content)
+
+    async def copy(self, source: str, destination: str, overwrite: bool = True) -> None:
+        """Server-side copy; no file content passes through the client."""
+        await self.request(
+            "COPY",
+            source,
+            expected=(201, 204),
+            headers={"Destination": self.url(destination), "Overwrite": "T" if overwrite else "F"},
+        )
+
+    async def get(self, path: str) -> bytes:
+        response = await self.request("GET", path, expected=(200,))
+        return response.content
+
+    async def propfind(self, path: str, depth: int = 1) -> List[DAVResource]:
+        response = await self.request(
+            "PROPFIND",
+            path,
+            expected=(207,),
+            headers={"Depth": str(depth), "Content-Type": "application/xml"},
+            content=_PROPFIND_BODY,
+        )
+        return self._parse_multistatus(response.content)
+
+    async def list(self, path: str) -> List[str]:
+        """List the names of the direct children of a collection."""
+        resources = await self.propfind(path, depth=1)
+        own_path = path.rstrip("/")
+        return [
+            r.name + ("/" if r.is_collection else "")
+            for r in resources
+            if r.path.rstrip("/") != own_path
+        ]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _parse_multistatus(self, body: bytes) -> List[DAVResource]:
+        resources: List[DAVResource] = []
+        root = ET.fromstring(body)
+        for response in root.iter(f"{_DAV_NS}response"):
+            href = unquote(response.findtext(f"{_DAV_NS}href", default=""))
+            href_path = urlsplit(href).path
+            if href_path.startswith(self._base_path):
+                href_path = href_path[len(self._base_path):] or "/"
+            props: Dict[str, Any] = {}
+            for propstat in response.iter(f"{_DAV_NS}propstat"):
+                status = propstat.findtext(f"{_DAV_NS}status", default="")
+                if " 200 " not in f"{status} ":
+                    continue
+                prop = propstat.find(f"{_DAV_NS}prop")
+                if prop is None:
+                    continue
+                resourcetype = prop.find(f"{_DAV_NS}resourcetype")
+                if resourcetype is not None:
+                    props["is_collection"] = resourcetype.find(f"{_DAV_NS}collection") is not None
+                props["etag"] = prop.findtext(f"{_DAV_NS}getetag")
+                length = prop.findtext(f"{_DAV_NS}getcontentlength")
+                props["content_length"] = int(length) if length else None
+                props["last_modified"] = prop.findtext(f"{_DAV_NS}getlastmodified")
+                # One <oc:checksum> element holding space-separated "ALGO:digest" pairs
+                props["checksums"] = tuple(
+                    value
+                    for element in prop.iter(f"{_OC_NS}checksum")
+                    for value in (element.text or "").split()
+                )
+            resources.append(
+                DAVResource(
+                    path=href_path,
+                    is_collection=props.get("is_collection", False),
+                    etag=props.get("etag"),
+                    content_length=props.get("content_length"),
+                    last_modified=props.get("last_modified"),
+                    checksums=props.get("checksums", ()),
+                )
+            )
+        return resources
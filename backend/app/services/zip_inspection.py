@@ -0,0 +1,134 @@
+"""
+Inspection of uploaded ZIP archives without extracting them.
+
+Only the central directory is read (seekable reads on the spooled upload), plus
+the first MAGIC_HEADER_SIZE bytes of each member for the magic-bytes policy.
+Memory stays bounded by the entry limit, which is checked against the end of
+central directory record before the directory itself is parsed.
+"""
+import io
+import os
+import struct
+import zipfile
+from typing import BinaryIO, Collection, Optional
+
+from app.services.validation import MAGIC_HEADER_SIZE, FileCandidate, FileRejected, check_magic_bytes
+
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_MAX_COMMENT = 0xFFFF
+
+# Metadata added by archivers (macOS Finder); not part of the submission
+_IGNORED_PREFIXES = ("__MACOSX/",)
+_IGNORED_NAMES = {".DS_Store", "Thumbs.db"}
+
+
+def _entry_count(fp: BinaryIO) -> Optional[int]:
+    """Number of entries declared in the end of central directory record (None if absent)."""
+    size = fp.seek(0, os.SEEK_END)
+    tail_size = min(size, _EOCD.size + _MAX_COMMENT)
+    fp.seek(size - tail_size)
+    tail = fp.read(tail_size)
+    index = tail.rfind(_EOCD_SIGNATURE)
+    if index < 0 or len(tail) - index < _EOCD.size:
+        return None
+    entries = _EOCD.unpack_from(tail, index)[4]
+    eocd_offset = size - tail_size + index
+    if entries != 0xFFFF or eocd_offset < _ZIP64_LOCATOR.size:
+        return entries
+
+    # ZIP64: the real count lives in the ZIP64 end record the locator points to
+    fp.seek(eocd_offset - _ZIP64_LOCATOR.size)
+    signature, _, zip64_offset, _ = _ZIP64_LOCATOR.unpack(fp.read(_ZIP64_LOCATOR.size))
+    if signature != _ZIP64_LOCATOR_SIGNATURE:
+        return entries
+    fp.seek(zip64_offset)
+    record = fp.read(_ZIP64_EOCD.size)
+    if len(record) < _ZIP64_EOCD.size or record[:4] != _ZIP64_EOCD_SIGNATURE:
+        return None
+    return _ZIP64_EOCD.unpack(record)[7]
+
+
+def _ignored(name: str) -> bool:
+    return name.startswith(_IGNORED_PREFIXES) or name.rsplit("/", 1)[-1] in _IGNORED_NAMES
+
+
+class ZipInspector:
+    """
+    Validator for `.zip` uploads. Rejects damaged and encrypted archives, more
+    than `max_entries` members, a declared uncompressed total above
+    `max_total_size`, members compressed better than `max_ratio` : 1 (zip bombs)
+    and members whose extension or magic bytes violate the upload policy.
+    Nested archives are checked like any other member but not opened.
+    """
+
+    def __init__(
+        self,
+        allowed_extensions: Collection[str],
+        max_entries: int = 1000,
+        max_total_size: int = 1073741824,
+        max_ratio: float = 100.0,
+    ):
+        self.allowed_extensions = frozenset(ext.lower() for ext in allowed_extensions)
+        self.max_entries = max_entries
+        self.max_total_size = max_total_size
+        self.max_ratio = max_ratio
+
+    def __call__(self, candidate: FileCandidate) -> None:
+        fp = candidate.file
+        entries = _entry_count(fp)
+        if entries is None:
+            raise FileRejected("Archive is damaged or not a ZIP file", reason="zip_damaged")
+        if entries > self.max_entries:
+            raise FileRejected(
+                f"Archive contains more than {self.max_entries} entries", reason="zip_too_many_entries"
+            )
+        fp.seek(0)
+        try:
+            with zipfile.ZipFile(fp) as archive:
+                self._check_members(archive)
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, EOFError, OSError):
+            raise FileRejected("Archive is damaged or not a ZIP file", reason="zip_damaged") from None
+
+    def _check_members(self, archive: zipfile.ZipFile) -> None:
+        members = [info for info in archive.infolist() if not info.is_dir() and not _ignored(info.filename)]
+        # Guards against a directory that disagrees with its end record
+        if len(members) > self.max_entries:
+            raise FileRejected(
+                f"Archive contains more than {self.max_entries} entries", reason="zip_too_many_entries"
+            )
+
+        total = 0
+        for info in members:
+            total += info.file_size
+            if total > self.max_total_size:
+                raise FileRejected(
+                    f"Archive expands to more than {self.max_total_size // (1024 * 1024)} MB",
+                    reason="zip_too_large",
+                )
+            if info.file_size > self.max_ratio * max(info.compress_size, 1):
+                raise FileRejected("Archive member is compressed suspiciously well", reason="zip_ratio")
+            if info.flag_bits & 0x1:
+                raise FileRejected("Encrypted archives cannot be checked", reason="zip_encrypted")
+
+        for info in members:
+            extension = os.path.splitext(info.filename)[1].lower()
+            if extension not in self.allowed_extensions:
+                raise FileRejected(
+                    f"Archive contains file type {extension or 'without extension'} which is not allowed",
+                    reason="zip_member_type",
+                )
+            # Decompresses at most the header; ZipExtFile never reads past the member's data
+            with archive.open(info) as member:
+                header = member.read(MAGIC_HEADER_SIZE)
+            try:
+                check_magic_bytes(FileCandidate(extension, info.file_size, header, io.BytesIO(header)))
+            except FileRejected:
+                raise FileRejected(
+                    f"Archive member content does not match declared type {extension}",
+                    reason="zip_member_mismatch",
+                ) from None
@@ -1,21 +1,24 @@
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.config import settings
+from app.utils.tokens import verify_session_token, verify_upload_token
 import hmac
 import logging
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
+async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     """
     Accept either:
       1. The static API token (server-to-server, e.g. /api/upload-token endpoint).
       2. A short-lived upload JWT issued by /api/upload-token (frontend uploads).
 
     Uses constant-time comparison for the static token to prevent timing attacks (CWE-208).
+    Async (no threadpool hop); repeated JWTs are answered from the verification cache.
     """
     token = credentials.credentials
     logger.debug("Token verification requested")
@@ -26,14 +29,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Security(security))
         return token
 
     # --- Path 2: short-lived upload JWT ---
-    # Import here to avoid circular dependency (token module imports verify_token)
-    try:
-        from app.routes.token import verify_upload_token
-        if verify_upload_token(token):
-            logger.debug("Upload JWT accepted")
-            return token
-    except Exception:
-        pass  # fall through to 401
+    if verify_upload_token(token):
+        logger.debug("Upload JWT accepted")
+        return token
 
     logger.warning(f"Invalid token provided (token length: {len(token) if token else 0})")
     raise HTTPException(
@@ -41,3 +39,66 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Security(security))
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def verify_session_access(
+    session_id: str,
+    credentials: HTTPAuthorizationCredentials = Security(security),
+) -> str:
+    """
+    Authorize a request against /api/upload/sessions/{session_id}/...: only the
+    session-scoped JWT issued when that session was created is accepted.
+    """
+    token_session_id = verify_session_token(credentials.credentials)
+    if token_session_id is None or not hmac.compare_digest(
+        token_session_id.encode(), session_id.encode()
+    ):
+        logger.warning("Invalid upload session token provided")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return session_id
+
+
+_optional_security = HTTPBearer(auto_error=False)
+
+
+async def verify_admin_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(_optional_security),
+) -> None:
+    """
+    Guard admin endpoints with settings.admin_token (constant-time compare, CWE-208).
+    The public API token and upload JWTs are not accepted: both are available to any browser.
+    Without a configured admin token the endpoints do not exist (404).
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = credentials.credentials if credentials else ""
+    if not hmac.compare_digest(token.encode(), settings.admin_token.encode()):
+        logger.warning("Invalid admin token provided")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def verify_metrics_access(
+    credentials: Optional[HTTPAuthorizationCredentials] = Security(_optional_security),
+) -> None:
+    """
+    Guard /metrics with settings.metrics_token (constant-time compare, CWE-208).
+    Unless metrics are enabled and a token is configured, the endpoint does not exist (404).
+    """
+    if not (settings.metrics_enabled and settings.metrics_token):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = credentials.credentials if credentials else ""
+    if not hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+        logger.warning("Invalid metrics token provided")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
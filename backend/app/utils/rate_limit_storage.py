@@ -0,0 +1,214 @@
+"""
+SQLite storage backend for slowapi/limits, shared by all worker processes on one host.
+
+Registered with limits under the ``sqlite`` scheme, so the Limiter takes it like
+any other storage URI (``sqlite:////app/data/rate_limits.db``). Implements the
+moving-window strategy (one row per hit, counted over the trailing window) and
+the fixed-window methods limits requires.
+
+slowapi calls the storage synchronously on the event loop, so nothing here may
+wait long: the write lock is waited for at most `busy_timeout` seconds, after
+which the request is let through (fail open, logged), and expired rows are swept
+in a background thread. Other database errors are raised.
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Tuple
+from urllib.parse import urlparse
+
+from limits.storage import MovingWindowSupport, Storage
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+import structlog
+
+from app.db import create_db_engine
+
+logger = structlog.get_logger(__name__)
+
+_BUSY_CODES = {sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED}
+
+
+def _is_busy(error: OperationalError) -> bool:
+    """The write lock was not free within busy_timeout (as opposed to e.g. a broken database)."""
+    code = getattr(error.orig, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in _BUSY_CODES  # extended codes (SQLITE_BUSY_SNAPSHOT, ...) included
+    message = str(error.orig)
+    return "database is locked" in message or "database is busy" in message
+
+schema = MetaData()
+
+# Moving window: one row per acquired entry
+rate_limit_hits = Table(
+    "rate_limit_hits",
+    schema,
+    Column("id", Integer, primary_key=True),
+    Column("key", String, nullable=False, index=True),
+    Column("hit_at", Float, nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+)
+
+# Fixed window: one counter per key
+rate_limit_windows = Table(
+    "rate_limit_windows",
+    schema,
+    Column("key", String, primary_key=True),
+    Column("count", Integer, nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+)
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Rate limit counters in a local SQLite file (WAL). Every check-and-record runs
+    in one BEGIN IMMEDIATE transaction, so limits hold across processes.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        sweep_interval: float = 60.0,
+        busy_timeout: float = 0.05,
+        **options: Any,
+    ):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = Path(urlparse(uri).path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.engine = create_db_engine(path, schema, immediate_transactions=True, busy_timeout=busy_timeout)
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.time() + sweep_interval
+        self._sweeping = threading.Lock()
+
+    @property
+    def base_exceptions(self) -> type:
+        return SQLAlchemyError
+
+    # --- moving window ---------------------------------------------------------------
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        self._maybe_sweep(now)
+        try:
+            with self.engine.begin() as conn:
+                used = conn.execute(
+                    select(func.count()).where(rate_limit_hits.c.key == key, rate_limit_hits.c.hit_at > now - expiry)
+                ).scalar_one()
+                if used + amount > limit:
+                    return False
+                conn.execute(
+                    rate_limit_hits.insert(),
+                    [{"key": key, "hit_at": now, "expires_at": now + expiry}] * amount,
+                )
+        except OperationalError as e:
+            if not _is_busy(e):
+                logger.error("rate_limit_storage_failed", exc_info=True)
+                raise
+            # Lock held by another worker beyond busy_timeout: don't stall the event loop
+            logger.warning("rate_limit_storage_busy", exc_info=True)
+            return True
+        return True
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> Tuple[float, int]:
+        now = time.time()
+        with self.engine.connect() as conn:
+            hits = conn.execute(
+                select(rate_limit_hits.c.hit_at)
+                .where(rate_limit_hits.c.key == key, rate_limit_hits.c.hit_at > now - expiry)
+                .order_by(rate_limit_hits.c.hit_at.desc())
+                .limit(limit)
+            ).scalars().all()
+        return (hits[-1] if hits else now), len(hits)
+
+    # --- fixed window ----------------------------------------------------------------
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        self._maybe_sweep(now)
+        try:
+            with self.engine.begin() as conn:
+                row = conn.execute(
+                    select(rate_limit_windows.c.count, rate_limit_windows.c.expires_at)
+                    .where(rate_limit_windows.c.key == key)
+                ).first()
+                if row is None or row.expires_at <= now:
+                    count, expires_at = amount, now + expiry
+                else:
+                    count, expires_at = row.count + amount, row.expires_at
+                stmt = insert(rate_limit_windows).values(key=key, count=count, expires_at=expires_at)
+                conn.execute(
+                    stmt.on_conflict_do_update(index_elements=["key"], set_={"count": count, "expires_at": expires_at})
+                )
+        except OperationalError as e:
+            if not _is_busy(e):
+                logger.error("rate_limit_storage_failed", exc_info=True)
+                raise
+            logger.warning("rate_limit_storage_busy", exc_info=True)
+            return amount  # fail open, as in acquire_entry
+        return count
+
+    def get(self, key: str) -> int:
+        with self.engine.connect() as conn:
+            count = conn.execute(
+                select(rate_limit_windows.c.count).where(
+                    rate_limit_windows.c.key == key, rate_limit_windows.c.expires_at > time.time()
+                )
+            ).scalar()
+        return count or 0
+
+    def get_expiry(self, key: str) -> float:
+        with self.engine.connect() as conn:
+            expires_at = conn.execute(
+                select(rate_limit_windows.c.expires_at).where(rate_limit_windows.c.key == key)
+            ).scalar()
+        return expires_at or time.time()
+
+    # --- maintenance -----------------------------------------------------------------
+
+    def check(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(select(1))
+            return True
+        except SQLAlchemyError:
+            return False
+
+    def reset(self) -> int:
+        with self.engine.begin() as conn:
+            removed = conn.execute(delete(rate_limit_hits)).rowcount
+            removed += conn.execute(delete(rate_limit_windows)).rowcount
+        return removed
+
+    def clear(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(rate_limit_hits).where(rate_limit_hits.c.key == key))
+            conn.execute(delete(rate_limit_windows).where(rate_limit_windows.c.key == key))
+
+    def sweep(self, now: float) -> int:
+        """Delete expired hits and windows; returns the number of rows removed."""
+        with self.engine.begin() as conn:
+            removed = conn.execute(delete(rate_limit_hits).where(rate_limit_hits.c.expires_at <= now)).rowcount
+            removed += conn.execute(delete(rate_limit_windows).where(rate_limit_windows.c.expires_at <= now)).rowcount
+        return removed
+
+    def _maybe_sweep(self, now: float) -> None:
+        # Per process; concurrent sweeps from several workers are harmless
+        if now >= self._next_sweep and self._sweeping.acquire(blocking=False):
+            self._next_sweep = now + self.sweep_interval
+            threading.Thread(target=self._sweep_in_background, args=(now,), daemon=True).start()
+
+    def _sweep_in_background(self, now: float) -> None:
+        try:
+            self.sweep(now)
+        except SQLAlchemyError:
+            # Lock contention; the next sweep catches up
+            logger.debug("rate_limit_sweep_skipped", exc_info=True)
+        finally:
+            self._sweeping.release()
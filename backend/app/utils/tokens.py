@@ -0,0 +1,86 @@
+"""
+Short-lived JWTs for uploads (issued by /api/upload-token and when an upload
+session is created), signed with SECRET_KEY.
+
+Tokens are presented again and again while a batch uploads and status is
+polled, so successfully verified tokens are remembered (by SHA-256 digest, not
+the token itself) until their `exp`; only unknown tokens pay for jwt.decode().
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import jwt
+
+from app.config import settings
+from app.utils.cache import TTLCache
+
+# (audience, token digest) -> verified claims; shared by all audiences
+_verified: TTLCache[tuple, Dict[str, Any]] = TTLCache(maxsize=4096, ttl=0)
+
+
+def _decode(token: str, audience: str, required_claims: tuple = ("exp",)) -> Optional[Dict[str, Any]]:
+    """Verified claims of `token` for `audience`, or None if it is invalid or expired."""
+    key = (audience, hashlib.sha256(token.encode()).digest())
+    claims = _verified.get(key)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(
+            token,
+            settings.secret_key,
+            algorithms=[settings.algorithm],
+            audience=audience,
+            options={"require": list(required_claims)},
+        )
+    except jwt.PyJWTError:
+        return None
+    # Cached only while the token is valid; the cache clock is monotonic
+    _verified.set(key, claims, ttl=float(claims["exp"]) - time.time())
+    return claims
+
+
+def create_upload_token() -> str:
+    """Issue a short-lived JWT granting permission to perform one upload batch."""
+    now = datetime.now(timezone.utc)
+    payload = {
+        "iss": "datenschutzportal",
+        "aud": "upload",
+        "iat": now,
+        "exp": now + timedelta(seconds=settings.upload_token_ttl_seconds),
+    }
+    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
+
+def verify_upload_token(token: str) -> bool:
+    """
+    Validate an upload session token.
+    Returns True if valid, False otherwise.
+    """
+    return _decode(token, "upload") is not None
+
+
+def create_session_token(session_id: str) -> str:
+    """
+    Issue a JWT scoped to one upload session (/api/upload/sessions/{session_id}/...).
+    It lives as long as the session, so large per-file uploads don't outlive it.
+    """
+    now = datetime.now(timezone.utc)
+    payload = {
+        "iss": "datenschutzportal",
+        "aud": "upload-session",
+        "sid": session_id,
+        "iat": now,
+        "exp": now + timedelta(seconds=settings.upload_session_ttl_seconds),
+    }
+    return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+
+
+def verify_session_token(token: str) -> Optional[str]:
+    """
+    Validate an upload session token.
+    Returns the session id it is scoped to, or None if the token is invalid.
+    """
+    claims = _decode(token, "upload-session", ("exp", "sid"))
+    return str(claims["sid"]) if claims is not None else None
@@ -0,0 +1,99 @@
+"""
+Form parsing for the multipart upload routes (route_class of their router).
+
+Uploaded files are held in memory up to upload_spool_max_size bytes, then spooled
+to a temporary file in upload_spool_dir (e.g. a tmpfs mount; empty: the system
+temp dir). Other routes keep Starlette's defaults.
+
+Starlette has no hook for the spool file, so UploadMultiPartParser swaps it right
+after the parser created it, using two of the parser's internal attributes.
+check_parser_compatibility() runs at import and fails loudly if a Starlette
+upgrade moves them.
+"""
+import tempfile
+from contextlib import aclosing
+from typing import Any, Callable, Coroutine, Optional
+
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from python_multipart.multipart import parse_options_header
+from starlette.datastructures import FormData, Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config import settings
+
+# Parser internals on_headers_finished() relies on
+_PARSER_ATTRIBUTES = ("_current_part", "_files_to_close_on_error")
+
+
+class UploadMultiPartParser(MultiPartParser):
+    def __init__(self, *args: Any, spool_max_size: int, spool_dir: Optional[str] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.spool_max_size = spool_max_size
+        self.spool_dir = spool_dir
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is None or not self.spool_dir:
+            return
+        # No data has been written yet: replace the (in-memory) spool file with one in our directory
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_max_size, dir=self.spool_dir)
+        upload.file.close()
+        upload.file = spool
+        self._files_to_close_on_error[-1] = spool
+
+
+def check_parser_compatibility() -> None:
+    parser = MultiPartParser(Headers(), None)  # type: ignore[arg-type]
+    missing = [name for name in _PARSER_ATTRIBUTES if not hasattr(parser, name)]
+    if missing or not hasattr(parser._current_part, "file"):
+        raise RuntimeError(
+            f"starlette.formparsers.MultiPartParser lacks {missing or ['_current_part.file']}; "
+            "update app/utils/upload_request.py for this Starlette version"
+        )
+
+
+check_parser_compatibility()
+
+
+class UploadRequest(Request):
+    async def form(  # type: ignore[override]
+        self,
+        *,
+        max_files: int | float = 1000,
+        max_fields: int | float = 1000,
+        max_part_size: int = 1024 * 1024,
+    ) -> FormData:
+        """Like Request.form(), with the upload spool settings; awaitable only."""
+        content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+        if content_type != b"multipart/form-data":
+            return await super().form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+        async with aclosing(self.stream()) as stream:
+            parser = UploadMultiPartParser(
+                self.headers,
+                stream,
+                max_files=max_files,
+                max_fields=max_fields,
+                max_part_size=max_part_size,
+                spool_max_size=settings.upload_spool_max_size,
+                spool_dir=settings.upload_spool_dir or None,
+            )
+            try:
+                return await parser.parse()
+            except MultiPartException as exc:
+                raise HTTPException(status_code=400, detail=exc.message)
+
+
+class UploadRoute(APIRoute):
+    """Route class that hands the endpoint (and FastAPI's form parsing) an UploadRequest."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def upload_route_handler(request: Request) -> Response:
+            return await handler(UploadRequest(request.scope, request.receive))
+
+        return upload_route_handler
@@ -0,0 +1,6 @@
+"""
+Standalone performance benchmarks for the backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.bench_event_loop``.
+They need no Nextcloud/SMTP server: slow peers are simulated locally.
+"""
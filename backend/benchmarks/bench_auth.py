@@ -0,0 +1,62 @@
+"""
+Auth overhead per request for a repeatedly presented upload JWT.
+
+"legacy" mirrors the former dependency: a sync function (run in the threadpool
+by FastAPI) that runs jwt.decode() with signature check every time. "cached" awaits the current verify_token, which
+answers known tokens from the verification cache.
+
+    python -m benchmarks.bench_auth [--requests 5000]
+"""
+import argparse
+import asyncio
+import hmac
+import time
+from typing import List
+
+from benchmarks.common import bootstrap_env, quiet_logs, summarize_ms
+
+
+async def _measure(verify, requests: int) -> List[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await verify()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _run(requests: int) -> None:
+    import jwt
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.config import settings
+    from app.utils.auth import verify_token
+    from app.utils.tokens import create_upload_token
+
+    token = create_upload_token()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def legacy_verify_token():
+        if hmac.compare_digest(token.encode(), settings.api_token.encode()):
+            return token
+        jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm], audience="upload")
+        return token
+
+    legacy = await _measure(lambda: run_in_threadpool(legacy_verify_token), requests)
+    cached = await _measure(lambda: verify_token(credentials), requests)
+    print(f"legacy: {summarize_ms(legacy)}")
+    print(f"cached: {summarize_ms(cached)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    bootstrap_env()
+    quiet_logs()
+    asyncio.run(_run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
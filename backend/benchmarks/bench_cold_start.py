@@ -0,0 +1,94 @@
+"""
+Cold start: time from process start to the first successful upload.
+
+Each variant runs in a fresh interpreter that imports app.main, enters the app
+lifespan and posts one upload against a fake WebDAV server with --latency
+seconds per request. "lazy" disables the startup warm-up (STARTUP_WARM_UP=false),
+so the first upload probes Nextcloud and opens connections itself; "warm" is
+the default. SMTP points at a closed port (e-mails are sent in the background).
+
+    python -m benchmarks.bench_cold_start [--runs 3] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import FakeWebDAVServer, bootstrap_env
+
+_START = time.perf_counter()
+
+
+async def _child() -> dict:
+    from unittest.mock import AsyncMock, patch
+
+    from httpx import ASGITransport, AsyncClient
+
+    from app import db
+    from app.config import settings
+
+    imported = time.perf_counter()
+    from app.main import app
+    from app.services.container import Services
+
+    imported = time.perf_counter() - imported
+    app.state.services = Services.from_settings(settings, db.engine)
+    with patch.object(app.state.services, "email_outbox") as outbox:
+        outbox.enqueue = AsyncMock(return_value="job-id")
+        outbox.stop = AsyncMock()
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                response = await client.post(
+                    "/api/upload",
+                    data={"email": "bench@uni-frankfurt.de", "project_title": f"Cold {os.getpid()}", "institution": "university"},
+                    files=[("files", ("a.pdf", b"%PDF-1.4 cold start", "application/pdf"))],
+                    headers={"Authorization": f"Bearer {settings.api_token}"},
+                )
+            done = time.perf_counter()
+    assert response.status_code == 200, response.text
+    return {
+        "import_ms": imported * 1000,
+        "startup_ms": (ready - _START) * 1000,
+        "first_upload_ms": (done - ready) * 1000,
+        "total_ms": (done - _START) * 1000,
+    }
+
+
+def _spawn(variant: str, url: str) -> dict:
+    env = dict(os.environ, NEXTCLOUD_URL=url, LOG_LEVEL="ERROR", STARTUP_WARM_UP=str(variant == "warm").lower())
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_cold_start", "--child"],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per WebDAV request")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    bootstrap_env(SMTP_PORT="1")
+    if args.child:
+        print(json.dumps(asyncio.run(_child())))
+        return
+
+    with FakeWebDAVServer(latency=args.latency) as server:
+        for variant in ("lazy", "warm"):
+            runs = [_spawn(variant, server.url) for _ in range(args.runs)]
+            avg = {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+            print(
+                f"{variant:>4}: first upload {avg['first_upload_ms']:7.1f}ms | "
+                f"ready after {avg['startup_ms']:7.1f}ms (import {avg['import_ms']:.1f}ms) | "
+                f"process start -> first upload done {avg['total_ms']:7.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
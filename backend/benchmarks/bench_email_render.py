@@ -0,0 +1,66 @@
+"""
+Render time per confirmation e-mail.
+
+"legacy" mirrors the former setup (CWD-relative FileSystemLoader, auto_reload
+on, get_template on every send); "precompiled" uses EmailService's preloaded
+templates. "cold start" is the time to build an EmailService (template
+compilation, or loading from the bytecode cache on later runs).
+
+    python -m benchmarks.bench_email_render [--renders 2000]
+"""
+import argparse
+import time
+
+from benchmarks.common import bootstrap_env, quiet_logs, summarize_ms
+
+_CONTEXT = {
+    "project_id": "Studie_zur_Datenschutz-Compliance_2024-01-01",
+    "project_title": "Studie zur Datenschutz-Compliance",
+    "uploader_name": "Dr. Max Mustermann",
+    "files": [{"filename": f"dokument_{i}.pdf", "category": "datenschutzkonzept"} for i in range(7)],
+    "files_count": 7,
+    "timestamp": "01.01.2024 10:00",
+    "project_type": "new",
+}
+
+
+def _measure(render, renders: int) -> list:
+    samples = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    bootstrap_env()
+    quiet_logs()
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    from app.services.email_service import TEMPLATES_DIR, EmailService
+
+    legacy_env = Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(["html", "xml"]),
+    )
+    legacy = _measure(
+        lambda: legacy_env.get_template("email_confirmation_de.html").render(**_CONTEXT), args.renders
+    )
+
+    start = time.perf_counter()
+    service = EmailService()
+    cold_start = time.perf_counter() - start
+    template = service._templates["email_confirmation_de.html"]
+    precompiled = _measure(lambda: template.render(**_CONTEXT), args.renders)
+
+    print(f"     legacy: {summarize_ms(legacy)}")
+    print(f"precompiled: {summarize_ms(precompiled)}")
+    print(f" cold start: {cold_start * 1000:.2f}ms (EmailService(), all templates)")
+
+
+if __name__ == "__main__":
+    main()
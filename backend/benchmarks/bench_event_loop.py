@@ -0,0 +1,75 @@
+"""
+Event-loop stall benchmark for NextcloudService uploads.
+
+Runs N concurrent uploads against a fake WebDAV server with artificial latency
+while a heartbeat task measures how late the event loop wakes it up. The
+"blocking" variant performs the same PUTs synchronously inside the coroutine,
+which is what the former webdavclient3-based service did.
+
+    python -m benchmarks.bench_event_loop [--uploads 10] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import time
+import urllib.request
+from typing import List
+
+from benchmarks.common import FakeWebDAVServer, bootstrap_env, quiet_logs, summarize_ms
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+def _blocking_put(url: str, body: bytes) -> None:
+    request = urllib.request.Request(url, data=body, method="PUT")
+    with urllib.request.urlopen(request) as response:
+        response.read()
+
+
+async def _run(variant: str, uploads: int, payload: bytes, server: FakeWebDAVServer) -> None:
+    from app.services.nextcloud import NextcloudService
+
+    service = NextcloudService()
+
+    async def upload(index: int) -> None:
+        path = f"/bench/file_{index}.bin"
+        if variant == "blocking":
+            _blocking_put(service.client.url(path), payload)
+        else:
+            await service.client.put(path, payload)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    beat = asyncio.create_task(_heartbeat(stop, 0.01, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(i) for i in range(uploads)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    await service.aclose()
+    print(f"{variant:>8}: {uploads} uploads in {elapsed:.2f}s | loop lag {summarize_ms(lags)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2, help="server latency per request (s)")
+    parser.add_argument("--size", type=int, default=256 * 1024, help="payload size in bytes")
+    args = parser.parse_args()
+
+    payload = b"x" * args.size
+    with FakeWebDAVServer(latency=args.latency) as server:
+        server.existing.add("/bench")
+        bootstrap_env(NEXTCLOUD_URL=server.url)
+        quiet_logs()
+        for variant in ("blocking", "async"):
+            asyncio.run(_run(variant, args.uploads, payload, server))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Request latency with synchronous vs. queued (async) logging.
+
+stderr is replaced by a sink that stalls each write for --write-latency
+seconds, like a log pipe whose reader (Docker, journald) falls behind. "sync"
+writes every line from the event loop (LOG_ASYNC_QUEUE_SIZE=0); "async" hands
+rendered lines to the background writer (LOG_ASYNC_QUEUE_SIZE=--queue-size).
+Drops are reported for the async mode.
+
+    python -m benchmarks.bench_logging [--requests 2000] [--concurrency 20] [--write-latency 0.0005]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List
+
+from benchmarks.common import bootstrap_env, summarize_ms
+
+
+class _SlowSink:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, data: str) -> int:
+        time.sleep(self.latency)
+        self.lines += 1
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+async def _run(variant: str, requests: int, concurrency: int, queue_size: int) -> None:
+    from httpx import ASGITransport, AsyncClient
+    from app.logging_config import configure_logging, dropped_log_records, stop_logging
+    from app.main import app
+
+    configure_logging(
+        service_name="bench", env="bench", log_level="DEBUG",
+        async_queue_size=queue_size if variant == "async" else 0,
+    )
+    latencies: List[float] = []
+    remaining = requests
+
+    async def worker(client):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get("/api/health")
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    stop_logging()
+    dropped = f" | dropped {dropped_log_records()}" if variant == "async" else ""
+    print(f"{variant:>5}: {requests / elapsed:7.0f} req/s | {summarize_ms(latencies)}{dropped}", file=sys.__stdout__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-latency", type=float, default=0.0005, help="seconds per written log line")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    bootstrap_env()
+    sys.stderr = _SlowSink(args.write_latency)
+    for variant in ("sync", "async"):
+        asyncio.run(_run(variant, args.requests, args.concurrency, args.queue_size))
+
+
+if __name__ == "__main__":
+    main()
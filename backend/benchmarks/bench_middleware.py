@@ -0,0 +1,146 @@
+"""
+Requests per second through the full middleware stack.
+
+"basehttp" swaps RequestContextMiddleware and SecurityHeadersMiddleware for
+equivalents built on Starlette's BaseHTTPMiddleware (the former
+implementation); "asgi" uses the app as shipped. Requests go through httpx's
+in-process ASGI transport, Nextcloud and the e-mail outbox are mocked out.
+Uploads run at most VALIDATION_MAX_PENDING at a time, so they are not shed
+with 503 by the validation pipeline; every response must be a 200.
+
+    python -m benchmarks.bench_middleware [--requests 2000] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+from benchmarks.common import bootstrap_env, quiet_logs
+
+_PDF = b"%PDF-1.4 benchmark"
+
+
+def _legacy_middlewares():
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    class LegacyRequestContextMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            incoming = request.headers.get("x-request-id")
+            request_id = incoming.strip() if incoming else str(uuid.uuid4())
+            request.state.started_at = time.perf_counter()
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+    class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            response = await call_next(request)
+            response.headers["X-Content-Type-Options"] = "nosniff"
+            response.headers["X-Frame-Options"] = "DENY"
+            response.headers["X-XSS-Protection"] = "1; mode=block"
+            response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+            response.headers["Cache-Control"] = "no-store"
+            response.headers["Pragma"] = "no-cache"
+            response.headers["Content-Security-Policy"] = "default-src 'none'; frame-ancestors 'none'"
+            return response
+
+    return LegacyRequestContextMiddleware, LegacySecurityHeadersMiddleware
+
+
+def _use_variant(app, variant: str) -> None:
+    from starlette.middleware import Middleware
+    from app.middleware.request_context import RequestContextMiddleware
+    from app.middleware.security_headers import SecurityHeadersMiddleware
+
+    if not hasattr(app, "_bench_middleware"):
+        app._bench_middleware = list(app.user_middleware)
+    replacements = {}
+    if variant == "basehttp":
+        legacy_context, legacy_headers = _legacy_middlewares()
+        replacements = {RequestContextMiddleware: legacy_context, SecurityHeadersMiddleware: legacy_headers}
+    app.user_middleware = [
+        Middleware(replacements[m.cls], *m.args, **m.kwargs) if m.cls in replacements else m
+        for m in app._bench_middleware
+    ]
+    app.middleware_stack = None
+
+
+async def _measure(client, request, requests: int, concurrency: int) -> float:
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await request(client)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def _run(requests: int, concurrency: int) -> None:
+    from httpx import ASGITransport, AsyncClient
+    from app import db
+    from app.config import settings
+    from app.limiter import limiter
+    from app.main import app
+    from app.services.container import Services, get_services
+
+    limiter.enabled = False
+    auth = {"Authorization": f"Bearer {settings.api_token}"}
+
+    async def health(client):
+        return await client.get("/api/health")
+
+    async def upload(client):
+        return await client.post(
+            "/api/upload",
+            data={"email": "bench@uni-frankfurt.de", "project_title": "Bench", "institution": "university"},
+            files=[("files", ("bench.pdf", _PDF, "application/pdf"))],
+            headers=auth,
+        )
+
+    services = Services.from_settings(settings, db.engine)
+    app.dependency_overrides[get_services] = lambda: services
+    with patch.object(services, "nextcloud") as nextcloud, \
+         patch.object(services, "nextcloud_health") as nextcloud_health, \
+         patch.object(services, "email_outbox") as outbox, \
+         patch.object(services, "content_index", new_callable=AsyncMock) as content_index, \
+         patch.object(services, "project_index", new_callable=AsyncMock):
+        nextcloud_health.ensure_available = AsyncMock(return_value=(True, "Connection successful"))
+        for name in ("create_folder", "upload_file", "upload_metadata", "upload_content"):
+            setattr(nextcloud, name, AsyncMock(return_value=True))
+        outbox.enqueue = AsyncMock(return_value="job-id")
+        content_index.lookup.return_value = None
+
+        scenarios = (
+            ("/api/health", health, requests, concurrency),
+            ("/api/upload", upload, requests // 4, min(concurrency, settings.validation_max_pending)),
+        )
+        for name, request, count, parallel in scenarios:
+            for variant in ("basehttp", "asgi"):
+                _use_variant(app, variant)
+                async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                    await _measure(client, request, min(count, 50), parallel)  # warm-up
+                    rps = await _measure(client, request, count, parallel)
+                print(f"{name:>12} {variant:>8}: {rps:8.0f} req/s ({count} requests, concurrency {parallel})")
+    services.validation_pipeline.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    bootstrap_env()
+    quiet_logs(logging.ERROR)
+    asyncio.run(_run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
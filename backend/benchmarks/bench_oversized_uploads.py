@@ -0,0 +1,114 @@
+"""
+Load test: concurrent oversized multipart uploads against POST /api/upload.
+
+Each request carries one file of --size bytes (above MAX_FILE_SIZE) and is
+streamed in 64 KiB messages without Content-Length, so only the streaming
+checks can stop it. "unguarded" removes BodySizeLimitMiddleware, i.e. the
+request is only rejected after Starlette parsed and spooled the whole body.
+
+    python -m benchmarks.bench_oversized_uploads [--requests 20] [--size 64000000]
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List, Tuple
+
+from benchmarks.common import bootstrap_env, quiet_logs, summarize_ms
+
+_BOUNDARY = b"benchboundary"
+_CHUNK = 64 * 1024
+
+
+def _multipart_chunks(size: int):
+    fields = {"email": "bench@example.com", "project_title": "Bench", "institution": "university"}
+    head = b"".join(
+        b"--" + _BOUNDARY + b"\r\n"
+        + f'Content-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in fields.items()
+    ) + (
+        b"--" + _BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="files"; filename="big.pdf"\r\n'
+        b"Content-Type: application/pdf\r\n\r\n%PDF-1.4"
+    )
+    tail = b"\r\n--" + _BOUNDARY + b"--\r\n"
+    yield head
+    filler = b"x" * _CHUNK
+    remaining = size
+    while remaining > 0:
+        yield filler[:min(_CHUNK, remaining)]
+        remaining -= _CHUNK
+    yield tail
+
+
+async def _post(app, size: int, token: str) -> Tuple[int, int, float]:
+    """One request; returns (status, bytes pulled by the app, seconds)."""
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/api/upload", "raw_path": b"/api/upload", "query_string": b"", "root_path": "",
+        "headers": [
+            (b"content-type", b"multipart/form-data; boundary=" + _BOUNDARY),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    chunks = _multipart_chunks(size)
+    pending = next(chunks)
+    consumed = 0
+    status = 0
+
+    async def receive():
+        nonlocal pending, consumed
+        body = pending
+        consumed += len(body)
+        pending = next(chunks, None)
+        await asyncio.sleep(0)  # let concurrent requests interleave like network reads
+        return {"type": "http.request", "body": body, "more_body": pending is not None}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status, consumed, time.perf_counter() - start
+
+
+async def _run(variant: str, requests: int, size: int) -> None:
+    from app.config import settings
+    from app.limiter import limiter
+    from app.main import app
+    from app.middleware.body_limit import BodySizeLimitMiddleware
+
+    limiter.enabled = False
+    if variant == "unguarded":
+        app.user_middleware = [m for m in app.user_middleware if m.cls is not BodySizeLimitMiddleware]
+        app.middleware_stack = None
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_post(app, size, settings.api_token) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    statuses = sorted({status for status, _, _ in results})
+    read_mb = sum(consumed for _, consumed, _ in results) / (1024 * 1024)
+    latencies: List[float] = [seconds for _, _, seconds in results]
+    print(
+        f"{variant:>9}: {requests} x {size / (1024 * 1024):.0f} MB in {elapsed:.2f}s | "
+        f"status {statuses} | read {read_mb:.1f} MB | time to reject {summarize_ms(latencies)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--size", type=int, default=64_000_000, help="file size per request in bytes")
+    args = parser.parse_args()
+
+    bootstrap_env(MAX_FILE_SIZE=str(8 * 1024 * 1024))
+    quiet_logs(logging.ERROR)
+    for variant in ("guarded", "unguarded"):
+        asyncio.run(_run(variant, args.requests, args.size))
+
+
+if __name__ == "__main__":
+    main()
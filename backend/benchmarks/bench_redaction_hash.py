@@ -0,0 +1,60 @@
+"""
+Cost of the PII hashes logged during one upload.
+
+Replays the hmac_sha256_hex calls of a submission with --files files (project
+folder segments in create_folder, 2-3 hashes per uploaded file and the e-mail
+hash) against the former one-shot hmac.new() and the keyed, memoized helper.
+
+    python -m benchmarks.bench_redaction_hash [--uploads 2000] [--files 7]
+"""
+import argparse
+import hashlib
+import hmac
+import time
+from typing import Callable, List
+
+from benchmarks.common import bootstrap_env, summarize_ms
+
+
+def _legacy_hash(value: str, secret: str) -> str:
+    return hmac.new(secret.encode("utf-8"), value.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _upload_values(upload: int, files: int) -> List[str]:
+    project = f"/Datenschutzportal/Studie_{upload}_2024-01-01_10-00-00"
+    values = ["/Datenschutzportal", project, project]  # folder segments, cached re-check
+    for index in range(files):
+        remote_path = f"{project}/datenschutzkonzept_{index}.pdf"
+        values += [remote_path, remote_path, remote_path]  # started, completed, metadata entry
+    values += [f"{project}/metadata.json", f"{project}/README.md", f"user{upload % 50}@uni-frankfurt.de"]
+    return values
+
+
+def _measure(hash_fn: Callable[[str, str], str], secret: str, uploads: int, files: int) -> List[float]:
+    samples = []
+    for upload in range(uploads):
+        values = _upload_values(upload, files)
+        start = time.perf_counter()
+        for value in values:
+            hash_fn(value, secret)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=7)
+    args = parser.parse_args()
+
+    bootstrap_env()
+    from app.config import settings
+    from app.logging_config import hmac_sha256_hex
+
+    secret = settings.log_redaction_secret
+    print(f"   legacy: {summarize_ms(_measure(_legacy_hash, secret, args.uploads, args.files))} per upload")
+    print(f" memoized: {summarize_ms(_measure(hmac_sha256_hex, secret, args.uploads, args.files))} per upload")
+
+
+if __name__ == "__main__":
+    main()
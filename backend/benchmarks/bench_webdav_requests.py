@@ -0,0 +1,64 @@
+"""
+Counts WebDAV requests per upload for the folder handling in NextcloudService.
+
+"before" replays the former check-then-create walk (PROPFIND + MKCOL per path
+segment); "after" uses create_folder with MKCOL-first and the folder cache.
+Each simulated submission creates its project folder and PUTs a few files,
+metadata.json and README.md.
+
+    python -m benchmarks.bench_webdav_requests [--submissions 20] [--files 3]
+"""
+import argparse
+import asyncio
+
+from benchmarks.common import FakeWebDAVServer, bootstrap_env, quiet_logs
+
+
+async def _legacy_create_folder(service, path: str) -> None:
+    current = ""
+    for part in path.strip("/").split("/"):
+        current = f"{current}/{part}"
+        if not await service.client.check(current):
+            await service.client.mkdir(current)
+
+
+async def _run(variant: str, submissions: int, files: int, server: FakeWebDAVServer) -> None:
+    from app.config import settings
+    from app.services.nextcloud import NextcloudService
+
+    server.existing = {"/"}
+    server.reset_counts()
+    service = NextcloudService()
+    for index in range(submissions):
+        project_path = f"{settings.nextcloud_base_path}/Projekt_{index}_2024-01-01"
+        if variant == "before":
+            await _legacy_create_folder(service, project_path)
+        else:
+            assert await service.create_folder(project_path)
+        for name in [f"doc_{n}.pdf" for n in range(files)] + ["metadata.json", "README.md"]:
+            await service.client.put(f"{project_path}/{name}", b"%PDF-1.4")
+    await service.aclose()
+
+    total = sum(server.counts.values())
+    folder_requests = server.counts.get("PROPFIND", 0) + server.counts.get("MKCOL", 0)
+    print(
+        f"{variant:>6}: {total / submissions:.2f} requests/upload "
+        f"({folder_requests / submissions:.2f} for folders) | {dict(sorted(server.counts.items()))}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=20)
+    parser.add_argument("--files", type=int, default=3)
+    args = parser.parse_args()
+
+    with FakeWebDAVServer() as server:
+        bootstrap_env(NEXTCLOUD_URL=server.url)
+        quiet_logs()
+        for variant in ("before", "after"):
+            asyncio.run(_run(variant, args.submissions, args.files, server))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Cost of inspecting large ZIP uploads.
+
+Builds archives in temp files (many small members, a few large members, a
+ZIP64 archive with more entries than the limit and a zip bomb) and runs the
+ZipInspector on each, reporting time and peak Python heap (tracemalloc).
+For comparison, "extract" decompresses every member fully in memory, which is
+what a naive check of member contents would do.
+
+    python -m benchmarks.bench_zip_inspection [--size-mb 200] [--entries 1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from typing import BinaryIO, Callable, Dict
+
+from benchmarks.common import bootstrap_env
+
+_PDF_HEADER = b"%PDF-1.4\n"
+
+
+def _build_many(fp: BinaryIO, entries: int, size_mb: int) -> None:
+    member = _PDF_HEADER + os.urandom(max(1, size_mb * 1024 * 1024 // entries))
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_STORED) as archive:
+        for index in range(entries):
+            archive.writestr(f"Anlagen/anlage_{index}.pdf", member)
+
+
+def _build_large(fp: BinaryIO, entries: int, size_mb: int) -> None:
+    block = os.urandom(1024 * 1024)
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index in range(4):
+            with archive.open(f"scan_{index}.pdf", "w", force_zip64=True) as member:
+                member.write(_PDF_HEADER)
+                for _ in range(size_mb // 4):
+                    member.write(block)
+
+
+def _build_zip64_entries(fp: BinaryIO, entries: int, size_mb: int) -> None:
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_STORED) as archive:
+        for index in range(70000):
+            archive.writestr(f"{index}.csv", b"")
+
+
+def _build_bomb(fp: BinaryIO, entries: int, size_mb: int) -> None:
+    zeros = b"\x00" * (1024 * 1024)
+    with zipfile.ZipFile(fp, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        with archive.open("daten.csv", "w", force_zip64=True) as member:
+            for _ in range(size_mb * 4):
+                member.write(zeros)
+
+
+def _extract(fp: BinaryIO) -> None:
+    with zipfile.ZipFile(fp) as archive:
+        for info in archive.infolist():
+            archive.read(info)
+
+
+def _measure(label: str, check: Callable[[BinaryIO], None], fp: BinaryIO) -> None:
+    from app.services.validation import FileRejected
+
+    fp.seek(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        check(fp)
+        outcome = "accepted"
+    except FileRejected as e:
+        outcome = f"rejected ({e.reason})"
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:>8}: {elapsed * 1000:9.1f}ms peak={peak / (1024 * 1024):8.2f}MiB {outcome}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--skip-extract", action="store_true", help="only run the inspector")
+    args = parser.parse_args()
+
+    bootstrap_env()
+    from app.config import settings
+    from app.services.validation import MAGIC_HEADER_SIZE, FileCandidate
+    from app.services.zip_inspection import ZipInspector
+
+    inspector = ZipInspector(
+        settings.allowed_file_types,
+        max_entries=max(args.entries, settings.zip_max_entries),
+        max_total_size=settings.zip_max_uncompressed_size,
+        max_ratio=settings.zip_max_compression_ratio,
+    )
+
+    def inspect(fp: BinaryIO) -> None:
+        inspector(FileCandidate(extension=".zip", size=None, header=fp.read(MAGIC_HEADER_SIZE), file=fp))
+
+    builders: Dict[str, Callable[[BinaryIO, int, int], None]] = {
+        f"{args.entries} small members": _build_many,
+        "4 large members": _build_large,
+        "70000 entries (ZIP64)": _build_zip64_entries,
+        "zip bomb": _build_bomb,
+    }
+    for name, build in builders.items():
+        with tempfile.TemporaryFile() as fp:
+            build(fp, args.entries, args.size_mb)
+            print(f"{name}: archive {fp.tell() / (1024 * 1024):.1f}MiB")
+            _measure("inspect", inspect, fp)
+            if not args.skip_extract:
+                _measure("extract", _extract, fp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Shared helpers for the benchmarks: dummy settings and a local fake WebDAV server.
+"""
+import logging
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence
+
+import structlog
+
+_DUMMY_ENV = {
+    "LOG_REDACTION_SECRET": "benchmark",
+    "NEXTCLOUD_URL": "http://127.0.0.1:1/remote.php/dav/files/bench",
+    "NEXTCLOUD_USERNAME": "bench",
+    "NEXTCLOUD_PASSWORD": "bench",
+    "SMTP_HOST": "127.0.0.1",
+    "SMTP_USERNAME": "bench",
+    "SMTP_PASSWORD": "bench",
+    "SMTP_FROM_EMAIL": "bench@example.com",
+    "NOTIFICATION_EMAILS": "team@example.com",
+    "SECRET_KEY": "benchmark-secret",
+    "API_TOKEN": "benchmark-token",
+}
+
+
+def bootstrap_env(**overrides: str) -> None:
+    """
+    Provide the required settings so app modules can be imported without a .env.
+    Must run before the first ``app`` import; ``overrides`` always win.
+    """
+    for key, value in _DUMMY_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.update(overrides)
+
+
+def quiet_logs(level: int = logging.WARNING) -> None:
+    """Drop app log lines below `level` so they do not drown the benchmark output."""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(level))
+
+
+class FakeWebDAVServer:
+    """
+    Threaded HTTP server answering WebDAV verbs with a fixed artificial latency.
+    Request counts per method are recorded in ``counts``.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.counts: Dict[str, int] = {}
+        self.existing = {"/"}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):  # keep benchmark output clean
+                pass
+
+            def _consume_body(self) -> None:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                        if not size:
+                            self.rfile.readline()  # CRLF after the last chunk
+                            return
+                        self.rfile.read(size)
+                        self.rfile.readline()
+                remaining = int(self.headers.get("Content-Length") or 0)
+                while remaining:
+                    remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+
+            def _reply(self, status: int, body: bytes = b"") -> None:
+                self._consume_body()
+                time.sleep(server.latency)
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _count(self) -> str:
+                path = self.path.split("/remote.php/dav/files/bench", 1)[-1] or "/"
+                with server._lock:
+                    server.counts[self.command] = server.counts.get(self.command, 0) + 1
+                return path.rstrip("/") or "/"
+
+            def do_PROPFIND(self):
+                path = self._count()
+                if path in server.existing:
+                    body = (
+                        '<?xml version="1.0"?><d:multistatus xmlns:d="DAV:"><d:response>'
+                        f"<d:href>{self.path}</d:href></d:response></d:multistatus>"
+                    ).encode()
+                    self._reply(207, body)
+                else:
+                    self._reply(404)
+
+            def do_MKCOL(self):
+                path = self._count()
+                parent = path.rsplit("/", 1)[0] or "/"
+                with server._lock:
+                    if path in server.existing:
+                        status = 405
+                    elif parent not in server.existing and "/uploads/" not in self.path:
+                        status = 409
+                    else:
+                        server.existing.add(path)
+                        status = 201
+                self._reply(status)
+
+            def do_PUT(self):
+                path = self._count()
+                parent = path.rsplit("/", 1)[0] or "/"
+                ok = parent in server.existing or "/uploads/" in self.path
+                self._reply(201 if ok else 409)
+
+            def do_MOVE(self):
+                self._count()
+                self._reply(201)
+
+            def do_COPY(self):
+                self._count()
+                self._reply(201)
+
+            def do_DELETE(self):
+                self._count()
+                self._reply(204)
+
+            def do_GET(self):
+                self._count()
+                self._reply(200, b"{}")
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/remote.php/dav/files/bench"
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+    def __enter__(self) -> "FakeWebDAVServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    ordered: List[float] = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize_ms(values: Sequence[float]) -> str:
+    ms = [v * 1000 for v in values]
+    if not ms:
+        return "n=0"
+    return (
+        f"n={len(ms)} mean={statistics.fmean(ms):.2f}ms "
+        f"p50={percentile(ms, 50):.2f}ms p99={percentile(ms, 99):.2f}ms max={max(ms):.2f}ms"
+    )
@@ -0,0 +1,63 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Module-level state (rate limits, portal.db) resolves its files in DATA_DIR at import
+# time: keep it out of the real backend/data.
+_DATA_DIR = tempfile.mkdtemp(prefix="datenschutzportal-tests-")
+os.environ["DATA_DIR"] = _DATA_DIR
+atexit.register(shutil.rmtree, _DATA_DIR, ignore_errors=True)
+
+from app.config import settings  # noqa: E402
+from app.db import create_db_engine  # noqa: E402
+from app.limiter import limiter  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.container import Services, get_services  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Files created on demand during a test (settings.data_path) land in its tmp_path."""
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def db_engine(tmp_path):
+    """Fresh local database per test, so indexed uploads from earlier tests never match."""
+    engine = create_db_engine(tmp_path / "test.db")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def services(data_dir, db_engine):
+    """
+    The app's services for one test, built as in the lifespan but not started, and
+    injected via get_services. Tests swap members, e.g. `patch.object(services, "nextcloud")`.
+    """
+    services = Services.from_settings(settings, db_engine)
+    app.dependency_overrides[get_services] = lambda: services
+    yield services
+    app.dependency_overrides.pop(get_services, None)
+    services.validation_pipeline.shutdown()
+
+
+@pytest.fixture
+def content_index(services):
+    return services.content_index
+
+
+@pytest.fixture
+def project_index(services):
+    return services.project_index
+
+
+@pytest.fixture(autouse=True)
+def rate_limits():
+    """Rate limit counters are shared across processes and runs; start every test fresh."""
+    limiter.reset()
+    yield limiter
@@ -0,0 +1,33 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.utils import tokens
+from app.utils.auth import verify_token
+
+
+def _credentials(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.mark.asyncio
+async def test_verified_upload_token_is_cached_until_exp(monkeypatch):
+    token = tokens.create_upload_token()
+    calls = []
+    decode = tokens.jwt.decode
+    monkeypatch.setattr(tokens.jwt, "decode", lambda *a, **kw: calls.append(1) or decode(*a, **kw))
+
+    assert await verify_token(_credentials(token)) == token
+    assert await verify_token(_credentials(token)) == token
+    assert len(calls) == 1
+    # Cached per audience: a session-token check still decodes (and rejects) it
+    assert tokens.verify_session_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_is_rejected_and_not_cached():
+    cached = len(tokens._verified)
+    with pytest.raises(HTTPException) as exc_info:
+        await verify_token(_credentials("not-a-jwt"))
+    assert exc_info.value.status_code == 401
+    assert len(tokens._verified) == cached
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+from fastapi import FastAPI, File, Request, UploadFile
+
+from app.middleware.body_limit import (
+    BodySizeLimitMiddleware,
+    uploaded_parts,
+)
+from app.services.validation import MAGIC_HEADER_SIZE
+
+_BOUNDARY = b"testboundary"
+_CHUNK = 64 * 1024
+
+
+def _app(max_body_size: int, max_file_size: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_size=max_body_size, max_file_size=max_file_size)
+
+    @app.post("/upload")
+    async def upload(request: Request, files: list[UploadFile] = File(...)):
+        parts = uploaded_parts(request, "files")
+        return {
+            "sizes": [f.size for f in files],
+            "sha256": [p.sha256 for p in parts],
+            "headers": [len(p.header) for p in parts],
+        }
+
+    return app
+
+
+def _multipart(*sizes: int) -> bytes:
+    body = b""
+    for i, size in enumerate(sizes):
+        body += (
+            b"--" + _BOUNDARY + b"\r\n"
+            + f'Content-Disposition: form-data; name="files"; filename="f{i}.bin"\r\n'.encode()
+            + b"Content-Type: application/octet-stream\r\n\r\n"
+            + b"x" * size + b"\r\n"
+        )
+    return body + b"--" + _BOUNDARY + b"--\r\n"
+
+
+async def _post(app, body: bytes, content_length: bool = False, path: str = "/upload"):
+    """Send `body` in chunks; returns (status, response body, bytes the app pulled)."""
+    headers = [(b"content-type", b"multipart/form-data; boundary=" + _BOUNDARY)]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": headers, "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    consumed = 0
+    messages = []
+
+    async def receive():
+        nonlocal consumed
+        chunk = body[consumed:consumed + _CHUNK]
+        consumed += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": consumed < len(body)}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    status = next(m["status"] for m in messages if m["type"] == "http.response.start")
+    payload = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return status, json.loads(payload), consumed
+
+
+@pytest.mark.asyncio
+async def test_body_within_limits_passes():
+    status, payload, _ = await _post(_app(max_body_size=1 << 20, max_file_size=256 * 1024), _multipart(100, 200_000))
+    assert status == 200
+    assert payload == {
+        "sizes": [100, 200_000],
+        # Hashed while streaming, across 64 KiB receive messages
+        "sha256": [hashlib.sha256(b"x" * 100).hexdigest(), hashlib.sha256(b"x" * 200_000).hexdigest()],
+        "headers": [100, MAGIC_HEADER_SIZE],
+    }
+
+
+@pytest.mark.asyncio
+async def test_declared_content_length_is_rejected_before_reading():
+    body = _multipart(2 << 20)
+    status, _, consumed = await _post(_app(max_body_size=1 << 20, max_file_size=4 << 20), body, content_length=True)
+    assert status == 413
+    assert consumed == 0
+
+
+@pytest.mark.asyncio
+async def test_streamed_body_is_rejected_once_over_the_request_limit():
+    body = _multipart(512 * 1024, 512 * 1024, 512 * 1024)
+    status, _, consumed = await _post(_app(max_body_size=1 << 20, max_file_size=1 << 20), body)
+    assert status == 413
+    assert consumed <= (1 << 20) + _CHUNK
+
+
+@pytest.mark.asyncio
+async def test_oversized_file_is_rejected_while_parsing():
+    body = _multipart(1000, 8 << 20)
+    status, payload, consumed = await _post(_app(max_body_size=64 << 20, max_file_size=256 * 1024), body)
+    assert status == 413
+    assert "File exceeds maximum size" in payload["detail"]
+    assert consumed <= 256 * 1024 + 2 * _CHUNK
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inspects /proc/self/fd")
+async def test_upload_spool_dir_applies_to_upload_routes_only(tmp_path, monkeypatch):
+    from fastapi import APIRouter
+
+    from app.config import settings
+    from app.utils.upload_request import UploadRoute
+
+    monkeypatch.setattr(settings, "upload_spool_max_size", 1024)
+    monkeypatch.setattr(settings, "upload_spool_dir", str(tmp_path))
+    app = FastAPI()
+    spool_dirs = {}
+
+    def spool_dir(file: UploadFile) -> str:
+        spooled = file.file
+        assert spooled._rolled
+        # Unnamed temp file (O_TMPFILE); its directory is visible through /proc
+        return os.path.dirname(os.readlink(f"/proc/self/fd/{spooled.fileno()}"))
+
+    uploads = APIRouter(route_class=UploadRoute)
+
+    @uploads.post("/upload")
+    async def upload(files: list[UploadFile] = File(...)):
+        spool_dirs["upload"] = spool_dir(files[0])
+        return {}
+
+    @app.post("/other")
+    async def other(files: list[UploadFile] = File(...)):
+        spool_dirs["other"] = spool_dir(files[0])
+        return {}
+
+    app.include_router(uploads)
+    # Starlette's default spool size is 1 MiB
+    status, _, _ = await _post(app, _multipart(2 << 20))
+    assert status == 200
+    status, _, _ = await _post(app, _multipart(2 << 20), path="/other")
+    assert status == 200
+
+    assert spool_dirs["upload"] == str(tmp_path)
+    assert spool_dirs["other"] == tempfile.gettempdir()
+
+
+def test_starlette_parser_internals_are_still_there():
+    from app.utils.upload_request import check_parser_compatibility
+
+    check_parser_compatibility()
@@ -0,0 +1,67 @@
+import hashlib
+import io
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import UploadFile
+
+from app.routes.upload import _store_file
+
+_PDF = b"%PDF-1.4 Datenschutzkonzept"
+_DIGEST = hashlib.sha256(_PDF).hexdigest()
+
+
+def _pdf() -> UploadFile:
+    return UploadFile(file=io.BytesIO(_PDF), size=len(_PDF), filename="konzept.pdf")
+
+
+@pytest.mark.asyncio
+async def test_index_lookup_record_forget(services, content_index):
+    assert await content_index.lookup(_DIGEST) is None
+    await content_index.record(_DIGEST, "/Datenschutzportal/A/konzept.pdf", len(_PDF))
+    await content_index.record(_DIGEST, "/Datenschutzportal/B/konzept.pdf", len(_PDF))
+    assert await content_index.lookup(_DIGEST) == ("/Datenschutzportal/B/konzept.pdf", len(_PDF))
+
+    # Only the entry for that path is dropped
+    await content_index.forget(_DIGEST, "/Datenschutzportal/A/konzept.pdf")
+    assert await content_index.lookup(_DIGEST) is not None
+    await content_index.forget(_DIGEST, "/Datenschutzportal/B/konzept.pdf")
+    assert await content_index.lookup(_DIGEST) is None
+
+
+@pytest.mark.asyncio
+async def test_resubmitted_file_is_copied_instead_of_uploaded(services, content_index):
+    with patch.object(services, "nextcloud") as mock_nextcloud:
+        mock_nextcloud.upload_file = AsyncMock(return_value=True)
+        mock_nextcloud.copy_file = AsyncMock(return_value=True)
+
+        assert await _store_file(services, _pdf(), "/Datenschutzportal/Projekt_2024-01-01/konzept.pdf", _DIGEST)
+        assert await _store_file(services, _pdf(), "/Datenschutzportal/RE_Projekt_2024-02-01/konzept.pdf", _DIGEST)
+
+    mock_nextcloud.upload_file.assert_awaited_once()
+    mock_nextcloud.copy_file.assert_awaited_once_with(
+        "/Datenschutzportal/Projekt_2024-01-01/konzept.pdf",
+        "/Datenschutzportal/RE_Projekt_2024-02-01/konzept.pdf",
+        len(_PDF),
+        _DIGEST,
+    )
+    assert await content_index.stats() == {
+        "dedup_hits": 1,
+        "dedup_misses": 1,
+        "dedup_bytes_saved": len(_PDF),
+    }
+
+
+@pytest.mark.asyncio
+async def test_stale_index_entry_falls_back_to_upload(services, content_index):
+    await content_index.record(_DIGEST, "/Datenschutzportal/Deleted/konzept.pdf", len(_PDF))
+    with patch.object(services, "nextcloud") as mock_nextcloud:
+        mock_nextcloud.upload_file = AsyncMock(return_value=True)
+        mock_nextcloud.copy_file = AsyncMock(return_value=False)
+
+        assert await _store_file(services, _pdf(), "/Datenschutzportal/RE_Projekt/konzept.pdf", _DIGEST)
+
+    mock_nextcloud.upload_file.assert_awaited_once()
+    # The stale entry is replaced by the fresh upload
+    assert await content_index.lookup(_DIGEST) == ("/Datenschutzportal/RE_Projekt/konzept.pdf", len(_PDF))
+    assert (await content_index.stats())["dedup_misses"] == 1
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.email_outbox import EmailOutbox, worker_outbox_path
+
+
+def _email_service(*results):
+    service = MagicMock()
+    service.send_confirmation_email = AsyncMock(side_effect=list(results))
+    service.send_team_notification = AsyncMock(return_value=True)
+    return service
+
+
+async def _drain(outbox: EmailOutbox, timeout: float = 2.0) -> None:
+    async def wait():
+        while outbox.pending:
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(wait(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_outbox_sends_in_background_and_clears_persisted_job(tmp_path):
+    path = tmp_path / "outbox.json"
+    service = _email_service(True)
+    outbox = EmailOutbox(service, path=path)
+
+    await outbox.enqueue("confirmation", to_email="a@example.com", project_id="P")
+    assert [job["kind"] for job in json.loads(path.read_text())] == ["confirmation"]
+
+    outbox.start()
+    try:
+        await _drain(outbox)
+    finally:
+        await outbox.stop()
+
+    service.send_confirmation_email.assert_awaited_once_with(to_email="a@example.com", project_id="P")
+    assert json.loads(path.read_text()) == []
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_failed_sends(tmp_path):
+    service = _email_service(False, RuntimeError("smtp down"), True)
+    outbox = EmailOutbox(service, path=tmp_path / "outbox.json", backoff=0.0)
+    outbox.start()
+    try:
+        await outbox.enqueue("confirmation", to_email="a@example.com")
+        await _drain(outbox)
+    finally:
+        await outbox.stop()
+
+    assert service.send_confirmation_email.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_outbox_drops_job_after_max_attempts(tmp_path):
+    service = _email_service(False, False)
+    outbox = EmailOutbox(service, path=tmp_path / "outbox.json", max_attempts=2, backoff=0.0)
+    outbox.start()
+    try:
+        await outbox.enqueue("confirmation", to_email="a@example.com")
+        await _drain(outbox)
+    finally:
+        await outbox.stop()
+
+    assert service.send_confirmation_email.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_outbox_resumes_persisted_jobs_after_restart(tmp_path):
+    path = tmp_path / "outbox.json"
+    # Process 1 queues a job but stops before the worker ran.
+    first = EmailOutbox(_email_service(), path=path)
+    await first.enqueue("team_notification", project_id="P", project_title="T", uploader_email="a@example.com", file_names=["a.pdf"])
+
+    service = _email_service()
+    second = EmailOutbox(service, path=path)
+    second.start()
+    try:
+        await _drain(second)
+    finally:
+        await second.stop()
+
+    service.send_team_notification.assert_awaited_once()
+    assert json.loads(path.read_text()) == []
+
+
+@pytest.mark.asyncio
+async def test_outbox_rejects_unknown_kind(tmp_path):
+    outbox = EmailOutbox(_email_service(), path=tmp_path / "outbox.json")
+    with pytest.raises(ValueError):
+        await outbox.enqueue("newsletter", to_email="a@example.com")
+
+
+@pytest.mark.asyncio
+async def test_worker_adopts_outbox_files_of_dead_processes(tmp_path, monkeypatch):
+    base = tmp_path / "email_outbox.json"
+    job = {"kind": "team_notification", "payload": {"project_id": "p"}, "id": "j1", "attempts": 0, "enqueued_at": 0.0}
+    (tmp_path / "email_outbox.999999.json").write_text(json.dumps([job]))
+    (tmp_path / "email_outbox.1.json").write_text(json.dumps([dict(job, id="alive")]))
+    monkeypatch.setattr("app.services.email_outbox._pid_alive", lambda pid: pid == 1)
+
+    service = _email_service()
+    outbox = EmailOutbox(service, path=worker_outbox_path(base), adopt_from=base)
+    outbox.start()
+    await _drain(outbox)
+    await outbox.stop()
+
+    service.send_team_notification.assert_awaited_once_with(project_id="p")
+    assert not (tmp_path / "email_outbox.999999.json").exists()
+    # Files of running workers are left to them
+    assert (tmp_path / "email_outbox.1.json").exists()
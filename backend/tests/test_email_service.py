@@ -0,0 +1,137 @@
+import aiosmtplib
+import pytest
+from jinja2 import TemplateNotFound
+from unittest.mock import patch
+
+from app.config import settings
+from app.services.email_service import EMAIL_TEMPLATES, EmailService, SMTPConnectionPool
+
+
+class FakeSMTP:
+    """Stands in for aiosmtplib.SMTP; records connects and sent messages."""
+
+    instances: list = []
+
+    def __init__(self):
+        self.is_connected = False
+        self.connects = 0
+        self.noops = 0
+        self.sent = []
+        self.fail_next_send = False
+        self.refuse = set()
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.connects += 1
+        self.is_connected = True
+
+    async def noop(self):
+        self.noops += 1
+
+    async def send_message(self, message, recipients):
+        if self.fail_next_send:
+            self.fail_next_send = False
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("gone")
+        self.sent.append((message, recipients))
+        refused = {r: aiosmtplib.SMTPResponse(550, "No such user") for r in recipients if r in self.refuse}
+        return refused, "OK"
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.fixture
+def email_service():
+    FakeSMTP.instances = []
+    service = EmailService()
+    service.smtp_pool = SMTPConnectionPool(factory=FakeSMTP, max_size=1)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_consecutive_sends_reuse_one_session(email_service):
+    assert await email_service.send_email("a@example.com", "s1", "<p>1</p>")
+    assert await email_service.send_email("b@example.com", "s2", "<p>2</p>")
+
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].connects == 1
+    assert len(FakeSMTP.instances[0].sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_team_notification_is_one_message_to_all_recipients(email_service):
+    team = ["t1@example.com", "t2@example.com", "t3@example.com"]
+    with patch.object(settings, "notification_emails", team):
+        assert await email_service.send_team_notification(
+            project_id="P", project_title="T", uploader_email="u@example.com", file_names=["a.pdf"]
+        )
+
+    (smtp,) = FakeSMTP.instances
+    assert len(smtp.sent) == 1
+    message, recipients = smtp.sent[0]
+    assert recipients == team
+    # Team members do not see each other's addresses
+    assert message["To"] == settings.smtp_from_email
+    assert "t1@example.com" not in message["To"]
+
+
+@pytest.mark.asyncio
+async def test_refused_recipients_are_logged(email_service):
+    await email_service.smtp_pool.warm_up()
+    FakeSMTP.instances[0].refuse = {"t2@example.com"}
+    with patch("app.services.email_service.logger") as mock_logger:
+        assert await email_service.send_email(["t1@example.com", "t2@example.com"], "s", "<p></p>")
+
+    mock_logger.warning.assert_called_once()
+    assert mock_logger.warning.call_args.args[0] == "email_recipients_refused"
+    assert mock_logger.warning.call_args.kwargs["refused_count"] == 1
+    assert mock_logger.warning.call_args.kwargs["codes"] == [550]
+
+
+@pytest.mark.asyncio
+async def test_dropped_session_is_replaced_and_message_retried(email_service):
+    assert await email_service.send_email("a@example.com", "s1", "<p>1</p>")
+    FakeSMTP.instances[0].fail_next_send = True
+
+    assert await email_service.send_email("b@example.com", "s2", "<p>2</p>")
+    assert len(FakeSMTP.instances) == 2
+    assert len(FakeSMTP.instances[1].sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_health_checked_or_closed():
+    FakeSMTP.instances = []
+    pool = SMTPConnectionPool(factory=FakeSMTP, max_size=1, idle_timeout=60.0, health_check_after=0.0)
+    async with pool.connection():
+        pass
+    async with pool.connection() as smtp:
+        assert smtp.noops == 1
+    assert len(FakeSMTP.instances) == 1
+
+    pool._idle_timeout = 0.0
+    async with pool.connection():
+        pass
+    assert len(FakeSMTP.instances) == 2
+    await pool.close()
+    assert not any(s.is_connected for s in FakeSMTP.instances)
+
+
+def test_templates_load_independent_of_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = EmailService()
+    assert set(EMAIL_TEMPLATES) <= set(service._templates)
+    html = service._templates["email_confirmation_en.html"].render(
+        project_id="P", project_title="T", uploader_name="U", files=[], files_count=0,
+        timestamp="01.01.2024 10:00", project_type="new",
+    )
+    assert "P" in html
+
+
+def test_missing_template_fails_fast(monkeypatch):
+    monkeypatch.setattr("app.services.email_service.EMAIL_TEMPLATES", (*EMAIL_TEMPLATES, "missing.html"))
+    with pytest.raises(TemplateNotFound):
+        EmailService()
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from unittest.mock import AsyncMock, MagicMock
+
+from app.main import app
+from app.services.health_monitor import NextcloudHealthMonitor
+
+
+def _monitor(ok: bool = True, max_age: float = 60.0) -> NextcloudHealthMonitor:
+    service = MagicMock()
+    service.test_connection = AsyncMock(
+        return_value=(ok, "Connection successful" if ok else "Failed to connect to Nextcloud: cloud.internal:443 refused")
+    )
+    return NextcloudHealthMonitor(service, interval=30.0, unhealthy_interval=5.0, max_age=max_age)
+
+
+@pytest.mark.asyncio
+async def test_ensure_available_uses_cached_probe():
+    monitor = _monitor()
+    assert await monitor.ensure_available() == (True, "Connection successful")
+    assert await monitor.ensure_available() == (True, "Connection successful")
+    # Only the first call had no cached result and probed inline
+    assert monitor.service.test_connection.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ensure_available_reprobes_stale_result():
+    monitor = _monitor(max_age=0.0)
+    await monitor.ensure_available()
+    await monitor.ensure_available()
+    assert monitor.service.test_connection.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stale_checks_share_one_probe():
+    monitor = _monitor()
+
+    async def slow_connection():
+        await asyncio.sleep(0.01)
+        return True, "Connection successful"
+
+    monitor.service.test_connection.side_effect = slow_connection
+    results = await asyncio.gather(*(monitor.ensure_available() for _ in range(5)))
+    assert results == [(True, "Connection successful")] * 5
+    assert monitor.service.test_connection.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ensure_available_fails_fast_when_cached_down():
+    monitor = _monitor(ok=False)
+    await monitor.probe()
+    ok, _ = await monitor.ensure_available()
+    assert not ok
+    assert monitor.service.test_connection.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_readiness_reflects_cached_status(services):
+    monitor = _monitor(ok=False)
+    services.nextcloud_health = monitor
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        # Liveness never depends on Nextcloud
+        assert (await client.get("/api/health")).json() == {"status": "ok"}
+
+        response = await client.get("/api/health/ready")
+        assert response.status_code == 503
+        assert response.json()["nextcloud"]["ok"] is None
+
+        await monitor.probe()
+        response = await client.get("/api/health/ready")
+        assert response.status_code == 503
+        assert response.json()["nextcloud"]["ok"] is False
+        # Error details stay in the logs
+        assert "cloud.internal" not in response.text
+
+        monitor.service.test_connection.return_value = (True, "Connection successful")
+        await monitor.probe()
+        response = await client.get("/api/health/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
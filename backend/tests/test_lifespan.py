@@ -0,0 +1,48 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import settings
+from app.main import app
+from app.services.container import Services
+
+
+def _services(monkeypatch):
+    services = Services(**{field: MagicMock() for field in Services.__dataclass_fields__})
+    services.nextcloud_health.probe = AsyncMock()
+    services.nextcloud_health.stop = AsyncMock()
+    services.email_service.warm_up = AsyncMock()
+    services.email_service.aclose = AsyncMock()
+    services.nextcloud.aclose = AsyncMock()
+    services.email_outbox.stop = AsyncMock()
+    services.session_store.purge_expired = AsyncMock()
+    monkeypatch.setattr(app.state, "services", services, raising=False)
+    return services
+
+
+@pytest.mark.asyncio
+async def test_lifespan_warms_up_starts_and_closes_services(monkeypatch):
+    services = _services(monkeypatch)
+    monkeypatch.setattr(settings, "startup_warm_up", True)
+
+    async with app.router.lifespan_context(app):
+        services.nextcloud_health.probe.assert_awaited_once()
+        services.email_service.warm_up.assert_awaited_once()
+        services.nextcloud_health.start.assert_called_once()
+        services.email_outbox.start.assert_called_once()
+        services.nextcloud.aclose.assert_not_awaited()
+
+    services.nextcloud_health.stop.assert_awaited_once()
+    services.email_outbox.stop.assert_awaited_once()
+    services.email_service.aclose.assert_awaited_once()
+    services.nextcloud.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_does_not_prevent_startup(monkeypatch):
+    services = _services(monkeypatch)
+    services.email_service.warm_up.side_effect = OSError("connection refused")
+    monkeypatch.setattr(settings, "startup_warm_up", True)
+
+    async with app.router.lifespan_context(app):
+        services.nextcloud_health.start.assert_called_once()
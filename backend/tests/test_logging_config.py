@@ -0,0 +1,52 @@
+import hashlib
+import hmac
+import json
+import logging
+
+import structlog
+
+from app.logging_config import (
+    _BoundedQueueHandler,
+    _RedactionHasher,
+    configure_logging,
+    dropped_log_records,
+    hmac_sha256_hex,
+    stop_logging,
+)
+
+
+def test_async_logging_writes_json_from_background_thread(capsys):
+    configure_logging(service_name="test", env="test", async_queue_size=100)
+    try:
+        structlog.get_logger("test").info("queued_event", email="user@example.org", files_count=2)
+        logging.getLogger("uvicorn.error").info("uvicorn line")
+        stop_logging()
+        lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    finally:
+        configure_logging(service_name="test", env="test")
+
+    assert [line["event"] for line in lines] == ["queued_event", "uvicorn line"]
+    assert lines[0]["email"] == "[redacted]"
+    assert lines[0]["service"] == "test"
+    assert dropped_log_records() == 0
+
+
+def test_full_queue_drops_and_counts_records():
+    handler = _BoundedQueueHandler(maxsize=1)
+    for _ in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "burst"}))
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
+
+
+def test_redaction_hash_matches_plain_hmac_and_is_memoized():
+    expected = hmac.new(b"secret", "/Projekt/a.pdf".encode(), hashlib.sha256).hexdigest()
+    assert hmac_sha256_hex("/Projekt/a.pdf", "secret") == expected
+    assert hmac_sha256_hex("/Projekt/a.pdf", "other") != expected
+
+    hasher = _RedactionHasher("secret", maxsize=2)
+    for value in ("/Projekt/a.pdf", "/Projekt/a.pdf", "/Projekt/b.pdf"):
+        hasher.hexdigest(value)
+    info = hasher.hexdigest.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
@@ -0,0 +1,112 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.metrics import Counter, Histogram, Registry
+
+
+def _sample(text: str, prefix: str) -> float:
+    """Value of the first exposition line starting with `prefix` (0 if there is none yet)."""
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr("app.metrics.REGISTRY", registry)
+    histogram = Histogram("test_seconds", "Test latency", ("stage",), buckets=(0.1, 1.0))
+    histogram.labels("store_files").observe(0.05)
+    histogram.labels("store_files").observe(0.5)
+    histogram.labels("store_files").observe(5)
+
+    assert registry.render().splitlines() == [
+        "# HELP test_seconds Test latency",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="store_files",le="0.1"} 1',
+        'test_seconds_bucket{stage="store_files",le="1"} 2',
+        'test_seconds_bucket{stage="store_files",le="+Inf"} 3',
+        'test_seconds_sum{stage="store_files"} 5.55',
+        'test_seconds_count{stage="store_files"} 3',
+    ]
+
+
+def test_label_values_are_escaped(monkeypatch):
+    registry = Registry()
+    monkeypatch.setattr("app.metrics.REGISTRY", registry)
+    Counter("test_total", "Test counter", ("path",)).labels('C:\\a "b"\nc').inc()
+
+    assert registry.render().splitlines()[-1] == 'test_total{path="C:\\\\a \\"b\\"\\nc"} 1'
+
+
+@pytest.fixture
+def metrics_access(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    return {"Authorization": "Bearer scrape-secret"}
+
+
+@pytest.mark.asyncio
+async def test_upload_stages_and_request_latency_are_exported(services, metrics_access):
+    with patch.object(services, "nextcloud") as mock_nextcloud, \
+         patch.object(services, "nextcloud_health") as mock_health, \
+         patch.object(services, "email_outbox") as mock_outbox:
+        mock_health.ensure_available = AsyncMock(return_value=(True, "Connection successful"))
+        mock_nextcloud.create_folder = AsyncMock(return_value=True)
+        mock_nextcloud.upload_file = AsyncMock(return_value=True)
+        mock_nextcloud.upload_metadata = AsyncMock(return_value=True)
+        mock_nextcloud.upload_content = AsyncMock(return_value=True)
+        mock_nextcloud.metadata_cache_stats.return_value = {"size": 0}
+        mock_outbox.enqueue = AsyncMock(return_value="job-id")
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            before = (await client.get("/metrics", headers=metrics_access)).text
+            content = b"%PDF-1.4 metrics"
+            response = await client.post(
+                "/api/upload",
+                data={
+                    "email": "test@uni-frankfurt.de",
+                    "project_title": "Metrics",
+                    "institution": "university",
+                    "file_categories": json.dumps({"a.pdf": "sonstiges"}),
+                },
+                files=[("files", ("a.pdf", content, "application/pdf"))],
+                headers={"Authorization": f"Bearer {settings.api_token}"},
+            )
+            assert response.status_code == 200
+            response = await client.get("/metrics", headers=metrics_access)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+    for stage in ("receive", "validate", "create_folder", "store_files", "metadata", "readme", "queue_emails"):
+        prefix = f'datenschutzportal_upload_stage_duration_seconds_count{{stage="{stage}"}}'
+        assert _sample(after, prefix) == _sample(before, prefix) + 1, stage
+    received = "datenschutzportal_upload_received_bytes_total"
+    assert _sample(after, received) - _sample(before, received) == len(content)
+    assert _sample(after, "datenschutzportal_uploads_in_flight") == 0
+    assert _sample(after, 'datenschutzportal_http_request_duration_seconds_count{method="POST",route="/api/upload",status="200"}') >= 1
+    assert "datenschutzportal_dedup_misses_total" in after
+
+
+@pytest.mark.asyncio
+async def test_metrics_token_is_enforced(metrics_access):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 401
+        response = await client.get("/metrics", headers=metrics_access)
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("enabled, token", [(False, "scrape-secret"), (True, "")])
+async def test_metrics_need_enabling_and_a_token(monkeypatch, enabled, token):
+    monkeypatch.setattr(settings, "metrics_enabled", enabled)
+    monkeypatch.setattr(settings, "metrics_token", token)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+        assert response.status_code == 404
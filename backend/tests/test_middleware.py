@@ -0,0 +1,27 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_security_headers_and_request_id_are_set():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/health")
+
+    assert response.status_code == 200
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.headers["cache-control"] == "no-store"
+    assert response.headers["content-security-policy"] == "default-src 'none'; frame-ancestors 'none'"
+    assert len(response.headers["x-request-id"]) == 36
+
+
+@pytest.mark.asyncio
+async def test_incoming_request_id_is_echoed_once():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/does-not-exist", headers={"X-Request-ID": " abc-123 "})
+
+    assert response.status_code == 404
+    assert response.headers.get_list("x-request-id") == ["abc-123"]
+    assert response.headers.get_list("cache-control") == ["no-store"]
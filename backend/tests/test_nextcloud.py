@@ -1,5 +1,15 @@
+import hashlib
+import io
+import json
+import tempfile
+import tracemalloc
+from unittest.mock import patch
+
+import httpx
 import pytest
-from app.services.nextcloud import NextcloudService
+from fastapi import UploadFile
+from app.config import settings
+from app.services.nextcloud import NextcloudService, _chunked_upload_urls
 
 @pytest.mark.asyncio
 async def test_nextcloud_service_initialization():
@@ -12,3 +22,382 @@ async def test_nextcloud_service_initialization():
         assert service.client is not None
     except Exception as e:
         pytest.fail(f"Failed to initialize NextcloudService: {e}")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, healthy", [(207, True), (404, False)])
+async def test_connection_test_reports_missing_webdav_root(status, healthy):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if status == 207:
+            return httpx.Response(207, content=_multistatus(request.url.path + "/"))
+        return httpx.Response(status)
+
+    service = NextcloudService(transport=httpx.MockTransport(handler))
+    try:
+        ok, _ = await service.test_connection()
+    finally:
+        await service.aclose()
+    assert ok is healthy
+
+
+def _dav_path(request: httpx.Request) -> str:
+    """Path of a request relative to the configured WebDAV root."""
+    prefix = httpx.URL(settings.nextcloud_url).path.rstrip("/")
+    return request.url.path[len(prefix):] or "/"
+
+
+def _multistatus(*hrefs: str) -> bytes:
+    responses = "".join(
+        f"<d:response><d:href>{href}</d:href><d:propstat><d:prop>"
+        f"<d:resourcetype>{'<d:collection/>' if href.endswith('/') else ''}</d:resourcetype>"
+        f"</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>"
+        for href in hrefs
+    )
+    return f'<?xml version="1.0"?><d:multistatus xmlns:d="DAV:">{responses}</d:multistatus>'.encode()
+
+
+def _folder_server(existing: set, requests: list):
+    """Fake WebDAV handler with MKCOL semantics: 201 created, 405 exists, 409 parent missing."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = _dav_path(request)
+        requests.append((request.method, path))
+        parent = path.rsplit("/", 1)[0] or "/"
+        if request.method == "MKCOL":
+            if path in existing:
+                return httpx.Response(405)
+            if parent not in existing:
+                return httpx.Response(409)
+            existing.add(path)
+            return httpx.Response(201)
+        if request.method == "PUT":
+            return httpx.Response(201 if parent in existing else 409)
+        return httpx.Response(405)
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_create_folder_is_mkcol_first_and_cached():
+    existing = {"/"}
+    requests = []
+    service = NextcloudService(transport=httpx.MockTransport(_folder_server(existing, requests)))
+    try:
+        assert await service.create_folder("/Datenschutzportal/Projekt_2024-01-01")
+        assert requests == [
+            ("MKCOL", "/Datenschutzportal/Projekt_2024-01-01"),
+            ("MKCOL", "/Datenschutzportal"),
+            ("MKCOL", "/Datenschutzportal/Projekt_2024-01-01"),
+        ]
+
+        # Known folders cost no request; a new sibling needs a single MKCOL.
+        requests.clear()
+        assert await service.create_folder("/Datenschutzportal/Projekt_2024-01-01")
+        assert await service.create_folder("/Datenschutzportal/Projekt_2024-01-02")
+        assert requests == [("MKCOL", "/Datenschutzportal/Projekt_2024-01-02")]
+
+        assert await service.upload_content("# README", "/Datenschutzportal/Projekt_2024-01-01/README.md")
+    finally:
+        await service.aclose()
+
+    assert requests[-1] == ("PUT", "/Datenschutzportal/Projekt_2024-01-01/README.md")
+
+
+@pytest.mark.asyncio
+async def test_folder_cache_is_invalidated_on_conflict():
+    existing = {"/"}
+    requests = []
+    service = NextcloudService(transport=httpx.MockTransport(_folder_server(existing, requests)))
+    try:
+        assert await service.create_folder("/Datenschutzportal/Projekt")
+        # Folder removed on the server behind our back: the PUT fails with 409 ...
+        existing.discard("/Datenschutzportal/Projekt")
+        assert not await service.upload_content("x", "/Datenschutzportal/Projekt/README.md")
+
+        # ... and the next create_folder really recreates it.
+        requests.clear()
+        assert await service.create_folder("/Datenschutzportal/Projekt")
+        assert requests == [("MKCOL", "/Datenschutzportal/Projekt")]
+        assert "/Datenschutzportal/Projekt" in existing
+    finally:
+        await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_missing_cached_base_folder_is_recreated():
+    existing = {"/"}
+    requests = []
+    service = NextcloudService(transport=httpx.MockTransport(_folder_server(existing, requests)))
+    try:
+        assert await service.create_folder("/Datenschutzportal/Projekt_A")
+        # Base folder deleted on the server while it is still cached
+        existing.clear()
+        existing.add("/")
+
+        requests.clear()
+        assert await service.create_folder("/Datenschutzportal/Projekt_B")
+        assert requests == [
+            ("MKCOL", "/Datenschutzportal/Projekt_B"),
+            ("MKCOL", "/Datenschutzportal"),
+            ("MKCOL", "/Datenschutzportal/Projekt_B"),
+        ]
+        assert {"/Datenschutzportal", "/Datenschutzportal/Projekt_B"} <= existing
+    finally:
+        await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_metadata_downloads_json_without_temp_files():
+    metadata = {"project_id": "Projekt_2024-01-01", "files": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "PROPFIND":
+            return httpx.Response(207, content=_multistatus(request.url.path))
+        if request.method == "GET":
+            return httpx.Response(200, content=json.dumps(metadata).encode())
+        return httpx.Response(405)
+
+    service = NextcloudService(transport=httpx.MockTransport(handler))
+    try:
+        assert await service.get_metadata("Projekt_2024-01-01") == metadata
+    finally:
+        await service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_metadata_revalidates_cached_copy_with_etag():
+    stored = {"etag": '"v1"', "metadata": {"project_id": "Projekt_2024-01-01", "files": []}}
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == stored["etag"]:
+            return httpx.Response(304, headers={"ETag": stored["etag"]})
+        return httpx.Response(200, headers={"ETag": stored["etag"]}, content=json.dumps(stored["metadata"]).encode())
+
+    service = NextcloudService(transport=httpx.MockTransport(handler))
+    try:
+        first = await service.get_metadata("Projekt_2024-01-01")
+        first["files"].append("mutated by caller")
+        assert await service.get_metadata("Projekt_2024-01-01") == {"project_id": "Projekt_2024-01-01", "files": []}
+
+        stored.update(etag='"v2"', metadata={"project_id": "Projekt_2024-01-01", "files": ["a.pdf"]})
+        assert (await service.get_metadata("Projekt_2024-01-01"))["files"] == ["a.pdf"]
+    finally:
+        await service.aclose()
+
+    assert requests == [("GET", None), ("GET", '"v1"'), ("GET", '"v1"')]
+    assert service.metadata_cache_stats() == {"size": 1, "hits": 1, "misses": 2, "hit_rate": 0.333}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "stored_size, checksums, copied",
+    [
+        (50, "SHA256:ABC123 MD5:ffff", True),
+        (49, "SHA256:abc123", False),
+        # Modified in place with the same size: Nextcloud dropped or changed the checksum
+        (50, "", False),
+        (50, "SHA256:def456", False),
+    ],
+)
+async def test_copy_file_checks_source_size_and_checksum(stored_size, checksums, copied):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append((request.method, _dav_path(request), request.headers.get("Destination")))
+        if request.method == "PROPFIND":
+            body = (
+                '<?xml version="1.0"?><d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns"><d:response>'
+                f"<d:href>{request.url.path}</d:href><d:propstat><d:prop><d:resourcetype/>"
+                f"<d:getcontentlength>{stored_size}</d:getcontentlength>"
+                f"<oc:checksums><oc:checksum>{checksums}</oc:checksum></oc:checksums>"
+                "</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response></d:multistatus>"
+            )
+            return httpx.Response(207, content=body.encode())
+        if request.method == "COPY":
+            return httpx.Response(201)
+        return httpx.Response(405)
+
+    service = NextcloudService(transport=httpx.MockTransport(handler))
+    try:
+        result = await service.copy_file(
+            "/Datenschutzportal/A/konzept.pdf", "/Datenschutzportal/B/konzept.pdf", 50, "abc123"
+        )
+    finally:
+        await service.aclose()
+
+    assert result is copied
+    assert [r[0] for r in requests] == (["PROPFIND", "COPY"] if copied else ["PROPFIND"])
+    if copied:
+        assert requests[1][1] == "/Datenschutzportal/A/konzept.pdf"
+        assert requests[1][2] == service.client.url("/Datenschutzportal/B/konzept.pdf")
+
+
+@pytest.mark.asyncio
+async def test_list_files_parses_propfind_and_skips_own_entry():
+    def handler(request: httpx.Request) -> httpx.Response:
+        base = request.url.path.rstrip("/")
+        return httpx.Response(207, content=_multistatus(f"{base}/", f"{base}/a.pdf", f"{base}/sub/"))
+
+    service = NextcloudService(transport=httpx.MockTransport(handler))
+    try:
+        assert await service.list_files("/Datenschutzportal") == ["a.pdf", "sub/"]
+    finally:
+        await service.aclose()
+
+
+class _DrainingTransport(httpx.AsyncBaseTransport):
+    """Consumes streamed request bodies chunk by chunk without keeping them."""
+
+    def __init__(self):
+        self.received = 0
+        self.headers: list = []
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.headers.append(request.headers)
+        async for chunk in request.stream:
+            self.received += len(chunk)
+        return httpx.Response(201)
+
+
+async def _peak_upload_memory(size: int, chunked: bool) -> int:
+    """Upload a disk-backed file of `size` bytes and return the traced Python memory peak."""
+    block = b"\0" * (1 << 20)
+    with tempfile.TemporaryFile() as tmp, \
+         patch.object(settings, "nextcloud_chunked_upload_enabled", chunked):
+        for _ in range(size // len(block)):
+            tmp.write(block)
+        tmp.seek(0)
+        transport = _DrainingTransport()
+        service = NextcloudService(transport=transport)
+        upload = UploadFile(file=tmp, size=size, filename="big.pdf")
+        tracemalloc.start()
+        try:
+            assert await service.upload_file(upload, "/Datenschutzportal/Projekt/big.pdf")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            await service.aclose()
+    assert transport.received == size
+    if not chunked:
+        assert transport.headers[0]["Content-Length"] == str(size)
+    return peak
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunked", [False, True])
+async def test_upload_file_memory_stays_flat_as_file_size_grows(chunked):
+    """
+    upload_file streams the UploadFile into the request bodies (single PUT or chunks),
+    so peak memory must not scale with the file size.
+    """
+    small_peak = await _peak_upload_memory(16 * 1024 * 1024, chunked)
+    large_peak = await _peak_upload_memory(64 * 1024 * 1024, chunked)
+
+    assert large_peak < small_peak + 2 * 1024 * 1024
+    assert large_peak < 4 * settings.upload_stream_chunk_size + 2 * 1024 * 1024
+
+
+class _ChunkedUploadServer:
+    """Fake Nextcloud chunking-v2 endpoint that can fail selected chunk PUTs."""
+
+    def __init__(self, failures: dict):
+        self.failures = failures  # chunk name -> list of status codes to return first
+        self.chunks: dict = {}
+        self.request_headers: dict = {}
+        self.requests: list = []
+        self.assembled = None
+        self.destination = None
+        self.checksum = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.path.rsplit("/", 1)[-1]
+        self.requests.append((request.method, name))
+        if request.method == "MKCOL":
+            return httpx.Response(201)
+        if request.method == "PUT":
+            pending = self.failures.get(name)
+            if pending:
+                return httpx.Response(pending.pop(0))
+            self.chunks[name] = request.content
+            self.request_headers[name] = request.headers
+            return httpx.Response(201)
+        if request.method == "MOVE":
+            self.destination = request.headers["Destination"]
+            self.checksum = request.headers.get("OC-Checksum")
+            self.assembled = b"".join(self.chunks[k] for k in sorted(self.chunks))
+            return httpx.Response(201)
+        if request.method == "DELETE":
+            return httpx.Response(204)
+        return httpx.Response(405)
+
+
+def _chunked_settings():
+    return patch.multiple(
+        settings,
+        nextcloud_chunked_upload_threshold=10,
+        nextcloud_chunk_size=16,
+        nextcloud_chunk_concurrency=2,
+        nextcloud_chunk_retries=2,
+        nextcloud_chunk_retry_backoff=0,
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_retries_only_the_failed_chunk():
+    payload = bytes(range(50))
+    server = _ChunkedUploadServer(failures={"00002": [503]})
+    with _chunked_settings():
+        service = NextcloudService(transport=httpx.MockTransport(server))
+        try:
+            upload = UploadFile(file=io.BytesIO(payload), size=len(payload), filename="big.pdf")
+            assert await service.upload_file(upload, "/Datenschutzportal/Projekt/big.pdf")
+        finally:
+            await service.aclose()
+
+    assert server.assembled == payload
+    _, files_url = _chunked_upload_urls(settings.nextcloud_url, settings.nextcloud_username)
+    assert server.destination == f"{files_url}/Datenschutzportal/Projekt/big.pdf"
+    puts = [name for method, name in server.requests if method == "PUT"]
+    assert sorted(puts) == ["00001", "00002", "00002", "00003", "00004"]
+    assert server.requests[0][0] == "MKCOL"
+    assert server.requests[-1] == ("MOVE", ".file")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunked", [False, True])
+async def test_upload_file_sends_checksum(chunked):
+    payload = bytes(range(50))
+    digest = hashlib.sha256(payload).hexdigest()
+    server = _ChunkedUploadServer(failures={})
+    with _chunked_settings(), patch.object(settings, "nextcloud_chunked_upload_enabled", chunked):
+        service = NextcloudService(transport=httpx.MockTransport(server))
+        try:
+            upload = UploadFile(file=io.BytesIO(payload), size=len(payload), filename="big.pdf")
+            assert await service.upload_file(upload, "/Datenschutzportal/Projekt/big.pdf", sha256=digest)
+        finally:
+            await service.aclose()
+
+    if chunked:
+        # Checksum of the whole file goes with the assembling MOVE
+        assert server.checksum == f"SHA256:{digest}"
+    else:
+        assert server.chunks["big.pdf"] == payload
+        assert server.request_headers["big.pdf"]["OC-Checksum"] == f"SHA256:{digest}"
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_cleans_up_after_permanent_failure():
+    payload = bytes(range(50))
+    server = _ChunkedUploadServer(failures={"00003": [403]})
+    with _chunked_settings():
+        service = NextcloudService(transport=httpx.MockTransport(server))
+        try:
+            upload = UploadFile(file=io.BytesIO(payload), size=len(payload), filename="big.pdf")
+            assert not await service.upload_file(upload, "/Datenschutzportal/Projekt/big.pdf")
+        finally:
+            await service.aclose()
+
+    assert server.assembled is None
+    assert server.requests[-1][0] == "DELETE"
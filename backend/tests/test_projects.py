@@ -0,0 +1,188 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.services.nextcloud import NextcloudService
+from app.services.project_index import ProjectQuery
+from app.utils.tokens import create_upload_token
+
+
+def _metadata(project_id: str, title: str, project_type: str = "new", day: int = 1) -> dict:
+    return {
+        "project_id": project_id,
+        "email": "test@uni-frankfurt.de",
+        "project_title": title,
+        "institution": "university",
+        "is_prospective_study": False,
+        "upload_timestamp": f"2024-01-{day:02d}T10:00:00",
+        "files": [{"filename": "konzept.pdf", "category": "datenschutzkonzept"}],
+        "project_type": project_type,
+        "language": "de",
+    }
+
+
+@pytest.mark.asyncio
+async def test_query_filters_and_paginates(project_index):
+    await project_index.upsert(_metadata("Studie_A_2024-01-01", "Studie A", day=1))
+    await project_index.upsert(_metadata("RE_Studie_A_2024-01-05", "Studie A", "existing", day=5))
+    await project_index.upsert(_metadata("Register_100%_2024-01-09", "Register 100%", day=9))
+
+    page = await project_index.query(ProjectQuery(limit=2))
+    assert page["total"] == 3
+    # Newest first
+    assert [p["project_id"] for p in page["items"]] == ["Register_100%_2024-01-09", "RE_Studie_A_2024-01-05"]
+    assert "metadata_json" not in page["items"][0]
+
+    page = await project_index.query(ProjectQuery(limit=2, offset=2))
+    assert [p["project_id"] for p in page["items"]] == ["Studie_A_2024-01-01"]
+
+    assert (await project_index.query(ProjectQuery(project_type="existing")))["total"] == 1
+    assert (await project_index.query(ProjectQuery(search="studie a")))["total"] == 2
+    # LIKE wildcards in the search term are matched literally
+    assert (await project_index.query(ProjectQuery(search="100%")))["total"] == 1
+    page = await project_index.query(ProjectQuery(uploaded_after="2024-01-02", uploaded_before="2024-01-09"))
+    assert [p["project_id"] for p in page["items"]] == ["RE_Studie_A_2024-01-05"]
+
+
+@pytest.mark.asyncio
+async def test_status_and_listing_are_served_from_the_index(services, project_index):
+    await project_index.upsert(_metadata("Studie_A_2024-01-01", "Studie A"))
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    admin = {"Authorization": "Bearer admin-secret"}
+    with patch.object(services, "nextcloud") as mock_nextcloud, patch.object(settings, "admin_token", "admin-secret"):
+        mock_nextcloud.get_metadata = AsyncMock(side_effect=FileNotFoundError)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/upload/status/Studie_A_2024-01-01", headers=headers)
+            assert response.status_code == 200
+            assert response.json()["project_title"] == "Studie A"
+
+            assert (await client.get("/api/upload/status/Unknown", headers=headers)).status_code == 404
+
+            assert (await client.get("/api/projects")).status_code in (401, 403)
+            response = await client.get("/api/projects", params={"q": "studie"}, headers=admin)
+            assert response.status_code == 200
+            assert response.json()["total"] == 1
+            assert response.json()["items"][0]["files_count"] == 1
+
+    # Only the unknown project needed a WebDAV lookup
+    mock_nextcloud.get_metadata.assert_awaited_once_with("Unknown")
+
+
+@pytest.mark.asyncio
+async def test_stale_status_is_revalidated_against_nextcloud(services, project_index, monkeypatch):
+    monkeypatch.setattr(settings, "project_index_ttl", 0.0)
+    await project_index.upsert(_metadata("Studie_A_2024-01-01", "Studie A"))
+    await project_index.upsert(_metadata("Removed_2023-12-01", "Removed"))
+    headers = {"Authorization": f"Bearer {settings.api_token}"}
+    renamed = _metadata("Studie_A_2024-01-01", "Studie A (korrigiert)")
+
+    async def get_metadata(project_id):
+        if project_id == "Removed_2023-12-01":
+            raise FileNotFoundError(project_id)
+        return renamed
+
+    with patch.object(services, "nextcloud") as mock_nextcloud:
+        mock_nextcloud.get_metadata = AsyncMock(side_effect=get_metadata)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/upload/status/Studie_A_2024-01-01", headers=headers)
+            assert response.json()["project_title"] == "Studie A (korrigiert)"
+            assert (await project_index.get("Studie_A_2024-01-01"))["project_title"] == "Studie A (korrigiert)"
+
+            # Deleted in Nextcloud: dropped from the index
+            assert (await client.get("/api/upload/status/Removed_2023-12-01", headers=headers)).status_code == 404
+            assert await project_index.get("Removed_2023-12-01") is None
+
+            # Nextcloud unreachable: the indexed copy is served
+            mock_nextcloud.get_metadata.side_effect = ConnectionError("down")
+            response = await client.get("/api/upload/status/Studie_A_2024-01-01", headers=headers)
+            assert response.status_code == 200
+            assert response.json()["project_title"] == "Studie A (korrigiert)"
+
+
+def test_missing_columns_are_added_to_existing_databases(tmp_path):
+    import sqlite3
+
+    from app.db import create_db_engine
+
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE projects (project_id VARCHAR PRIMARY KEY, project_title VARCHAR NOT NULL, "
+            "project_type VARCHAR NOT NULL, institution VARCHAR NOT NULL, language VARCHAR NOT NULL, "
+            "is_prospective_study BOOLEAN NOT NULL, uploaded_at VARCHAR NOT NULL, "
+            "files_count INTEGER NOT NULL, metadata_json TEXT NOT NULL)"
+        )
+    engine = create_db_engine(path)
+    with sqlite3.connect(path) as conn:
+        assert "indexed_at" in {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_listing_rejects_public_credentials(project_index):
+    upload_jwt = create_upload_token()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        # Disabled unless an admin token is configured
+        with patch.object(settings, "admin_token", ""):
+            response = await client.get("/api/projects", headers={"Authorization": f"Bearer {settings.api_token}"})
+            assert response.status_code == 404
+
+        with patch.object(settings, "admin_token", "admin-secret"):
+            # The frontend token is in the public JS bundle, upload JWTs are issued to anyone
+            for token in (settings.api_token, upload_jwt):
+                response = await client.get("/api/projects", headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code in (401, 403)
+            assert (await client.get("/api/projects")).status_code in (401, 403)
+            response = await client.get("/api/projects", headers={"Authorization": "Bearer admin-secret"})
+            assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_rebuild_scans_base_path_with_one_propfind(project_index):
+    base = settings.nextcloud_base_path.strip("/")
+    stored = {
+        "Studie_A_2024-01-01": _metadata("Studie_A_2024-01-01", "Studie A"),
+        "RE_Studie_A_2024-01-05": _metadata("RE_Studie_A_2024-01-05", "Studie A", "existing", day=5),
+    }
+    propfinds = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "PROPFIND" and request.headers["Depth"] == "1":
+            propfinds.append(path)
+            hrefs = [f"{path.rstrip('/')}/"] + [f"{path.rstrip('/')}/{name}/" for name in [*stored, "Leer"]]
+            responses = "".join(
+                f"<d:response><d:href>{href}</d:href><d:propstat><d:prop><d:resourcetype><d:collection/>"
+                f"</d:resourcetype></d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat></d:response>"
+                for href in hrefs
+            )
+            return httpx.Response(207, content=f'<d:multistatus xmlns:d="DAV:">{responses}</d:multistatus>'.encode())
+        project = path.rsplit("/", 2)[-2]
+        if project not in stored:
+            return httpx.Response(404)
+        if request.method == "PROPFIND":
+            return httpx.Response(
+                207,
+                content=(
+                    f'<d:multistatus xmlns:d="DAV:"><d:response><d:href>{path}</d:href><d:propstat><d:prop>'
+                    f"<d:resourcetype/></d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat>"
+                    f"</d:response></d:multistatus>"
+                ).encode(),
+            )
+        return httpx.Response(200, content=json.dumps(stored[project]).encode())
+
+    await project_index.upsert(_metadata("Removed_2023-12-01", "Removed"))
+    service = NextcloudService(transport=httpx.MockTransport(handler))
+    try:
+        assert await project_index.rebuild(service) == 2
+    finally:
+        await service.aclose()
+
+    assert len(propfinds) == 1 and propfinds[0].endswith(f"/{base}")
+    page = await project_index.query(ProjectQuery())
+    assert sorted(p["project_id"] for p in page["items"]) == sorted(stored)
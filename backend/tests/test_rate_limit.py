@@ -0,0 +1,74 @@
+import sqlite3
+import time
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from app.config import settings
+from app.limiter import client_address
+from app.utils.rate_limit_storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return SQLiteStorage(f"sqlite:///{tmp_path / 'rate_limits.db'}")
+
+
+def test_moving_window_is_shared_between_storage_instances(storage, tmp_path):
+    other_worker = SQLiteStorage(f"sqlite:///{tmp_path / 'rate_limits.db'}")
+
+    assert storage.acquire_entry("upload/1.2.3.4", limit=2, expiry=3600)
+    assert other_worker.acquire_entry("upload/1.2.3.4", limit=2, expiry=3600)
+    assert not storage.acquire_entry("upload/1.2.3.4", limit=2, expiry=3600)
+    assert other_worker.acquire_entry("upload/5.6.7.8", limit=2, expiry=3600)
+
+    start, used = other_worker.get_moving_window("upload/1.2.3.4", limit=2, expiry=3600)
+    assert used == 2
+    assert start <= time.time()
+
+
+def test_sweep_removes_expired_entries(storage):
+    storage.acquire_entry("a", limit=5, expiry=1)
+    storage.incr("b", expiry=1)
+
+    assert storage.sweep(time.time() + 2) == 2
+    assert storage.get_moving_window("a", limit=5, expiry=1)[1] == 0
+    assert storage.get("b") == 0
+
+
+def test_locked_storage_fails_open_without_stalling(storage, tmp_path):
+    other_worker = sqlite3.connect(tmp_path / "rate_limits.db", isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        assert storage.acquire_entry("upload/1.2.3.4", limit=1, expiry=3600)
+        assert storage.incr("upload/1.2.3.4", expiry=3600) == 1
+        assert time.perf_counter() - start < 1
+    finally:
+        other_worker.rollback()
+        other_worker.close()
+
+
+def test_other_database_errors_are_raised(storage):
+    with storage.engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE rate_limit_hits")
+    with pytest.raises(OperationalError):
+        storage.acquire_entry("upload/1.2.3.4", limit=1, expiry=3600)
+
+
+def _request(peer: str, forwarded: str = "") -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_client_address_uses_entry_appended_by_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_count", 1)
+    # The client may send its own X-Forwarded-For; only the proxy's entry counts
+    assert client_address(_request("10.0.0.2", "6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    assert client_address(_request("10.0.0.2")) == "10.0.0.2"
+
+
+def test_client_address_ignores_forwarded_header_without_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "trusted_proxy_count", 0)
+    assert client_address(_request("198.51.100.4", "6.6.6.6")) == "198.51.100.4"
@@ -0,0 +1,29 @@
+import pytest
+
+from app import serve
+from app.config import settings
+
+
+def test_worker_count_defaults_to_available_cpus(monkeypatch):
+    monkeypatch.setattr(serve, "available_cpus", lambda: 6)
+    assert serve.worker_count(0) == 6
+    assert serve.worker_count(3) == 3
+
+
+def test_available_cpus_respects_cgroup_quota(monkeypatch, tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("200000 100000\n")
+    real_path = serve.Path
+    monkeypatch.setattr(serve, "Path", lambda p: cpu_max if p == "/sys/fs/cgroup/cpu.max" else real_path(p))
+    monkeypatch.setattr(serve.os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    assert serve.available_cpus() == 2
+
+
+def test_metrics_require_a_single_worker(monkeypatch):
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    serve.check_metrics_workers(1)
+    with pytest.raises(SystemExit):
+        serve.check_metrics_workers(4)
+
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    serve.check_metrics_workers(4)
@@ -1,32 +1,38 @@
+import asyncio
+import hashlib
+import io
+
 import pytest
+from fastapi import HTTPException, UploadFile
 from httpx import AsyncClient, ASGITransport
 from app.main import app
-from unittest.mock import MagicMock, patch, AsyncMock
+from app.routes.upload import _upload_files
+from unittest.mock import patch, AsyncMock
 from app.config import settings
 import json
 
 @pytest.mark.asyncio
-async def test_upload_documents():
+async def test_upload_documents(services):
     # Mock NextcloudService and EmailService
-    with patch("app.routes.upload.nextcloud") as mock_nextcloud, \
-         patch("app.routes.upload.email_service") as mock_email:
+    with patch.object(services, "nextcloud") as mock_nextcloud, \
+         patch.object(services, "nextcloud_health") as mock_health, \
+         patch.object(services, "email_outbox") as mock_outbox:
         
         # Setup mocks to be awaitable
-        mock_nextcloud.test_connection = MagicMock(return_value=(True, "Connection successful"))
-        mock_nextcloud.create_folder = MagicMock(return_value=True) # create_folder is sync in my impl
+        mock_health.ensure_available = AsyncMock(return_value=(True, "Connection successful"))
+        mock_nextcloud.create_folder = AsyncMock(return_value=True)
         mock_nextcloud.upload_file = AsyncMock(return_value=True)
         mock_nextcloud.upload_metadata = AsyncMock(return_value=True)
         mock_nextcloud.upload_content = AsyncMock(return_value=True)
         mock_nextcloud.get_metadata = AsyncMock(return_value={})
         
-        mock_email.send_confirmation_email = AsyncMock(return_value=True)
-        mock_email.send_team_notification = AsyncMock(return_value=True)
+        mock_outbox.enqueue = AsyncMock(return_value="job-id")
         
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as client:
             files = [
-                ("files", ("test.pdf", b"fake pdf content", "application/pdf")),
-                ("files", ("concept.pdf", b"fake concept", "application/pdf"))
+                ("files", ("test.pdf", b"%PDF-1.4 fake pdf content", "application/pdf")),
+                ("files", ("concept.pdf", b"%PDF-1.4 fake concept", "application/pdf"))
             ]
             
             categories_map = {
@@ -50,8 +56,8 @@ async def test_upload_documents():
             headers = {"Authorization": f"Bearer {settings.api_token}"}
             # We need to recreate files iterator as it was consumed
             files = [
-                ("files", ("test.pdf", b"fake pdf content", "application/pdf")),
-                ("files", ("concept.pdf", b"fake concept", "application/pdf"))
+                ("files", ("test.pdf", b"%PDF-1.4 fake pdf content", "application/pdf")),
+                ("files", ("concept.pdf", b"%PDF-1.4 fake concept", "application/pdf"))
             ]
             
             response = await client.post("/api/upload", data=data, files=files, headers=headers)
@@ -68,3 +74,56 @@ async def test_upload_documents():
             # Verify mock calls
             assert mock_nextcloud.create_folder.call_count >= 1
             assert mock_nextcloud.upload_file.call_count == 2
+            # SHA-256 is taken while the body streams in, sent along and recorded in metadata.json
+            expected = {
+                "test.pdf": hashlib.sha256(b"%PDF-1.4 fake pdf content").hexdigest(),
+                "concept.pdf": hashlib.sha256(b"%PDF-1.4 fake concept").hexdigest(),
+            }
+            sent = {c.args[1].rsplit("/", 1)[-1]: c.kwargs["sha256"] for c in mock_nextcloud.upload_file.call_args_list}
+            assert sent == expected
+            metadata = mock_nextcloud.upload_metadata.call_args.args[0]
+            assert {f["filename"]: f["sha256"] for f in metadata["files"]} == expected
+            # E-mails are queued, not sent inline
+            assert [c.args[0] for c in mock_outbox.enqueue.call_args_list] == [
+                "confirmation",
+                "team_notification",
+            ]
+
+
+@pytest.mark.asyncio
+async def test_upload_files_bounded_concurrency_keeps_order(services):
+    active = 0
+    peak = 0
+
+    async def fake_upload(file, path, sha256=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        # Later files finish first, so completion order differs from submission order
+        await asyncio.sleep(0.001 * (10 - int(path[-5])))
+        active -= 1
+        return True
+
+    files = [UploadFile(file=io.BytesIO(b"%PDF-1.4"), filename=f"doc{i}.pdf") for i in range(6)]
+    with patch.object(services, "nextcloud") as mock_nextcloud, \
+         patch.object(settings, "upload_concurrency", 2):
+        mock_nextcloud.upload_file = AsyncMock(side_effect=fake_upload)
+        result = await _upload_files(services, files, "/Datenschutzportal/P", "P", {"doc0.pdf": "datenschutzkonzept"})
+
+    assert peak == 2
+    assert [f["filename"] for f in result] == [f"doc{i}.pdf" for i in range(6)]
+    assert result[0]["category"] == "datenschutzkonzept"
+    assert result[1]["category"] == "sonstiges"
+
+
+@pytest.mark.asyncio
+async def test_upload_files_fails_fast(services):
+    files = [UploadFile(file=io.BytesIO(b"%PDF-1.4"), filename=f"doc{i}.pdf") for i in range(4)]
+    with patch.object(services, "nextcloud") as mock_nextcloud, \
+         patch.object(settings, "upload_concurrency", 1):
+        mock_nextcloud.upload_file = AsyncMock(side_effect=[True, False, True, True])
+        with pytest.raises(HTTPException) as exc_info:
+            await _upload_files(services, files, "/Datenschutzportal/P", "P", {})
+
+    assert exc_info.value.status_code == 500
+    assert mock_nextcloud.upload_file.call_count == 2
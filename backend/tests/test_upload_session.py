@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import settings
+from app.main import app
+from app.services.upload_sessions import UploadSessionStore
+
+_SUBMISSION = {
+    "email": "test@uni-frankfurt.de",
+    "project_title": "Test Project",
+    "institution": "university",
+}
+
+
+@pytest.fixture
+def mocks(services, tmp_path):
+    with patch.object(services, "nextcloud") as mock_nextcloud, \
+         patch.object(services, "nextcloud_health") as mock_health, \
+         patch.object(services, "email_outbox") as mock_outbox, \
+         patch.object(services, "session_store", UploadSessionStore(tmp_path, ttl=60)):
+        mock_health.ensure_available = AsyncMock(return_value=(True, "Connection successful"))
+        mock_nextcloud.create_folder = AsyncMock(return_value=True)
+        mock_nextcloud.upload_file = AsyncMock(return_value=True)
+        mock_nextcloud.upload_metadata = AsyncMock(return_value=True)
+        mock_nextcloud.upload_content = AsyncMock(return_value=True)
+        mock_outbox.enqueue = AsyncMock(return_value="job-id")
+        yield mock_nextcloud, mock_outbox
+
+
+async def _create_session(client: AsyncClient) -> dict:
+    response = await client.post(
+        "/api/upload/sessions",
+        json=_SUBMISSION,
+        headers={"Authorization": f"Bearer {settings.api_token}"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_session_upload_flow(mocks):
+    mock_nextcloud, mock_outbox = mocks
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session = await _create_session(client)
+        base = f"/api/upload/sessions/{session['session_id']}"
+        headers = {"Authorization": f"Bearer {session['upload_token']}"}
+
+        for name in ("test.pdf", "concept.pdf"):
+            response = await client.put(
+                f"{base}/files/{name}",
+                params={"category": "datenschutzkonzept"},
+                content=b"%PDF-1.4 fake pdf content",
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            assert response.json()["size"] == len(b"%PDF-1.4 fake pdf content")
+            assert response.json()["sha256"] == hashlib.sha256(b"%PDF-1.4 fake pdf content").hexdigest()
+
+        status = (await client.get(base, headers=headers)).json()
+        assert [f["filename"] for f in status["files"]] == ["test.pdf", "concept.pdf"]
+
+        response = await client.post(f"{base}/finalize", headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["project_id"] == session["project_id"]
+        assert response.json()["files_uploaded"] == 2
+
+        # The session is gone once finalized
+        assert (await client.post(f"{base}/finalize", headers=headers)).status_code == 404
+
+    assert mock_nextcloud.create_folder.call_count == 1
+    assert mock_nextcloud.upload_file.call_count == 2
+    metadata = mock_nextcloud.upload_metadata.call_args.args[0]
+    assert metadata["email"] == _SUBMISSION["email"]
+    assert [f["filename"] for f in metadata["files"]] == ["test.pdf", "concept.pdf"]
+    assert [c.args[0] for c in mock_outbox.enqueue.call_args_list] == ["confirmation", "team_notification"]
+
+
+@pytest.mark.asyncio
+async def test_session_token_is_scoped_to_its_session(mocks):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = await _create_session(client)
+        second = await _create_session(client)
+
+        response = await client.put(
+            f"/api/upload/sessions/{second['session_id']}/files/test.pdf",
+            content=b"%PDF-1.4 fake pdf content",
+            headers={"Authorization": f"Bearer {first['upload_token']}"},
+        )
+        assert response.status_code == 401
+
+        # The static API token does not grant access to session routes either
+        response = await client.get(
+            f"/api/upload/sessions/{first['session_id']}",
+            headers={"Authorization": f"Bearer {settings.api_token}"},
+        )
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_session_file_is_validated(mocks):
+    mock_nextcloud, _ = mocks
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session = await _create_session(client)
+        base = f"/api/upload/sessions/{session['session_id']}"
+        headers = {"Authorization": f"Bearer {session['upload_token']}"}
+
+        response = await client.put(f"{base}/files/fake.pdf", content=b"not a pdf", headers=headers)
+        assert response.status_code == 400
+
+        with patch.object(settings, "max_file_size", 16):
+            response = await client.put(f"{base}/files/big.pdf", content=b"%PDF-1.4" + b"x" * 32, headers=headers)
+        assert response.status_code == 413
+
+        # Nothing was stored, so there is nothing to finalize
+        assert (await client.post(f"{base}/finalize", headers=headers)).status_code == 422
+    mock_nextcloud.upload_file.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_session_limits(services, mocks, tmp_path):
+    mock_nextcloud, _ = mocks
+    store = UploadSessionStore(tmp_path, ttl=60, max_files=2, max_total_size=64)
+    with patch.object(services, "session_store", store):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            session = await _create_session(client)
+            base = f"/api/upload/sessions/{session['session_id']}"
+            headers = {"Authorization": f"Bearer {session['upload_token']}"}
+
+            for name in ("a.pdf", "b.pdf"):
+                response = await client.put(f"{base}/files/{name}", content=b"%PDF-1.4" + b"x" * 8, headers=headers)
+                assert response.status_code == 200, response.text
+
+            # A third file exceeds the file count; replacing an existing one does not
+            response = await client.put(f"{base}/files/c.pdf", content=b"%PDF-1.4", headers=headers)
+            assert response.status_code == 413
+            response = await client.put(f"{base}/files/b.pdf", content=b"%PDF-1.4" + b"x" * 40, headers=headers)
+            assert response.status_code == 200, response.text
+
+            # 16 + 48 bytes are stored; growing a.pdf beyond the remaining total is rejected
+            response = await client.put(f"{base}/files/a.pdf", content=b"%PDF-1.4" + b"x" * 16, headers=headers)
+            assert response.status_code == 413
+
+            status = (await client.get(base, headers=headers)).json()
+            assert [(f["filename"], f["size"]) for f in status["files"]] == [("a.pdf", 16), ("b.pdf", 48)]
+    assert mock_nextcloud.upload_file.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_finalize_submits_once(mocks):
+    mock_nextcloud, mock_outbox = mocks
+
+    async def slow_metadata(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return True
+
+    mock_nextcloud.upload_metadata = AsyncMock(side_effect=slow_metadata)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session = await _create_session(client)
+        base = f"/api/upload/sessions/{session['session_id']}"
+        headers = {"Authorization": f"Bearer {session['upload_token']}"}
+        response = await client.put(f"{base}/files/test.pdf", content=b"%PDF-1.4 fake pdf content", headers=headers)
+        assert response.status_code == 200, response.text
+
+        responses = await asyncio.gather(*(client.post(f"{base}/finalize", headers=headers) for _ in range(2)))
+        assert sorted(r.status_code for r in responses) == [200, 409]
+
+        # A claimed session accepts no more files
+        response = await client.put(f"{base}/files/late.pdf", content=b"%PDF-1.4", headers=headers)
+        assert response.status_code == 404
+
+    assert mock_nextcloud.upload_metadata.call_count == 1
+    assert [c.args[0] for c in mock_outbox.enqueue.call_args_list] == ["confirmation", "team_notification"]
+
+
+@pytest.mark.asyncio
+async def test_failed_finalize_releases_session(mocks):
+    mock_nextcloud, mock_outbox = mocks
+    mock_nextcloud.upload_metadata = AsyncMock(return_value=False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        session = await _create_session(client)
+        base = f"/api/upload/sessions/{session['session_id']}"
+        headers = {"Authorization": f"Bearer {session['upload_token']}"}
+        response = await client.put(f"{base}/files/test.pdf", content=b"%PDF-1.4 fake pdf content", headers=headers)
+        assert response.status_code == 200, response.text
+
+        assert (await client.post(f"{base}/finalize", headers=headers)).status_code == 500
+        mock_nextcloud.upload_metadata.return_value = True
+        assert (await client.post(f"{base}/finalize", headers=headers)).status_code == 200
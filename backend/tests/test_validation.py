@@ -0,0 +1,199 @@
+import asyncio
+import gc
+import hashlib
+import io
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.routes.upload import _validate_contents, _validate_file
+from app.services.validation import (
+    MAGIC_HEADER_SIZE,
+    FileCandidate,
+    FileRejected,
+    ValidationBusy,
+    ValidationPipeline,
+    Validator,
+    check_magic_bytes,
+)
+
+_PDF = b"%PDF-1.4 Datenschutzkonzept"
+_DIGEST = hashlib.sha256(_PDF).hexdigest()
+
+
+def _candidate(data: bytes = _PDF, extension: str = ".pdf") -> FileCandidate:
+    return FileCandidate(extension=extension, size=len(data), header=data[:MAGIC_HEADER_SIZE], file=io.BytesIO(data))
+
+
+@pytest.mark.asyncio
+async def test_magic_bytes_are_checked_in_pipeline():
+    pipeline = ValidationPipeline()
+    try:
+        await pipeline.validate(_candidate())
+        with pytest.raises(FileRejected) as exc:
+            await pipeline.validate(_candidate(b"MZ\x90\x00 not a pdf"))
+        assert exc.value.reason == "magic_bytes_mismatch"
+        # CSV has no magic bytes
+        await pipeline.validate(_candidate(b"a;b\n1;2\n", ".csv"))
+    finally:
+        pipeline.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_results_are_cached_by_digest():
+    calls = []
+
+    def counting(candidate: FileCandidate) -> None:
+        calls.append(candidate.extension)
+        check_magic_bytes(candidate)
+
+    pipeline = ValidationPipeline([Validator("counting", counting)])
+    try:
+        await pipeline.validate(_candidate(), _DIGEST)
+        await pipeline.validate(_candidate(), _DIGEST)
+        assert calls == [".pdf"]
+
+        bad = b"GIF89a fake"
+        bad_digest = hashlib.sha256(bad).hexdigest()
+        for _ in range(2):
+            with pytest.raises(FileRejected):
+                await pipeline.validate(_candidate(bad), bad_digest)
+        assert calls == [".pdf", ".pdf"]
+    finally:
+        pipeline.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_validators_only_run_for_their_extensions():
+    def reject(candidate: FileCandidate) -> None:
+        raise FileRejected("nope", reason="test")
+
+    pipeline = ValidationPipeline([Validator("zip_only", reject, frozenset({".zip"}))])
+    try:
+        await pipeline.validate(_candidate())
+        with pytest.raises(FileRejected):
+            await pipeline.validate(_candidate(b"PK\x03\x04", ".zip"))
+    finally:
+        pipeline.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_saturated_pipeline_is_busy():
+    release = threading.Event()
+
+    def blocking(candidate: FileCandidate) -> None:
+        release.wait(5)
+
+    pipeline = ValidationPipeline([Validator("blocking", blocking)], max_workers=1, max_pending=1)
+    try:
+        first = asyncio.ensure_future(pipeline.validate(_candidate()))
+        await asyncio.sleep(0)
+        with pytest.raises(ValidationBusy):
+            await pipeline.validate(_candidate())
+        release.set()
+        await first
+        # Capacity is back once the first file is done
+        await pipeline.validate(_candidate())
+    finally:
+        release.set()
+        pipeline.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_validator_times_out():
+    release = threading.Event()
+
+    def blocking(candidate: FileCandidate) -> None:
+        release.wait(5)
+
+    pipeline = ValidationPipeline([Validator("blocking", blocking)], timeout=0.05)
+    try:
+        with pytest.raises(ValidationBusy):
+            await pipeline.validate(_candidate(), _DIGEST)
+        # A timeout is not a verdict and is not cached
+        assert (_DIGEST, ".pdf") not in pipeline._results
+    finally:
+        release.set()
+        pipeline.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_validator_on_closed_file_fails_quietly():
+    release = threading.Event()
+
+    def reads_after_release(candidate: FileCandidate) -> None:
+        release.wait(5)
+        candidate.file.read()
+
+    loop = asyncio.get_running_loop()
+    unhandled = []
+    loop.set_exception_handler(lambda _loop, context: unhandled.append(context))
+    pipeline = ValidationPipeline([Validator("slow", reads_after_release)], timeout=0.05)
+    candidate = _candidate()
+    try:
+        with pytest.raises(ValidationBusy):
+            await pipeline.validate(candidate)
+        # The request is over: Starlette closes the upload while the validator still runs
+        candidate.file.close()
+        release.set()
+        while pipeline._pending:
+            await asyncio.sleep(0.01)
+        gc.collect()
+        await asyncio.sleep(0)
+    finally:
+        loop.set_exception_handler(None)
+        pipeline.shutdown()
+    assert unhandled == []
+
+
+@pytest.mark.asyncio
+async def test_busy_validation_maps_to_503(services):
+    def busy(candidate: FileCandidate) -> None:
+        raise AssertionError("not reached")
+
+    pipeline = ValidationPipeline([Validator("busy", busy)], max_pending=0)
+    upload = UploadFile(file=io.BytesIO(_PDF), size=len(_PDF), filename="konzept.pdf")
+    with patch.object(services, "validation_pipeline", pipeline):
+        with pytest.raises(HTTPException) as exc:
+            await _validate_file(services, upload)
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+
+
+@pytest.mark.asyncio
+async def test_submission_with_more_files_than_max_pending_is_accepted(services):
+    pipeline = ValidationPipeline(max_workers=2, max_pending=4)
+    contents = [f"%PDF-1.4 Anlage {i}".encode() for i in range(17)]
+    files = [UploadFile(file=io.BytesIO(c), size=len(c), filename=f"anlage_{i}.pdf") for i, c in enumerate(contents)]
+    try:
+        with patch.object(services, "validation_pipeline", pipeline):
+            await _validate_contents(
+                services,
+                files, [".pdf"] * len(files), None, [hashlib.sha256(c).hexdigest() for c in contents]
+            )
+    finally:
+        pipeline.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_files_share_one_run():
+    release = threading.Event()
+    calls = []
+
+    def slow(candidate: FileCandidate) -> None:
+        calls.append(1)
+        release.wait(5)
+
+    pipeline = ValidationPipeline([Validator("slow", slow)], max_workers=1, max_pending=1)
+    try:
+        waiters = [asyncio.ensure_future(pipeline.validate(_candidate(), _DIGEST)) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*waiters)
+        assert calls == [1]
+        assert (_DIGEST, ".pdf") in pipeline._results
+    finally:
+        release.set()
+        pipeline.shutdown()
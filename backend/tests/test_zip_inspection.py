@@ -0,0 +1,71 @@
+import io
+import zipfile
+from typing import Dict
+
+import pytest
+
+from app.services.validation import MAGIC_HEADER_SIZE, FileCandidate, FileRejected
+from app.services.zip_inspection import ZipInspector
+
+_PDF = b"%PDF-1.4 Datenschutzkonzept"
+_ALLOWED = [".pdf", ".csv", ".zip"]
+
+
+def _archive(members: Dict[str, bytes], compression: int = zipfile.ZIP_DEFLATED) -> FileCandidate:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    data = buffer.getvalue()
+    return FileCandidate(extension=".zip", size=len(data), header=data[:MAGIC_HEADER_SIZE], file=io.BytesIO(data))
+
+
+def _reason(candidate: FileCandidate, inspector: ZipInspector) -> str:
+    with pytest.raises(FileRejected) as exc:
+        inspector(candidate)
+    return exc.value.reason
+
+
+def test_allowed_members_pass():
+    candidate = _archive({
+        "Antrag/konzept.pdf": _PDF,
+        "Antrag/daten.csv": b"a;b\n1;2\n",
+        "__MACOSX/Antrag/._konzept.pdf": b"\x00\x05\x16\x07",
+    })
+    ZipInspector(_ALLOWED)(candidate)
+
+
+def test_disallowed_and_spoofed_members_are_rejected():
+    inspector = ZipInspector(_ALLOWED)
+    assert _reason(_archive({"setup.exe": b"MZ\x90\x00"}), inspector) == "zip_member_type"
+    assert _reason(_archive({"README": b"hello"}), inspector) == "zip_member_type"
+    assert _reason(_archive({"konzept.pdf": b"MZ\x90\x00 renamed"}), inspector) == "zip_member_mismatch"
+
+
+def test_entry_limit_is_checked_before_parsing_directory():
+    candidate = _archive({f"{i}.csv": b"x" for i in range(11)})
+    assert _reason(candidate, ZipInspector(_ALLOWED, max_entries=10)) == "zip_too_many_entries"
+
+
+def test_zip_bomb_limits():
+    zeros = b"\x00" * (4 * 1024 * 1024)
+    assert _reason(_archive({"daten.csv": zeros}), ZipInspector(_ALLOWED)) == "zip_ratio"
+    stored = _archive({"a.csv": b"x" * 600, "b.csv": b"x" * 600}, zipfile.ZIP_STORED)
+    assert _reason(stored, ZipInspector(_ALLOWED, max_total_size=1000)) == "zip_too_large"
+
+
+def test_damaged_archive_is_rejected():
+    candidate = _archive({"konzept.pdf": _PDF})
+    truncated = candidate.file.getvalue()[:-10]
+    candidate.file = io.BytesIO(truncated)
+    assert _reason(candidate, ZipInspector(_ALLOWED)) == "zip_damaged"
+
+
+def test_encrypted_archive_is_rejected():
+    candidate = _archive({"konzept.pdf": _PDF})
+    data = bytearray(candidate.file.getvalue())
+    # Set the "encrypted" flag in the central directory entry
+    cd = data.rfind(b"PK\x01\x02")
+    data[cd + 8] |= 0x1
+    candidate.file = io.BytesIO(bytes(data))
+    assert _reason(candidate, ZipInspector(_ALLOWED)) == "zip_encrypted"